@@ -1,9 +1,18 @@
 from django.contrib import admin
-from .models import Bid, Category, Listing, Comment, Watchlist
+from .models import Bid, Category, Listing, Comment, ProxyBid, Watchlist
+
+
+class BidAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        # Bids entered by hand bypass auctions.bidding.place_bid
+        super().save_model(request, obj, form, change)
+        Listing.objects.filter(pk=obj.listing_id).repair_aggregates()
+
 
 # Register your models here.
 admin.site.register(Category)
 admin.site.register(Listing)
-admin.site.register(Bid)
+admin.site.register(Bid, BidAdmin)
 admin.site.register(Comment)
+admin.site.register(ProxyBid)
 admin.site.register(Watchlist)
@@ -0,0 +1,414 @@
+"""JSON API for the mobile clients, mounted under /api/v1/.
+
+Rows are read with .values() and serialized as they come, without building
+model instances. A listing carries an ETag and Last-Modified derived from its
+version, which is bumped on every change the API shows (see auctions.signals),
+and collections an ETag of their content, so clients revalidating with
+If-None-Match or If-Modified-Since get an empty 304 when nothing changed.
+Collections are keyset paginated: `results` plus `next` and `previous` cursors.
+
+Authentication is the site's session; unsafe methods need the CSRF token in
+an X-CSRFToken header like any form post.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+from dataclasses import asdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import bidqueue, catalog, watchlist
+from .auth import aget_user
+from .bidding import CENTS, BidStatus
+from .forms import BidForm, CommentForm, MaxBidForm
+from .models import Bid, BidSubmission, Comment, Listing, Notification
+from .pagination import InvalidCursor, KeysetPaginator, page_size_from
+
+# What a listing card shows, the rows of every listing collection
+LISTING_FIELDS = (
+    "id",
+    "title",
+    "image_url",
+    "category_id",
+    "current_price",
+    "bid_count",
+    "is_active",
+    "ends_at",
+    "created_at",
+    "version",
+)
+LISTING_DETAIL_FIELDS = LISTING_FIELDS + (
+    "description",
+    "starting_bid",
+    "closed_at",
+    "final_price",
+    "updated_at",
+)
+LISTING_RELATED = {
+    "category_name": F("category__name"),
+    "seller": F("created_by__username"),
+    "winner": F("won_by__username"),
+}
+COMMENT_FIELDS = ("id", "content", "created_at")
+
+
+def _methods(*methods):
+    """Answer other request methods with 405, for sync and async views alike."""
+    if "GET" in methods:
+        methods += ("HEAD",)
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return HttpResponseNotAllowed(methods)
+                return await view(request, *args, **kwargs)
+
+        else:
+
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in methods:
+                    return HttpResponseNotAllowed(methods)
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _error(status, message):
+    return JsonResponse({"error": str(message)}, status=status)
+
+
+def _form_errors(form, status=400):
+    return JsonResponse({"errors": form.errors.get_json_data()}, status=status)
+
+
+def _data(request):
+    """The submitted fields, from a JSON object body or a form post, and the
+    error response to answer with when there are none.
+
+    Django only parses form bodies on POST, a form PUT or PATCH would read
+    as empty.
+    """
+    if request.content_type != "application/json":
+        if request.method == "POST":
+            return request.POST, None
+        return None, _error(415, "The body must be application/json")
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return None, _error(400, "The body must be a JSON object")
+    return data, None
+
+
+def _conditional(request, body, etag, last_modified=None, private=False):
+    """The JSON response for `body`, or 304 if the client's copy is current."""
+    etag = quote_etag(etag)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    patch_cache_control(response, no_cache=True, private=private)
+    return response
+
+
+def _collection(request, payload, private=False):
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode()
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return _conditional(request, body, digest, private=private)
+
+
+async def _apage(request, queryset, keys=("created_at", "id"), private=False):
+    paginator = KeysetPaginator(queryset, keys, page_size_from(request))
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return None, _error(400, e)
+    payload = {
+        "results": page.items,
+        "next": page.next_cursor,
+        "previous": page.prev_cursor,
+    }
+    return page, _collection(request, payload, private)
+
+
+@_methods("GET")
+async def listings(request):
+    queryset = Listing.objects.filter(is_active=True)
+    if request.GET.get("category"):
+        try:
+            queryset = queryset.filter(category_id=int(request.GET["category"]))
+        except ValueError:
+            return _error(400, "category must be a category id")
+
+    _, response = await _apage(request, queryset.values(*LISTING_FIELDS))
+    return response
+
+
+@_methods("GET")
+async def listing(request, id):
+    row = (
+        await Listing.objects.filter(id=id)
+        .values(*LISTING_DETAIL_FIELDS, **LISTING_RELATED)
+        .afirst()
+    )
+    if row is None:
+        return _error(404, f"Listing with id {id} not found")
+
+    body = json.dumps(row, cls=DjangoJSONEncoder).encode()
+    return _conditional(
+        request,
+        body,
+        f"listing-{id}-{row['version']}",
+        last_modified=row["updated_at"] or row["created_at"],
+    )
+
+
+@_methods("GET", "POST")
+async def bids(request, id):
+    """The listing's bids after `since_id`, oldest first, as columns.
+
+    Bids on a listing are serialized by place_bid, so id order is placed_at
+    order and a poller passes the `last_id` it got back to fetch only newer
+    bids. Times are epoch milliseconds; `more` says another page is ready.
+    """
+    if request.method == "POST":
+        return await sync_to_async(_place_bid)(request, id)
+
+    try:
+        since_id = int(request.GET.get("since_id", 0))
+        limit = int(request.GET.get("limit", settings.AUCTIONS_BID_HISTORY_LIMIT))
+    except ValueError:
+        return _error(400, "since_id and limit must be integers")
+    limit = max(1, min(limit, settings.AUCTIONS_BID_HISTORY_LIMIT))
+
+    rows = (
+        Bid.objects.filter(listing_id=id, id__gt=since_id)
+        .order_by("id")
+        .values_list("id", "placed_at", "amount")
+    )
+    rows = [row async for row in rows[: limit + 1]]
+    if not rows and not await Listing.objects.filter(id=id).aexists():
+        return _error(404, f"Listing with id {id} not found")
+
+    more, rows = len(rows) > limit, rows[:limit]
+    return JsonResponse(
+        {
+            "listing": id,
+            "last_id": rows[-1][0] if rows else since_id,
+            "more": more,
+            "placed_at": [
+                int(placed_at.timestamp() * 1000) for _, placed_at, _ in rows
+            ],
+            "amounts": [amount for _, _, amount in rows],
+        }
+    )
+
+
+def _place_bid(request, id):
+    if not request.user.is_authenticated:
+        return _error(401, "Authentication required")
+    data, error = _data(request)
+    if error is not None:
+        return error
+
+    form = BidForm(data)
+    if not form.is_valid():
+        return _form_errors(form)
+    if bidqueue.enabled():
+        return _queue_bid(request, id, form)
+    result = form.place(id, request.user)
+    if result.status is BidStatus.NOT_FOUND:
+        return _error(404, f"Listing with id {id} not found")
+    if not result.accepted:
+        return _form_errors(form, status=409)
+
+    bid = result.bid
+    return JsonResponse(
+        {
+            "bid": {"id": bid.id, "amount": bid.amount, "placed_at": bid.placed_at},
+            "current_price": result.current_price,
+            "leading": result.leading,
+        },
+        status=201,
+    )
+
+
+def _queue_bid(request, id, form):
+    if not Listing.objects.filter(id=id).exists():
+        return _error(404, f"Listing with id {id} not found")
+    submission = bidqueue.submit(id, request.user, form.cleaned_data["bid"])
+    url = reverse("api_bid_submission", args=[submission.id])
+    response = JsonResponse(
+        {"submission": {"id": submission.id, "status": submission.status, "url": url}},
+        status=202,
+    )
+    response["Location"] = url
+    return response
+
+
+@_methods("GET")
+async def bid_submission(request, id):
+    """The outcome of the user's queued bid, see auctions.bidqueue."""
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return _error(401, "Authentication required")
+    row = (
+        await BidSubmission.objects.filter(id=id, bidder_id=user.id)
+        .values(
+            "id",
+            "listing_id",
+            "amount",
+            "status",
+            "current_price",
+            "bid_id",
+            "submitted_at",
+            "processed_at",
+        )
+        .afirst()
+    )
+    if row is None:
+        return _error(404, f"Bid submission with id {id} not found")
+
+    if row["status"] == BidStatus.ACCEPTED.value:
+        row["leading"] = await Listing.objects.filter(
+            id=row["listing_id"], highest_bid__bidder_id=user.id
+        ).aexists()
+    response = JsonResponse(row)
+    patch_cache_control(response, no_cache=True, private=True)
+    return response
+
+
+@_methods("PUT")
+def max_bid(request, id):
+    """Set the user's maximum bid on a listing, see auctions.bidding.set_max_bid."""
+    if not request.user.is_authenticated:
+        return _error(401, "Authentication required")
+    data, error = _data(request)
+    if error is not None:
+        return error
+
+    form = MaxBidForm(data)
+    if not form.is_valid():
+        return _form_errors(form)
+    result = form.place(id, request.user)
+    if result.status is BidStatus.NOT_FOUND:
+        return _error(404, f"Listing with id {id} not found")
+    if not result.accepted:
+        return _form_errors(form, status=409)
+    return JsonResponse(
+        {
+            "max_bid": form.cleaned_data["max_bid"].quantize(CENTS),
+            "current_price": result.current_price,
+            "leading": result.leading,
+        }
+    )
+
+
+@_methods("GET", "POST")
+async def comments(request, id):
+    if request.method == "POST":
+        return await sync_to_async(_add_comment)(request, id)
+
+    queryset = Comment.objects.filter(listing_id=id).values(
+        *COMMENT_FIELDS, author=F("commenter__username")
+    )
+    page, response = await _apage(request, queryset)
+    if page is not None and not page.items:
+        if not await Listing.objects.filter(id=id).aexists():
+            return _error(404, f"Listing with id {id} not found")
+    return response
+
+
+def _add_comment(request, id):
+    if not request.user.is_authenticated:
+        return _error(401, "Authentication required")
+    data, error = _data(request)
+    if error is not None:
+        return error
+    if not Listing.objects.filter(id=id).exists():
+        return _error(404, f"Listing with id {id} not found")
+
+    form = CommentForm(data)
+    if not form.is_valid():
+        return _form_errors(form)
+    comment = Comment.objects.create(
+        listing_id=id, commenter=request.user, content=form.cleaned_data["comment"]
+    )
+    return JsonResponse(
+        {
+            "id": comment.id,
+            "content": comment.content,
+            "created_at": comment.created_at,
+            "author": request.user.username,
+        },
+        status=201,
+    )
+
+
+@_methods("GET")
+async def categories(request):
+    entries = await catalog.aget_categories()
+    return _collection(request, {"results": [asdict(entry) for entry in entries]})
+
+
+@_methods("GET")
+async def watched_listings(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return _error(401, "Authentication required")
+
+    queryset = Listing.objects.filter(watchlisted_by__user=user)
+    _, response = await _apage(request, queryset.values(*LISTING_FIELDS), private=True)
+    return response
+
+
+@_methods("GET")
+async def notifications(request):
+    """The user's notifications, newest first, see auctions.notifications."""
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return _error(401, "Authentication required")
+
+    queryset = Notification.objects.filter(user=user).values(
+        "id", "kind", "listing_id", "amount", "created_at", "read_at"
+    )
+    _, response = await _apage(request, queryset, keys=("id",), private=True)
+    return response
+
+
+@_methods("PUT", "DELETE")
+def watch_listing(request, id):
+    if not request.user.is_authenticated:
+        return _error(401, "Authentication required")
+    is_active = (
+        Listing.objects.filter(id=id).values_list("is_active", flat=True).first()
+    )
+    if is_active is None:
+        return _error(404, f"Listing with id {id} not found")
+
+    if request.method == "PUT":
+        if not is_active:
+            return _error(409, "The auction is closed.")
+        watchlist.set_watched(request.user, id, True)
+    else:
+        watchlist.set_watched(request.user, id, False)
+    return HttpResponse(status=204)
@@ -0,0 +1,14 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+async def aget_user(request):
+    """request.user, loaded so that templates can read it from async views.
+
+    Loading an authenticated user reads the session and user tables, which has
+    to happen off the event loop (Django 4.2 has no request.auser()). Without a
+    session cookie the lazy user resolves to AnonymousUser without a query.
+    """
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
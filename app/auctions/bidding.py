@@ -0,0 +1,199 @@
+import enum
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from . import events, notifications
+from .models import Bid, Listing, ProxyBid
+
+CENTS = Decimal("0.01")
+
+
+class BidStatus(enum.Enum):
+    ACCEPTED = "accepted"
+    OUTBID = "outbid"
+    CLOSED = "closed"
+    NOT_FOUND = "not_found"
+
+
+@dataclass(frozen=True)
+class BidResult:
+    status: BidStatus
+    current_price: Decimal | None = None
+    bid: Bid | None = None
+    leading: bool = False
+
+    @property
+    def accepted(self):
+        return self.status is BidStatus.ACCEPTED
+
+
+def place_bid(listing_id, user, amount):
+    """Place a bid of `amount` on a listing, the only code path that writes bids.
+
+    The price check and the write happen in one transaction: the listing row is
+    locked with SELECT ... FOR UPDATE where the backend supports it, otherwise
+    the bid claims the price with a conditional UPDATE (SQLite takes its write
+    lock on that first statement), so concurrent bids cannot both win. Past its
+    end time a listing takes no bids, whether or not it was closed yet.
+    """
+    amount = Decimal(amount).quantize(CENTS)
+    listings = Listing.objects.filter(pk=listing_id)
+    now = timezone.now()
+    # Read along with the listing, so that a bid on a listing without maxima
+    # above it costs no _resolve query
+    maxima = Exists(
+        ProxyBid.objects.filter(listing=OuterRef("pk"), max_amount__gt=amount)
+    )
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update:
+            listing = listings.select_for_update().only(
+                "is_active", "ends_at", "current_price", "bid_count"
+            )
+            listing = listing.annotate(maxima=maxima).first()
+            rejection = _rejection(listing, amount, now)
+            if rejection:
+                return rejection
+            listings.update(current_price=amount, bid_count=F("bid_count") + 1)
+            bid_count, has_maxima = listing.bid_count + 1, listing.maxima
+        else:
+            still_open = Q(ends_at__isnull=True) | Q(ends_at__gt=now)
+            claimed = listings.filter(
+                still_open, is_active=True, current_price__lt=amount
+            ).update(current_price=amount, bid_count=F("bid_count") + 1)
+            if not claimed:
+                listing = listings.only("is_active", "ends_at", "current_price").first()
+                return _rejection(listing, amount, now) or BidResult(BidStatus.OUTBID)
+            bid_count, has_maxima = listings.values_list("bid_count", maxima).get()
+
+        # bulk_create skips Bid's post_save version bump, made here along with
+        # the new leader so that the notification event costs no extra write
+        bid = Bid(listing_id=listing_id, bidder=user, amount=amount)
+        Bid.objects.bulk_create([bid])
+        listings.update(highest_bid=bid, version=F("version") + 1, updated_at=now)
+        price, leader = amount, user.id
+        proxy_bids = _resolve(listing_id, price, leader) if has_maxima else []
+        if proxy_bids:
+            price, leader = _record(listings, proxy_bids, now)
+            bid_count += len(proxy_bids)
+        events.publish_listing(
+            listing_id, "price", current_price=price, bid_count=bid_count
+        )
+        notifications.bid_placed(listing_id, proxy_bids[-1] if proxy_bids else bid)
+
+    return BidResult(BidStatus.ACCEPTED, price, bid, leading=leader == user.id)
+
+
+def set_max_bid(listing_id, user, max_amount):
+    """Bid for the user up to `max_amount`, as little as it takes to lead.
+
+    The maximum replaces any the user set before and, like a bid, must be
+    greater than the current price. It is settled against the other bidders'
+    maxima at once and again whenever someone bids; the result's `bid` is
+    the bid this placed for the user, if it had to place one.
+    """
+    max_amount = Decimal(max_amount).quantize(CENTS)
+    listings = Listing.objects.filter(pk=listing_id)
+    now = timezone.now()
+
+    with transaction.atomic():
+        locked = listings
+        if connection.features.has_select_for_update_of:
+            locked = listings.select_for_update(of=("self",))
+        elif connection.features.has_select_for_update:
+            locked = listings.select_for_update()
+        else:
+            # Take SQLite's write lock before reading, as place_bid's UPDATE does
+            listings.update(version=F("version"))
+        listing = (
+            locked.only("is_active", "ends_at", "current_price", "bid_count")
+            .annotate(leader=F("highest_bid__bidder"))
+            .first()
+        )
+        rejection = _rejection(listing, max_amount, now)
+        if rejection:
+            return rejection
+
+        ProxyBid.objects.update_or_create(
+            listing_id=listing_id, bidder=user, defaults={"max_amount": max_amount}
+        )
+        price, leader = listing.current_price, listing.leader
+        proxy_bids = _resolve(listing_id, price, leader)
+        if proxy_bids:
+            price, leader = _record(listings, proxy_bids, now)
+            events.publish_listing(
+                listing_id,
+                "price",
+                current_price=price,
+                bid_count=listing.bid_count + len(proxy_bids),
+            )
+            notifications.bid_placed(listing_id, proxy_bids[-1])
+
+    placed = [bid for bid in proxy_bids if bid.bidder_id == user.id]
+    return BidResult(
+        BidStatus.ACCEPTED,
+        price,
+        placed[-1] if placed else None,
+        leading=leader == user.id,
+    )
+
+
+def _resolve(listing_id, price, leader):
+    """Settle the listing's maxima against its price and leading bidder.
+
+    One pass, however many maxima compete: only the two highest above the
+    price can matter. The higher one wins (the earlier set among equals) at
+    one increment over the runner-up, or over the price if it has no
+    competition, never above its own maximum. Returns the unsaved bids to
+    write, at most the runner-up's last bid at its maximum and the winner's.
+    """
+    top = (
+        ProxyBid.objects.filter(listing_id=listing_id, max_amount__gt=price)
+        .order_by("-max_amount", "updated_at", "id")
+        .values_list("bidder_id", "max_amount")
+    )
+    top = list(top[:2])
+    if not top:
+        return []
+    (winner, ceiling), runner = top[0], top[1] if len(top) > 1 else None
+    if runner is None and winner == leader:
+        return []
+
+    floor = runner[1] if runner else price
+    new_price = min(ceiling, floor + Decimal(settings.AUCTIONS_BID_INCREMENT))
+    bids = []
+    # A runner-up tied with the winner cannot bid its maximum, the winner does
+    if runner and runner[1] < new_price:
+        bids.append(Bid(listing_id=listing_id, bidder_id=runner[0], amount=runner[1]))
+    bids.append(Bid(listing_id=listing_id, bidder_id=winner, amount=new_price))
+    return bids
+
+
+def _record(listings, bids, now):
+    """Write the bids settled by _resolve, returns the new price and leader."""
+    # Both SQLite and PostgreSQL return the primary keys highest_bid needs
+    Bid.objects.bulk_create(bids)
+    top = bids[-1]
+    listings.update(
+        current_price=top.amount,
+        bid_count=F("bid_count") + len(bids),
+        highest_bid=top,
+        version=F("version") + 1,
+        updated_at=now,
+    )
+    return top.amount, top.bidder_id
+
+
+def _rejection(listing, amount, now):
+    if listing is None:
+        return BidResult(BidStatus.NOT_FOUND)
+    if not listing.is_active or (listing.ends_at and listing.ends_at <= now):
+        return BidResult(BidStatus.CLOSED, listing.current_price)
+    if amount <= listing.current_price:
+        return BidResult(BidStatus.OUTBID, listing.current_price)
+    return None
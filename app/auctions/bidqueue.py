@@ -0,0 +1,182 @@
+"""Write-behind bid ingestion for hot listings, on with AUCTIONS_BID_QUEUE.
+
+A submitted bid is one INSERT into the BidSubmission table, and the request
+answers with its id straight away. A worker per shard (manage.py
+drain_bid_queue) decides the pending submissions in batches, one transaction
+per batch: each listing is read and written once per batch rather than once
+per bid. Maximum bids answer each bid the batch accepts as they would a bid
+placed on its own, with one ranking query per accepted bid on listings that
+have maxima. Outcomes are published on the listing's event channel as they
+are decided and can be polled at /api/v1/bid-submissions/<id>.
+
+Submissions go to shard listing_id % AUCTIONS_BID_QUEUE_SHARDS, so one worker
+decides all of a listing's bids in arrival order. Change the number of shards
+only with an empty queue.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from . import events, notifications
+from .bidding import CENTS, BidStatus, _record, _rejection, _resolve
+from .models import Bid, BidSubmission, Listing, ProxyBid
+
+logger = logging.getLogger(__name__)
+
+
+def enabled():
+    return settings.AUCTIONS_BID_QUEUE
+
+
+def shard_of(listing_id):
+    return listing_id % settings.AUCTIONS_BID_QUEUE_SHARDS
+
+
+def submit(listing_id, user, amount):
+    """Queue a bid of `amount` on a listing, returns its BidSubmission."""
+    return BidSubmission.objects.create(
+        listing_id=listing_id,
+        bidder=user,
+        amount=Decimal(amount).quantize(CENTS),
+        shard=shard_of(listing_id),
+    )
+
+
+def drain(shard=0, batch_size=None):
+    """Decide the shard's pending submissions, returns how many were decided."""
+    batch_size = batch_size or settings.AUCTIONS_BID_QUEUE_BATCH_SIZE
+    decided = 0
+    while True:
+        count = _decide_batch(shard, batch_size)
+        decided += count
+        if count < batch_size:
+            return decided
+
+
+def _decide_batch(shard, batch_size):
+    queue = BidSubmission.objects.filter(shard=shard, status=BidSubmission.PENDING)
+    if not queue.exists():
+        return 0
+    now = timezone.now()
+
+    with transaction.atomic():
+        # The batch is read under the lock that decides it
+        if connection.features.has_select_for_update:
+            pending = queue.select_for_update()
+        else:
+            # Claim it first, which takes SQLite's write lock before any read
+            claimed = queue.order_by("id").values("pk")[:batch_size]
+            queue.filter(pk__in=claimed).update(processed_at=now)
+            pending = queue.filter(processed_at=now)
+        pending = list(
+            pending.order_by("id").only("listing_id", "bidder", "amount")[:batch_size]
+        )
+        by_listing = defaultdict(list)
+        for submission in pending:
+            by_listing[submission.listing_id].append(submission)
+
+        listings = Listing.objects.filter(pk__in=by_listing)
+        if connection.features.has_select_for_update_of:
+            listings = listings.select_for_update(of=("self",))
+        elif connection.features.has_select_for_update:
+            listings = listings.select_for_update()
+        state = {
+            listing.pk: listing
+            for listing in listings.only(
+                "is_active", "ends_at", "current_price", "bid_count"
+            ).annotate(
+                leader=F("highest_bid__bidder"),
+                maxima=Exists(ProxyBid.objects.filter(listing=OuterRef("pk"))),
+            )
+        }
+
+        for listing_id, submissions in by_listing.items():
+            listing = state.get(listing_id)
+            bids = []
+            for submission in submissions:
+                submission.processed_at = now
+                rejection = _rejection(listing, submission.amount, now)
+                if rejection:
+                    submission.status = rejection.status.value
+                    submission.current_price = rejection.current_price
+                    continue
+                submission.status = BidStatus.ACCEPTED.value
+                submission.bid = Bid(
+                    listing_id=listing_id,
+                    bidder_id=submission.bidder_id,
+                    amount=submission.amount,
+                )
+                bids.append(submission.bid)
+                bids += _settle(listing, submission.bid)
+                submission.current_price = listing.current_price
+            if bids:
+                _apply(listing, bids, now)
+            events.publish_listing(
+                listing_id,
+                "decided",
+                submissions={s.pk: s.status for s in submissions},
+            )
+
+        BidSubmission.objects.bulk_update(
+            pending, ["status", "bid", "current_price", "processed_at"]
+        )
+    return len(pending)
+
+
+def _settle(listing, bid):
+    """Take `bid` on the in-memory `listing` and let its maxima answer it at
+    once, as place_bid does, returns the bids they place."""
+    listing.current_price, listing.leader = bid.amount, bid.bidder_id
+    if not listing.maxima:
+        return []
+    proxy_bids = _resolve(listing.pk, listing.current_price, listing.leader)
+    if proxy_bids:
+        listing.current_price = proxy_bids[-1].amount
+        listing.leader = proxy_bids[-1].bidder_id
+    return proxy_bids
+
+
+def _apply(listing, bids, now):
+    price, _ = _record(Listing.objects.filter(pk=listing.pk), bids, now)
+    events.publish_listing(
+        listing.pk,
+        "price",
+        current_price=price,
+        bid_count=listing.bid_count + len(bids),
+    )
+    notifications.bid_placed(listing.pk, bids[-1])
+
+
+def prune(now=None):
+    """Delete submissions decided longer than AUCTIONS_BID_QUEUE_RETENTION ago."""
+    retention = timedelta(seconds=settings.AUCTIONS_BID_QUEUE_RETENTION)
+    before = (now or timezone.now()) - retention
+    deleted, _ = (
+        BidSubmission.objects.exclude(status=BidSubmission.PENDING)
+        .filter(processed_at__lt=before)
+        .delete()
+    )
+    return deleted
+
+
+def run(stop, shard=0, batch_size=None, interval=None):
+    """Drain the shard until the threading.Event `stop` is set, waiting
+    `interval` seconds whenever the queue is empty, and prune hourly."""
+    interval = interval or settings.AUCTIONS_BID_QUEUE_INTERVAL
+    next_prune = timezone.now()
+    while not stop.is_set():
+        if drain(shard, batch_size):
+            continue
+        if timezone.now() >= next_prune:
+            pruned = prune()
+            if pruned:
+                logger.info("Pruned %d decided bid submission(s).", pruned)
+            next_prune = timezone.now() + timedelta(hours=1)
+        stop.wait(interval)
@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from . import catalog
+from .forms import ListingImportForm
+from .models import Category, Listing
+
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+MAX_REPORTED_ERRORS = 100
+IMPORT_FIELDS = (
+    "title",
+    "description",
+    "starting_bid",
+    "image_url",
+    "category",
+    "ends_at",
+)
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "starting_bid",
+    "current_price",
+    "bid_count",
+    "image_url",
+    "category",
+    "seller",
+    "created_at",
+    "ends_at",
+    "is_active",
+)
+# Where the EXPORT_FIELDS come from
+EXPORT_VALUES = (
+    "id",
+    "title",
+    "description",
+    "starting_bid",
+    "current_price",
+    "bid_count",
+    "image_url",
+    "category__name",
+    "created_by__username",
+    "created_at",
+    "ends_at",
+    "is_active",
+)
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def format_of(filename, default="csv"):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return extension if extension in FORMATS else default
+
+
+def read_rows(lines, fmt):
+    """Yield (line number, row dict) from an iterable of text lines."""
+    try:
+        yield from _read_rows(lines, fmt)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"Unreadable {fmt} file: {e}") from e
+
+
+def _read_rows(lines, fmt):
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"Line {number}: invalid JSON: {e}") from e
+            if not isinstance(row, dict):
+                raise ImportFormatError(f"Line {number}: expected a JSON object.")
+            yield number, row
+    else:
+        raise ImportFormatError(f"Unknown format: {fmt}")
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rejected: int = 0
+    # (line number, {field: [messages]}) of the first rejected rows
+    errors: list = field(default_factory=list)
+
+
+def import_listings(rows, seller, batch_size=None, dry_run=False):
+    """Validate (line, row) pairs like ListingForm and insert the valid ones
+    as listings of `seller`, one bulk INSERT and transaction per batch.
+
+    Invalid rows are skipped and reported; batches already written stay
+    written if a later one fails.
+    """
+    batch_size = batch_size or settings.AUCTIONS_IMPORT_BATCH_SIZE
+    categories = {
+        name.lower(): pk for pk, name in Category.objects.values_list("id", "name")
+    }
+    result = ImportResult()
+    listings = _valid_listings(rows, seller, categories, result)
+
+    while batch := list(islice(listings, batch_size)):
+        if not dry_run:
+            # bulk_create skips Listing.save(), current_price is set by
+            # _valid_listings and the search index by database triggers
+            with transaction.atomic():
+                Listing.objects.bulk_create(batch)
+        result.created += len(batch)
+
+    if result.created and not dry_run:
+        catalog.invalidate()
+    return result
+
+
+def _valid_listings(rows, seller, categories, result):
+    for number, row in rows:
+        data = {name: row.get(name) or "" for name in IMPORT_FIELDS}
+        form = ListingImportForm(data, categories=categories)
+        if not form.is_valid():
+            result.rejected += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append((number, form.errors.get_json_data()))
+            continue
+        values = form.cleaned_data
+        yield Listing(
+            title=values["title"],
+            description=values["description"],
+            starting_bid=values["starting_bid"],
+            current_price=values["starting_bid"],
+            image_url=values["image_url"] or None,
+            category_id=values["category"],
+            ends_at=values["ends_at"],
+            created_by=seller,
+        )
+
+
+def export_lines(queryset, fmt, chunk_size=None):
+    """Yield `queryset`'s listings as CSV or JSON lines, a chunk of rows per
+    string, reading them from the database chunk by chunk."""
+    chunk_size = chunk_size or settings.AUCTIONS_EXPORT_CHUNK_SIZE
+    encode = _encoder(fmt)
+    yield encode(None)
+    rows = _export_values(queryset).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield "".join(encode(row) for row in chunk)
+
+
+async def aexport_lines(queryset, fmt, chunk_size=None):
+    """export_lines() for ASGI, which only streams async iterators."""
+    chunk_size = chunk_size or settings.AUCTIONS_EXPORT_CHUNK_SIZE
+    encode = _encoder(fmt)
+    yield encode(None)
+    chunk = []
+    async for row in _export_values(queryset).aiterator(chunk_size=chunk_size):
+        chunk.append(encode(row))
+        if len(chunk) == chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def _export_values(queryset):
+    # values(), not values_list(): in Django 4.2 the latter runs its query as
+    # aiterator() starts, on the event loop
+    return queryset.order_by("id").values(*EXPORT_VALUES)
+
+
+def _encoder(fmt):
+    """A function turning an _export_values() row, or None for the header,
+    into text."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def encode(row):
+            writer.writerow(
+                EXPORT_FIELDS if row is None else [row[name] for name in EXPORT_VALUES]
+            )
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+
+        return encode
+    if fmt == "jsonl":
+
+        def encode(row):
+            if row is None:
+                return ""
+            values = {
+                name: row[value] for name, value in zip(EXPORT_FIELDS, EXPORT_VALUES)
+            }
+            for name in ("starting_bid", "current_price"):
+                values[name] = str(values[name])
+            for name in ("created_at", "ends_at"):
+                if values[name] is not None:
+                    values[name] = values[name].isoformat()
+            return json.dumps(values) + "\n"
+
+        return encode
+    raise ValueError(f"Unknown format: {fmt}")
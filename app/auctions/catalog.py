@@ -0,0 +1,113 @@
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.db.models import Count, Q
+
+from .models import Category
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "auctions:catalog:generation"
+
+_lock = threading.Lock()
+_local = None  # (generation, entries) of this process
+
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    id: int
+    name: str
+    image_url: str | None
+    active_listings: int
+
+    def __str__(self):
+        return self.name
+
+
+def get_categories():
+    """All categories with their active-listing counts, ordered by name.
+
+    Read through two layers: a copy held by this process, valid as long as the
+    generation stored in the shared cache has not changed, then the shared
+    cache itself, and finally one aggregate query.
+    """
+    entries = _cached()
+    return _reload() if entries is None else entries
+
+
+async def aget_categories():
+    entries = _cached()
+    return await sync_to_async(_reload)() if entries is None else entries
+
+
+def _cached():
+    global _local
+    cache = caches[settings.AUCTIONS_CATALOG_CACHE]
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        return None
+    local = _local
+    if local is not None and local[0] == generation:
+        return local[1]
+
+    entries = cache.get(f"auctions:catalog:{generation}")
+    if entries is not None:
+        with _lock:
+            _local = (generation, entries)
+    return entries
+
+
+def _reload():
+    global _local
+    cache = caches[settings.AUCTIONS_CATALOG_CACHE]
+    cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+    generation = cache.get(GENERATION_KEY)
+
+    entries = _load()
+    cache.set(
+        f"auctions:catalog:{generation}",
+        entries,
+        settings.AUCTIONS_CATALOG_CACHE_TIMEOUT,
+    )
+    with _lock:
+        _local = (generation, entries)
+    return entries
+
+
+def category_choices():
+    return [(entry.id, entry.name) for entry in get_categories()]
+
+
+def invalidate():
+    """Start a new catalog generation, dropping every process' copy."""
+    global _local
+    caches[settings.AUCTIONS_CATALOG_CACHE].set(GENERATION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local = None
+
+
+def prewarm():
+    try:
+        get_categories()
+    except DatabaseError as e:  # e.g. not migrated yet
+        logger.warning("Could not prewarm the category catalog: %s", e)
+
+
+def _load():
+    # From the primary: a replica behind the write that just invalidated the
+    # catalog would have its stale counts cached for the new generation
+    categories = (
+        Category.objects.using(DEFAULT_DB_ALIAS)
+        .annotate(active_listings=Count("listings", filter=Q(listings__is_active=True)))
+        .order_by("name")
+    )
+    return tuple(
+        CategoryEntry(**row)
+        for row in categories.values("id", "name", "image_url", "active_listings")
+    )
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Broker:
+    """Carries events between processes, so a write in one worker reaches the
+    watchers connected to every other one.
+
+    `start` is given the hub's `deliver(channel, event)` callback, to be called
+    for every event received; `publish` sends one. A Redis or PostgreSQL
+    LISTEN/NOTIFY broker only has to implement these two methods.
+    """
+
+    def start(self, deliver):
+        raise NotImplementedError
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """Single-process broker: events go straight back to this process' hub."""
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, channel, event):
+        self.deliver(channel, event)
+
+
+class Subscription:
+    """An asyncio queue of the events published on one channel.
+
+    Slow consumers lose the oldest events rather than growing the queue.
+    """
+
+    def __init__(self, hub, channel, maxsize=100):
+        self.hub = hub
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def offer(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    """Fans events out from the broker to every subscription of a channel.
+
+    Delivery costs one thread-safe callback per event loop, however many
+    subscriptions that loop holds.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        broker.start(self.deliver)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel, event):
+        self.broker.publish(channel, event)
+
+    def deliver(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+
+        by_loop = defaultdict(list)
+        for subscription in subscriptions:
+            by_loop[subscription.loop].append(subscription)
+        for loop, batch in by_loop.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_offer_all, batch, event)
+
+
+def _offer_all(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.offer(event)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = Hub(import_string(settings.AUCTIONS_EVENT_BROKER)())
+        return _hub
+
+
+def listing_channel(listing_id):
+    return f"listing:{listing_id}"
+
+
+def publish_listing(listing_id, event_type, **data):
+    """Publish a listing event once the current transaction commits."""
+    event = {"type": event_type, "listing": listing_id, **data}
+    transaction.on_commit(lambda: get_hub().publish(listing_channel(listing_id), event))
+
+
+def format_sse(event):
+    payload = json.dumps(event, default=str, separators=(",", ":"))
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+def subscribe_listing(listing_id):
+    return get_hub().subscribe(listing_channel(listing_id))
+
+
+def is_stale(event, snapshot):
+    """Whether `event` is already reflected in `snapshot`: a listing's
+    bid_count only grows, under the lock every price change takes."""
+    return event["type"] == "price" and event["bid_count"] <= snapshot["bid_count"]
+
+
+async def stream_listing(subscription, snapshot, max_age=None):
+    """Server-Sent Events for one listing: `snapshot` first, then every event
+    published on its channel until the auction closes or `max_age` seconds
+    (AUCTIONS_EVENT_STREAM_MAX_AGE) pass.
+
+    Subscribe before reading the snapshot, or an event committed in between
+    is lost; events queued meanwhile that the snapshot already shows are
+    skipped. Django 4.2 does not tell a streaming response that its client
+    went away, so streams end on their own at `max_age` and EventSource
+    reconnects after the retry delay, with a fresh snapshot.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (max_age or settings.AUCTIONS_EVENT_STREAM_MAX_AGE)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n" + format_sse(snapshot)
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), min(KEEPALIVE_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if is_stale(event, snapshot):
+                continue
+            yield format_sse(event)
+            if event["type"] == "closed":
+                break
+    finally:
+        subscription.close()
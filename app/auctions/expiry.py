@@ -0,0 +1,86 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import catalog, events, notifications
+from .models import Listing
+
+logger = logging.getLogger(__name__)
+
+
+def close_auctions(ids):
+    """Close the still active listings among `ids` with one UPDATE, which also
+    records their winners, and announce the ones it closed once committed."""
+    now = timezone.now()
+    with transaction.atomic():
+        if not Listing.objects.filter(pk__in=ids, is_active=True).close(now):
+            return 0
+        # Not all of `ids`: another closer may have got to some of them first
+        closed = list(
+            Listing.objects.filter(pk__in=ids, closed_at=now).values_list(
+                "pk", flat=True
+            )
+        )
+        for listing_id in closed:
+            events.publish_listing(listing_id, "closed")
+        notifications.auctions_closed(closed)
+        transaction.on_commit(catalog.invalidate)
+    return len(closed)
+
+
+def close_due(now=None, batch_size=None):
+    """Close every auction whose end time has passed, a batch per transaction.
+
+    Due listings are read off the partial listing_expiry_idx in deadline
+    order, so the cost follows the number of due listings, not the table size.
+    Where the backend can, rows locked by a bid in flight are skipped and
+    picked up by the next pass.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.AUCTIONS_EXPIRY_BATCH_SIZE
+    closed = 0
+    while True:
+        with transaction.atomic():
+            due = Listing.objects.filter(is_active=True, ends_at__lte=now)
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(
+                due.order_by("ends_at").values_list("pk", flat=True)[:batch_size]
+            )
+            if ids:
+                closed += close_auctions(ids)
+        if len(ids) < batch_size:
+            return closed
+
+
+def next_deadline():
+    return (
+        Listing.objects.filter(is_active=True, ends_at__isnull=False)
+        .order_by("ends_at")
+        .values_list("ends_at", flat=True)
+        .first()
+    )
+
+
+def seconds_until_next(max_sleep, now=None):
+    """How long to sleep before the next auction ends, at most `max_sleep`
+    seconds so that listings created meanwhile with an earlier end are seen."""
+    deadline = next_deadline()
+    if deadline is None:
+        return max_sleep
+    remaining = (deadline - (now or timezone.now())) / timedelta(seconds=1)
+    return min(max(remaining, 0), max_sleep)
+
+
+def run(stop, max_sleep=None, batch_size=None):
+    """Close due auctions until the threading.Event `stop` is set, sleeping
+    until the next end time in between rather than polling."""
+    max_sleep = max_sleep or settings.AUCTIONS_EXPIRY_MAX_SLEEP
+    while not stop.is_set():
+        closed = close_due(batch_size=batch_size)
+        if closed:
+            logger.info("Closed %d expired auction(s).", closed)
+        stop.wait(seconds_until_next(max_sleep))
@@ -1,4 +1,7 @@
 from django import forms
+from django.utils import timezone
+from . import catalog
+from .bidding import BidStatus, place_bid, set_max_bid
 from .models import Category
 
 
@@ -7,6 +10,36 @@ class BidForm(forms.Form):
         max_digits=10, decimal_places=2, label="Bid ($):", min_value=0.01
     )
 
+    def place(self, listing_id, user):
+        """Place the validated bid, adding the reason to the form if rejected."""
+        result = place_bid(listing_id, user, self.cleaned_data["bid"])
+        _add_rejection(self, "bid", result)
+        return result
+
+
+class MaxBidForm(forms.Form):
+    max_bid = forms.DecimalField(
+        max_digits=10, decimal_places=2, label="Maximum bid ($):", min_value=0.01
+    )
+
+    def place(self, listing_id, user):
+        """Set the validated maximum, adding the reason to the form if rejected."""
+        result = set_max_bid(listing_id, user, self.cleaned_data["max_bid"])
+        _add_rejection(self, "max_bid", result)
+        return result
+
+
+def _add_rejection(form, field, result):
+    if result.status is BidStatus.CLOSED:
+        form.add_error(field, "The auction is closed.")
+    elif result.status is BidStatus.NOT_FOUND:
+        form.add_error(field, "The listing does not exist.")
+    elif not result.accepted:
+        form.add_error(
+            field,
+            f"Bid must be greater than the current price: {result.current_price}$.",
+        )
+
 
 class CommentForm(forms.Form):
     comment = forms.CharField(
@@ -70,3 +103,109 @@ class ListingForm(forms.Form):
         label="Category",
         widget=forms.Select(attrs={"class": "form-control"}),
     )
+    ends_at = forms.DateTimeField(
+        required=False,
+        label="Ends at",
+        widget=forms.DateTimeInput(
+            attrs={"class": "form-control", "type": "datetime-local"},
+            format="%Y-%m-%dT%H:%M",
+        ),
+        error_messages={"invalid": "Enter a valid end date and time."},
+    )
+
+    def clean_ends_at(self):
+        ends_at = self.cleaned_data["ends_at"]
+        if ends_at is not None and ends_at <= timezone.now():
+            raise forms.ValidationError("The end time must be in the future.")
+        return ends_at
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Render the choices from the cached catalog, the queryset is only
+        # hit to validate a submitted category
+        self.fields["category"].choices = [
+            ("", self.fields["category"].empty_label)
+        ] + catalog.category_choices()
+
+
+class ListingImportForm(ListingForm):
+    """One row of a bulk import, checked with the rules of ListingForm.
+
+    The category comes by name and is resolved through `categories`, a
+    {lower-cased name: id} map built once per import, so validating a row
+    runs no query.
+    """
+
+    category = forms.CharField(required=False)
+
+    def __init__(self, *args, categories, **kwargs):
+        self.categories = categories
+        # skip ListingForm.__init__, the category is not a choice field here
+        forms.Form.__init__(self, *args, **kwargs)
+
+    def clean_category(self):
+        name = self.cleaned_data["category"]
+        if not name:
+            return None
+        try:
+            return self.categories[name.lower()]
+        except KeyError:
+            raise forms.ValidationError(f"Unknown category: {name}.")
+
+
+class ListingUploadForm(forms.Form):
+    file = forms.FileField(label="CSV or JSON lines file")
+    format = forms.ChoiceField(
+        choices=[("", "From the file name"), ("csv", "CSV"), ("jsonl", "JSON lines")],
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    dry_run = forms.BooleanField(required=False, label="Only validate")
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(
+        max_length=200,
+        required=False,
+        label="Search",
+        widget=forms.TextInput(
+            attrs={"class": "form-control", "placeholder": "Search listings"}
+        ),
+    )
+    category = forms.TypedChoiceField(
+        coerce=int,
+        empty_value=None,
+        required=False,
+        label="Category",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    min_price = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        label="Min price ($)",
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+    max_price = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        required=False,
+        label="Max price ($)",
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+
+    order = forms.ChoiceField(
+        choices=[("relevance", "Best match"), ("newest", "Newest")],
+        required=False,
+        label="Sort by",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def __init__(self, *args, categories=(), **kwargs):
+        # `categories` are catalog entries, validating needs no query
+        super().__init__(*args, **kwargs)
+        self.fields["category"].choices = [("", "All categories")] + [
+            (entry.id, entry.name) for entry in categories
+        ]
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from auctions.models import Listing
+
+
+class Command(BaseCommand):
+    help = "Record the winner, final price and close time of listings closed before those were recorded."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Listings updated per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        pending = Listing.objects.filter(is_active=False, closed_at__isnull=True)
+        backfilled = 0
+        while ids := list(
+            pending.order_by("pk").values_list("pk", flat=True)[: options["batch_size"]]
+        ):
+            with transaction.atomic():
+                backfilled += Listing.objects.filter(pk__in=ids).backfill_results()
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {backfilled} listing(s)."))
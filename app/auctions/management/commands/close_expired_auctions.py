@@ -0,0 +1,35 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from auctions import expiry
+
+
+class Command(BaseCommand):
+    help = "Close auctions once their end time has passed, sleeping until the next one ends."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Close what is due now and exit."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Listings closed per transaction."
+        )
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            help="Longest wait between passes, in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            closed = expiry.close_due(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Closed {closed} auction(s)."))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write("Closing expired auctions, stop with Ctrl-C.")
+        expiry.run(stop, options["max_sleep"], options["batch_size"])
@@ -0,0 +1,47 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions import bidqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Decide queued bids in batches, one worker per shard (see AUCTIONS_BID_QUEUE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--shard", type=int, default=0, help="Shard drained by this worker."
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Decide what is queued now and exit."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Submissions decided per transaction."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Wait when the queue is empty, in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        shard = options["shard"]
+        if not 0 <= shard < settings.AUCTIONS_BID_QUEUE_SHARDS:
+            raise CommandError(
+                f"--shard must be below AUCTIONS_BID_QUEUE_SHARDS "
+                f"({settings.AUCTIONS_BID_QUEUE_SHARDS})."
+            )
+        if options["once"]:
+            decided = bidqueue.drain(shard, options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Decided {decided} bid(s)."))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write(f"Draining bid queue shard {shard}, stop with Ctrl-C.")
+        bidqueue.run(stop, shard, options["batch_size"], options["interval"])
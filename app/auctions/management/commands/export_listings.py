@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.bulk import FORMATS, export_lines, format_of
+from auctions.models import Listing
+
+
+class Command(BaseCommand):
+    help = "Write listings as CSV or JSON lines, streaming them from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="File to write, - (default) for standard output.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMATS),
+            help="Default: from the file name, else csv.",
+        )
+        parser.add_argument(
+            "--active", action="store_true", help="Only active listings."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, help="Rows read per database round trip."
+        )
+
+    def handle(self, *args, **options):
+        listings = Listing.objects.all()
+        if options["active"]:
+            listings = listings.filter(is_active=True)
+
+        path = options["path"]
+        fmt = options["format"] or format_of(path)
+        lines = export_lines(listings, fmt, options["chunk_size"])
+        if path == "-":
+            for chunk in lines:
+                self.stdout.write(chunk, ending="")
+            return
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as out:
+                out.writelines(lines)
+        except OSError as e:
+            raise CommandError(e)
+        self.stderr.write(self.style.SUCCESS(f"Exported listings to {path}."))
@@ -0,0 +1,70 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.bulk import (
+    FORMATS,
+    ImportFormatError,
+    format_of,
+    import_listings,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Create listings in bulk from a CSV or JSON lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, - for standard input.")
+        parser.add_argument("--seller", required=True, help="Username of the seller.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMATS),
+            help="Default: from the file name, else csv.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Rows per INSERT and transaction."
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only validate the rows."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            seller = get_user_model().objects.get(username=options["seller"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['seller']}.")
+
+        path = options["path"]
+        fmt = options["format"] or format_of(path)
+        try:
+            if path == "-":
+                result = self._import(sys.stdin, fmt, seller, options)
+            else:
+                with open(path, newline="", encoding="utf-8") as lines:
+                    result = self._import(lines, fmt, seller, options)
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(e)
+
+        for number, errors in result.errors:
+            messages = "; ".join(
+                f"{name}: {error['message']}"
+                for name, items in errors.items()
+                for error in items
+            )
+            self.stderr.write(f"Line {number}: {messages}")
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result.created} listing(s), rejected {result.rejected}."
+            )
+        )
+
+    def _import(self, lines, fmt, seller, options):
+        return import_listings(
+            read_rows(lines, fmt),
+            seller,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from auctions.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the listing full-text search index from the listings table."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the {type(backend).__name__} search index.")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from auctions.models import Listing
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized current price, bid count, highest bid and comment count of listings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "ids", nargs="*", type=int, help="Only repair these listing ids."
+        )
+
+    def handle(self, *args, **options):
+        listings = Listing.objects.all()
+        if options["ids"]:
+            listings = listings.filter(pk__in=options["ids"])
+
+        repaired = listings.repair_aggregates()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} listing(s)."))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the request metrics histograms that the server workers saved "
+        "under AUCTIONS_METRICS_DIR, summed, in Prometheus text format."
+    )
+
+    def handle(self, *args, **options):
+        if not settings.AUCTIONS_METRICS_DIR:
+            raise CommandError(
+                "AUCTIONS_METRICS_DIR is not set: the workers keep their metrics "
+                "in memory, read them from /metrics instead."
+            )
+        aggregate = metrics.aggregate(settings.AUCTIONS_METRICS_DIR)
+        self.stdout.write(aggregate.prometheus(), ending="")
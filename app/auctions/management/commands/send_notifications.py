@@ -0,0 +1,32 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from auctions import notifications
+
+
+class Command(BaseCommand):
+    help = "Fan bid and close events out to in-app notifications and email."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Deliver what is pending now and exit."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Wait when nothing is pending, in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            delivered = notifications.deliver()
+            self.stdout.write(self.style.SUCCESS(f"Delivered {delivered} event(s)."))
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write("Sending notifications, stop with Ctrl-C.")
+        notifications.run(stop, options["interval"])
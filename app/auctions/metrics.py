@@ -0,0 +1,267 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+
+# Upper bounds of the histogram buckets, Prometheus style
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERIES_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar("auctions_request_stats", default=None)
+
+
+class RequestStats:
+    """What one request cost, filled in by the hooks below while it runs."""
+
+    def __init__(self, capture_sql=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.sql = [] if capture_sql else None
+        self._rendering = False
+
+    def server_timing(self, wall_time):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"tpl;dur={self.template_time * 1000:.1f}, "
+            f"total;dur={wall_time * 1000:.1f}"
+        )
+
+
+def begin(stats):
+    return _current.set(stats)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += perf_counter() - start
+        stats.queries += 1
+        if stats.sql is not None:
+            stats.sql.append(f"{sql}; params={params!r}" if params else sql)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None or stats._rendering:
+            return super().render(context, request)
+
+        stats._rendering = True
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += perf_counter() - start
+            stats._rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for the request metrics."""
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+
+class Registry:
+    """In-process histograms of request costs, labelled by resolved URL name."""
+
+    METRICS = {
+        "auctions_request_duration_seconds": (
+            "Wall time spent handling the request.",
+            SECONDS_BUCKETS,
+        ),
+        "auctions_request_db_seconds": (
+            "Time spent executing SQL queries.",
+            SECONDS_BUCKETS,
+        ),
+        "auctions_request_template_seconds": (
+            "Time spent rendering templates.",
+            SECONDS_BUCKETS,
+        ),
+        "auctions_request_queries": (
+            "Number of SQL queries executed.",
+            QUERIES_BUCKETS,
+        ),
+    }
+
+    COUNTERS = {
+        "auctions_card_cache_hits_total": "Listing cards served from the cache.",
+        "auctions_card_cache_misses_total": "Listing cards rendered on a cache miss.",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def observe(self, view, stats, wall_time):
+        values = {
+            "auctions_request_duration_seconds": wall_time,
+            "auctions_request_db_seconds": stats.db_time,
+            "auctions_request_template_seconds": stats.template_time,
+            "auctions_request_queries": stats.queries,
+        }
+        with self._lock:
+            for name, value in values.items():
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.METRICS[name][1])
+                self._histograms[key].observe(value)
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def counter(self, name):
+        return self._counters[name]
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters = dict.fromkeys(self.COUNTERS, 0)
+
+    def snapshot(self):
+        """Everything recorded so far, as JSON-ready data for `merge`."""
+        with self._lock:
+            return {
+                "histograms": [
+                    [name, view, histogram.counts, histogram.sum]
+                    for (name, view), histogram in self._histograms.items()
+                ],
+                "counters": dict(self._counters),
+            }
+
+    def merge(self, snapshot):
+        """Add another registry's snapshot to this one."""
+        with self._lock:
+            for name, view, counts, total in snapshot["histograms"]:
+                key = (name, view)
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self.METRICS[name][1])
+                histogram = self._histograms[key]
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+            for name, value in snapshot["counters"].items():
+                self._counters[name] += value
+
+    def prometheus(self):
+        """Render every histogram in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets) in self.METRICS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (metric, view), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    bounds = [str(b) for b in buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f'{name}_sum{{view="{view}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{view="{view}"}} {histogram.count}')
+            for name, help_text in self.COUNTERS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines.append(f"{name} {self._counters[name]}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+_snapshot = {"owner": None, "path": None, "written_at": None}
+_snapshot_lock = threading.Lock()
+
+
+def write_snapshot(force=False):
+    """Save this process's registry under AUCTIONS_METRICS_DIR.
+
+    Each process replaces its own file, at most every AUCTIONS_METRICS_INTERVAL
+    seconds unless forced. The file name is drawn once per process, so workers
+    forked from a preloading master, or reusing a dead one's pid, never share it.
+    """
+    directory = settings.AUCTIONS_METRICS_DIR
+    if not directory:
+        return
+    with _snapshot_lock:
+        now = monotonic()
+        owner = (os.getpid(), directory)
+        if _snapshot["owner"] != owner:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            name = f"{os.getpid()}-{uuid.uuid4().hex}.json"
+            _snapshot.update(owner=owner, path=Path(directory) / name)
+        elif (
+            not force
+            and now - _snapshot["written_at"] < settings.AUCTIONS_METRICS_INTERVAL
+        ):
+            return
+        _snapshot["written_at"] = now
+        path = _snapshot["path"]
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as file:
+            json.dump(registry.snapshot(), file)
+        os.replace(file.name, path)
+
+
+def aggregate(directory):
+    """A registry summing the snapshots of every process in the directory."""
+    total = Registry()
+    for path in Path(directory).glob("*.json"):
+        total.merge(json.loads(path.read_text()))
+    return total
+
+
+def exposition():
+    """The Prometheus text served by `/metrics`.
+
+    With AUCTIONS_METRICS_DIR set, the sum over every worker (this process's
+    snapshot brought up to date first); otherwise this process's registry.
+    """
+    if not settings.AUCTIONS_METRICS_DIR:
+        return registry.prometheus()
+    write_snapshot(force=True)
+    return aggregate(settings.AUCTIONS_METRICS_DIR).prometheus()
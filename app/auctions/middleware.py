@@ -0,0 +1,107 @@
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, routers
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Measure queries, DB time, template time and wall time of every request.
+
+    The figures go out as a `Server-Timing` header and into the in-process
+    histograms served by the `/metrics` view, which every worker also saves
+    under AUCTIONS_METRICS_DIR when that is set. Requests running more than
+    AUCTIONS_METRICS_SQL_LOG_THRESHOLD queries get their SQL logged.
+
+    Runs natively in both modes, so async views are not pushed to a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.AUCTIONS_METRICS_SQL_LOG_THRESHOLD
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = metrics.RequestStats(capture_sql=self.threshold is not None)
+        token = metrics.begin(stats)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end(token)
+        return self.record(request, response, stats, perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats(capture_sql=self.threshold is not None)
+        token = metrics.begin(stats)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end(token)
+        return self.record(request, response, stats, perf_counter() - start)
+
+    def record(self, request, response, stats, wall_time):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unresolved"
+        metrics.registry.observe(view, stats, wall_time)
+        metrics.write_snapshot()
+        response["Server-Timing"] = stats.server_timing(wall_time)
+
+        if self.threshold is not None and stats.queries > self.threshold:
+            logger.warning(
+                "%s %s (%s) ran %d queries:\n%s",
+                request.method,
+                request.path,
+                view,
+                stats.queries,
+                "\n".join(stats.sql),
+            )
+        return response
+
+
+class PrimaryPinMiddleware:
+    """Pin clients that just wrote to the primary database, see auctions.routers.
+
+    Placed outside SessionMiddleware, so that saving a session counts too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        writes = routers.RequestWrites()
+        token = routers.begin(writes)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.end(token)
+        return routers.pin(request, response, writes)
+
+    async def __acall__(self, request):
+        writes = routers.RequestWrites()
+        token = routers.begin(writes)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers.end(token)
+        return routers.pin(request, response, writes)
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_aggregates(apps, schema_editor):
+    Listing = apps.get_model("auctions", "Listing")
+    Bid = apps.get_model("auctions", "Bid")
+
+    bids = Bid.objects.filter(listing=OuterRef("pk"))
+    top = bids.order_by("-amount", "id")
+    counts = bids.order_by().values("listing").annotate(n=Count("id")).values("n")
+    Listing.objects.update(
+        bid_count=Coalesce(Subquery(counts), 0),
+        highest_bid=Subquery(top.values("pk")[:1]),
+        current_price=Coalesce(Subquery(top.values("amount")[:1]), F("starting_bid")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0003_alter_listing_category"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="bid_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="current_price",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="highest_bid",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="auctions.bid",
+            ),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0005_listing_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
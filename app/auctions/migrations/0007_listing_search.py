@@ -0,0 +1,101 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+import auctions.models
+
+# External-content FTS5 table over auctions_listing: it stores only the index,
+# the triggers keep it in step with every insert, update and delete.
+# `prefix` adds indexes for 2 and 3 character prefix queries and the `rank`
+# setting weighs title matches ten times description matches.
+FORWARD = [
+    """
+    CREATE VIRTUAL TABLE auctions_listing_fts USING fts5(
+        title, description,
+        content='auctions_listing', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER auctions_listing_fts_insert AFTER INSERT ON auctions_listing
+    BEGIN
+        INSERT INTO auctions_listing_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER auctions_listing_fts_delete AFTER DELETE ON auctions_listing
+    BEGIN
+        INSERT INTO auctions_listing_fts(auctions_listing_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER auctions_listing_fts_update
+    AFTER UPDATE OF title, description ON auctions_listing
+    BEGIN
+        INSERT INTO auctions_listing_fts(auctions_listing_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO auctions_listing_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO auctions_listing_fts(auctions_listing_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO auctions_listing_fts(auctions_listing_fts) VALUES ('rebuild')",
+]
+
+BACKWARD = [
+    "DROP TRIGGER IF EXISTS auctions_listing_fts_update",
+    "DROP TRIGGER IF EXISTS auctions_listing_fts_delete",
+    "DROP TRIGGER IF EXISTS auctions_listing_fts_insert",
+    "DROP TABLE IF EXISTS auctions_listing_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0006_listing_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListingSearchEntry",
+            fields=[
+                (
+                    "listing",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="auctions.listing",
+                    ),
+                ),
+                (
+                    "document",
+                    auctions.models.SearchDocumentField(
+                        db_column="auctions_listing_fts"
+                    ),
+                ),
+                ("title", models.TextField()),
+                ("description", models.TextField()),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "auctions_listing_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(run_on_sqlite(FORWARD), run_on_sqlite(BACKWARD)),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0008_listing_expiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="closed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="final_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, editable=False, max_digits=10, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                condition=models.Q(("won_by__isnull", False)),
+                fields=["won_by", "closed_at", "id"],
+                name="listing_wins_idx",
+            ),
+        ),
+    ]
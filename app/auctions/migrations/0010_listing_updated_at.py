@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0009_listing_results"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="updated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
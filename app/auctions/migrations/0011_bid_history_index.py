@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0010_listing_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["listing", "id"], name="bid_listing_history_idx"
+            ),
+        ),
+    ]
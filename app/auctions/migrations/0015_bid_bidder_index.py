@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0014_notifications"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bid",
+            index=models.Index(
+                fields=["bidder", "listing", "amount"], name="bid_bidder_listing_idx"
+            ),
+        ),
+    ]
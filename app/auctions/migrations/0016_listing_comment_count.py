@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:47
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Adding a NOT NULL column makes SQLite rebuild auctions_listing, which drops
+# the search index triggers of 0007 along with the old table. Dropping it again
+# may or may not rebuild the table, so recreate them only where missing.
+search = import_module("auctions.migrations.0007_listing_search")
+TRIGGERS = [
+    sql.replace("CREATE TRIGGER", "CREATE TRIGGER IF NOT EXISTS")
+    for sql in search.FORWARD
+    if "CREATE TRIGGER" in sql
+]
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Listing = apps.get_model("auctions", "Listing")
+    Comment = apps.get_model("auctions", "Comment")
+
+    comments = Comment.objects.filter(listing=OuterRef("pk"))
+    counts = comments.order_by().values("listing").annotate(n=Count("id")).values("n")
+    Listing.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auctions", "0015_bid_bidder_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, search.run_on_sqlite(TRIGGERS)),
+        migrations.AddField(
+            model_name="listing",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(search.run_on_sqlite(TRIGGERS), migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["listing", "created_at", "id"], name="comment_thread_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,19 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Lookup,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -14,6 +28,96 @@ class Category(models.Model):
         return self.name
 
 
+def _results():
+    top = Bid.objects.filter(pk=OuterRef("highest_bid"))
+    return {
+        "won_by": Subquery(top.values("bidder")[:1]),
+        "final_price": Subquery(top.values("amount")[:1]),
+    }
+
+
+ACTIVITY_STATES = ("winning", "outbid", "won", "lost", "selling")
+
+
+class ListingQuerySet(models.QuerySet):
+    def bump_version(self):
+        return self.update(version=F("version") + 1, updated_at=timezone.now())
+
+    def close(self, now=None):
+        """End the auctions, recording the highest bid of each as its result."""
+        # closed_at from Python rather than SQL NOW(): SQLite stores datetimes
+        # as text, and keyset pagination compares them with Django's format
+        now = now or timezone.now()
+        return self.update(
+            is_active=False,
+            closed_at=now,
+            version=F("version") + 1,
+            updated_at=now,
+            **_results(),
+        )
+
+    def backfill_results(self):
+        """Record the results of listings closed before results were recorded.
+
+        The close time is not known for those, take the end time if there was
+        one, else the time of the last bid, else the listing's creation.
+        """
+        last_bid = Bid.objects.filter(pk=OuterRef("highest_bid")).values("placed_at")
+        return self.filter(is_active=False, closed_at__isnull=True).update(
+            closed_at=Coalesce(F("ends_at"), Subquery(last_bid[:1]), F("created_at")),
+            **_results(),
+        )
+
+    def activity(self, user):
+        """The listings `user` sells or bid on, in one query however many.
+
+        Each gets the user's highest bid on it as `my_bid`, the Max of their
+        bids grouped per listing off bid_bidder_listing_idx, and its `state`
+        for them, one of ACTIVITY_STATES: whether they lead is read from the
+        listing's denormalized highest bid, not from its bids.
+        """
+        bids = Bid.objects.filter(bidder=user)
+        my_bid = (
+            bids.filter(listing=OuterRef("pk"))
+            .order_by()
+            .values("listing")
+            .annotate(top=Max("amount"))
+            .values("top")
+        )
+        state = Case(
+            When(created_by=user, then=Value("selling")),
+            When(won_by=user, then=Value("won")),
+            When(is_active=False, then=Value("lost")),
+            When(highest_bid__bidder=user, then=Value("winning")),
+            default=Value("outbid"),
+        )
+        return self.filter(
+            Q(created_by=user) | Q(pk__in=bids.values("listing"))
+        ).annotate(my_bid=Subquery(my_bid), state=state)
+
+    def repair_aggregates(self):
+        """Recompute current_price, bid_count and highest_bid from the bids
+        table, and comment_count from the comments table."""
+        bids = Bid.objects.filter(listing=OuterRef("pk"))
+        top = bids.order_by("-amount", "id")
+        counts = bids.order_by().values("listing").annotate(n=Count("id")).values("n")
+        comments = (
+            Comment.objects.filter(listing=OuterRef("pk"))
+            .order_by()
+            .values("listing")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        return self.update(
+            bid_count=Coalesce(Subquery(counts), 0),
+            comment_count=Coalesce(Subquery(comments), 0),
+            highest_bid=Subquery(top.values("pk")[:1]),
+            current_price=Coalesce(
+                Subquery(top.values("amount")[:1]), F("starting_bid")
+            ),
+        )
+
+
 class Listing(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -31,20 +135,104 @@ class Listing(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    # Closed by `manage.py close_expired_auctions` once passed, see auctions.expiry
+    ends_at = models.DateTimeField(null=True, blank=True)
+    # The result, written once by ListingQuerySet.close(): winner and final
+    # price stay empty for an auction closed without bids
+    won_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="won_listings",
+    )
+    final_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, editable=False
+    )
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Denormalized from the bids table, kept up to date when a bid is placed
+    # (see auctions.signals) and rebuilt by `manage.py repair_listing_aggregates`.
+    current_price = models.DecimalField(max_digits=10, decimal_places=2, editable=False)
+    bid_count = models.PositiveIntegerField(default=0, editable=False)
+    highest_bid = models.ForeignKey(
+        "Bid",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    # Counted by auctions.signals as comments come and go, so the listing page
+    # need not count them, and rebuilt along with the bid aggregates.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped by auctions.signals whenever what a listing card shows changes,
+    # along with updated_at (empty until the first change)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset-paginated feeds (index and category pages). Partial on
+            # is_active because Django compiles is_active=True to a bare
+            # `WHERE is_active`, which cannot seek a leading is_active column.
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(is_active=True),
+                name="listing_feed_idx",
+            ),
+            models.Index(
+                fields=["category", "created_at", "id"],
+                condition=models.Q(is_active=True),
+                name="listing_category_feed_idx",
+            ),
+            # The expiry worker's due and next-deadline queries
+            models.Index(
+                fields=["ends_at"],
+                condition=models.Q(is_active=True, ends_at__isnull=False),
+                name="listing_expiry_idx",
+            ),
+            # A user's won auctions, most recently closed first
+            models.Index(
+                fields=["won_by", "closed_at", "id"],
+                condition=models.Q(won_by__isnull=False),
+                name="listing_wins_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    def highest_bid(self):
-        return self.bids.order_by("-amount").first()
+    # Written with set-based UPDATEs only, a full save() must not clobber them
+    # with the possibly stale values loaded along with the instance.
+    DERIVED_FIELDS = (
+        "current_price",
+        "bid_count",
+        "highest_bid",
+        "comment_count",
+        "version",
+        "updated_at",
+        "won_by",
+        "final_price",
+        "closed_at",
+    )
 
-    def current_price(self):
-        highest_bid = self.highest_bid()
-        return highest_bid.amount if highest_bid else self.starting_bid
+    def save(self, *args, **kwargs):
+        if self.current_price is None:
+            self.current_price = self.starting_bid
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DERIVED_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def winner(self, user):
-        highest_bid = self.bids.order_by("-amount").first()
-        return not self.is_active and highest_bid and highest_bid.bidder == user
+        return self.won_by_id is not None and self.won_by_id == user.id
 
 
 class Bid(models.Model):
@@ -53,10 +241,170 @@ class Bid(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     placed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A listing's bid history read from an id onwards
+            models.Index(fields=["listing", "id"], name="bid_listing_history_idx"),
+            # A user's bids per listing and their highest, for the dashboard
+            models.Index(
+                fields=["bidder", "listing", "amount"], name="bid_bidder_listing_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.bidder.username}: {self.amount} on {self.listing.title}"
 
 
+class ProxyBid(models.Model):
+    """A bidder's maximum on a listing, bid up to on their behalf by
+    auctions.bidding as little at a time as it takes to lead."""
+
+    listing = models.ForeignKey(
+        Listing, on_delete=models.CASCADE, related_name="proxy_bids"
+    )
+    bidder = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="proxy_bids"
+    )
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "bidder"], name="proxy_bid_one_per_bidder"
+            ),
+        ]
+        indexes = [
+            # A listing's highest maxima, the earliest set first among equals
+            models.Index(
+                fields=["listing", "-max_amount", "updated_at"],
+                name="proxy_bid_rank_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.bidder.username}: up to {self.max_amount} on {self.listing.title}"
+        )
+
+
+class BidSubmission(models.Model):
+    """A bid waiting in the write-behind queue, then the decision on it.
+
+    auctions.bidqueue appends these and a worker per shard applies them in
+    batches; the id is the acknowledgement clients poll with.
+    """
+
+    PENDING = "pending"
+    STATUSES = [
+        (PENDING, "Pending"),
+        ("accepted", "Accepted"),
+        ("outbid", "Outbid"),
+        ("closed", "Closed"),
+        ("not_found", "Not found"),
+    ]
+
+    listing_id = models.IntegerField()
+    bidder = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="bid_submissions"
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    shard = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    bid = models.ForeignKey(
+        Bid, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    current_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    submitted_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # A shard's queue, oldest first, small whatever the history
+            models.Index(
+                fields=["shard", "id"],
+                name="bid_submission_queue_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bidder_id}: {self.amount} on {self.listing_id} ({self.status})"
+
+
+class NotificationEvent(models.Model):
+    """A bid or a close waiting to be fanned out to the users it concerns,
+    see auctions.notifications. `bid` is the listing's highest bid after it."""
+
+    BID = "bid"
+    CLOSED = "closed"
+    KINDS = [(BID, "Bid"), (CLOSED, "Closed")]
+
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=10, choices=KINDS)
+    bid = models.ForeignKey(
+        Bid, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # An auction closes once, whoever closes it
+            models.UniqueConstraint(
+                fields=["listing"],
+                condition=models.Q(kind="closed"),
+                name="notification_event_one_close",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                name="notification_event_queue_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+
+class Notification(models.Model):
+    KINDS = [
+        ("outbid", "You were outbid"),
+        ("new_bid", "New bid on your listing"),
+        ("watched_bid", "New bid on a watched listing"),
+        ("won", "You won"),
+        ("sold", "Your auction closed"),
+        ("watched_closed", "A watched auction closed"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications"
+    )
+    event = models.ForeignKey(
+        NotificationEvent, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=KINDS)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Re-running an interrupted fan-out notifies nobody twice
+            models.UniqueConstraint(
+                fields=["event", "user"], name="notification_once_per_event"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-id"], name="notification_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.get_kind_display()} ({self.listing_id})"
+
+
 class Comment(models.Model):
     listing = models.ForeignKey(
         Listing, on_delete=models.CASCADE, related_name="comments"
@@ -67,6 +415,14 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A listing's comments newest first, keyset paginated
+            models.Index(
+                fields=["listing", "created_at", "id"], name="comment_thread_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.commenter.username} on {self.listing.title}"
 
@@ -81,3 +437,44 @@ class Watchlist(models.Model):
 
     def __str__(self):
         return f"{self.user.username}'s Watchlist"
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden column named after an FTS5 table, which matches a query
+    against all of its indexed columns."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class ListingSearchEntry(models.Model):
+    """Row of the SQLite FTS5 index over listing titles and descriptions.
+
+    The virtual table is created by migration 0007 on SQLite only and kept in
+    sync with auctions_listing by triggers, so bulk writes and queryset
+    updates are indexed too. See auctions.search.
+    """
+
+    listing = models.OneToOneField(
+        Listing,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_entry",
+    )
+    document = SearchDocumentField(db_column="auctions_listing_fts")
+    title = models.TextField()
+    description = models.TextField()
+    # bm25() of the row against the MATCH query, lower is better
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "auctions_listing_fts"
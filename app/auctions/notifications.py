@@ -0,0 +1,171 @@
+"""In-app and email notifications of bids and closes.
+
+Bidding and closing only record a NotificationEvent in their transaction, one
+INSERT however many users watch the listing. A worker (manage.py
+send_notifications) fans each event out:
+
+    a bid    the previous high bidder (outbid), the seller, the watchers
+    a close  the winner, the seller, the watchers
+
+Recipients are read with one set-based query per chunk of
+AUCTIONS_NOTIFICATION_CHUNK_SIZE users, in id order. Each chunk's
+notifications are written with one bulk_create in a transaction of its own,
+and its emails are sent over one email backend connection. Users an event
+already reached are left out, so a fan-out rerun after a failure emails
+nobody twice. Memory stays bounded by the chunk size, and SQLite's writer is
+never held for a whole fan-out.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Bid, Notification, NotificationEvent, User, Watchlist
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS = {
+    "outbid": "You were outbid on {title}",
+    "new_bid": "New bid on your listing {title}",
+    "watched_bid": "New bid on {title}",
+    "won": "You won {title}",
+    "sold": "Your auction {title} has closed",
+    "watched_closed": "The auction for {title} has closed",
+}
+
+
+def bid_placed(listing_id, bid):
+    """Record that `bid` is the listing's new highest bid."""
+    NotificationEvent.objects.create(
+        listing_id=listing_id, kind=NotificationEvent.BID, bid=bid
+    )
+
+
+def auctions_closed(ids):
+    """Record that the listings `ids` closed, once each."""
+    NotificationEvent.objects.bulk_create(
+        [NotificationEvent(listing_id=i, kind=NotificationEvent.CLOSED) for i in ids],
+        ignore_conflicts=True,
+    )
+
+
+def deliver(batch_size=None, chunk_size=None):
+    """Fan out the pending events, oldest first, returns how many."""
+    batch_size = batch_size or settings.AUCTIONS_NOTIFICATION_BATCH_SIZE
+    delivered = 0
+    while True:
+        pending = list(
+            NotificationEvent.objects.filter(processed_at__isnull=True)
+            .select_related("listing", "bid")
+            .order_by("id")[:batch_size]
+        )
+        for event in pending:
+            _fan_out(event, chunk_size or settings.AUCTIONS_NOTIFICATION_CHUNK_SIZE)
+            NotificationEvent.objects.filter(pk=event.pk).update(
+                processed_at=timezone.now()
+            )
+        delivered += len(pending)
+        if len(pending) < batch_size:
+            return delivered
+
+
+def recipients(event):
+    """The users `event` concerns as (id, email, kind) rows, by id.
+
+    Outbid on a bid are the bidders of every bid since the one the listing's
+    previous bid event was about (or else since the bid before), however many
+    the bid queue or maximum bids placed in between.
+    """
+    listing = event.listing
+    seller = Q(pk=listing.created_by_id)
+    watchers = Q(pk__in=Watchlist.objects.filter(listings=listing.pk).values("user"))
+    if event.kind == NotificationEvent.BID:
+        bids = Bid.objects.filter(listing_id=listing.pk, id__lt=event.bid_id)
+        start = (
+            NotificationEvent.objects.filter(
+                listing_id=listing.pk, kind=NotificationEvent.BID, id__lt=event.pk
+            )
+            .order_by("-id")
+            .values_list("bid_id", flat=True)
+            .first()
+        ) or bids.order_by("-id").values_list("id", flat=True).first()
+        since = bids.filter(id__gte=start) if start else Bid.objects.none()
+        outbid = Q(pk__in=since.values("bidder"))
+        kinds = [(outbid, "outbid"), (seller, "new_bid"), (watchers, "watched_bid")]
+        users = User.objects.exclude(pk=event.bid.bidder_id)
+    else:
+        winner = Q(pk=listing.won_by_id) if listing.won_by_id else Q(pk__in=())
+        kinds = [(winner, "won"), (seller, "sold"), (watchers, "watched_closed")]
+        users = User.objects.all()
+
+    concerned = Q()
+    for condition, _ in kinds:
+        concerned |= condition
+    kind = Case(*[When(condition, then=Value(kind)) for condition, kind in kinds])
+    return (
+        users.filter(concerned)
+        .annotate(kind=kind)
+        .order_by("pk")
+        .values_list("pk", "email", "kind")
+    )
+
+
+def _fan_out(event, chunk_size):
+    listing = event.listing
+    amount = event.bid.amount if event.bid else listing.final_price
+    notified = Notification.objects.filter(event_id=event.pk).values("user_id")
+    rows = recipients(event).exclude(pk__in=notified)
+    last = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last)[:chunk_size])
+        if not chunk:
+            return
+        with transaction.atomic():
+            Notification.objects.bulk_create(
+                [
+                    Notification(
+                        user_id=user,
+                        event_id=event.pk,
+                        listing_id=listing.pk,
+                        kind=kind,
+                        amount=amount,
+                    )
+                    for user, _, kind in chunk
+                ],
+                ignore_conflicts=True,
+            )
+        _email(listing, amount, chunk)
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1][0]
+
+
+def _email(listing, amount, chunk):
+    kinds = settings.AUCTIONS_NOTIFICATION_EMAIL_KINDS
+    url = settings.AUCTIONS_SITE_URL + reverse("listing", args=[listing.pk])
+    messages = []
+    for _, email, kind in chunk:
+        if email and kind in kinds:
+            subject = SUBJECTS[kind].format(title=listing.title)
+            price = f"Price: {amount}$\n" if amount is not None else ""
+            messages.append(EmailMessage(subject, f"{price}{url}\n", to=[email]))
+    if not messages:
+        return
+    try:
+        get_connection().send_messages(messages)
+    except Exception:  # the in-app notifications are written, carry on
+        logger.exception("Sending %d notification email(s) failed.", len(messages))
+
+
+def run(stop, interval=None):
+    """Deliver events until the threading.Event `stop` is set, waiting
+    `interval` seconds whenever none are pending."""
+    interval = interval or settings.AUCTIONS_NOTIFICATION_INTERVAL
+    while not stop.is_set():
+        if not deliver():
+            stop.wait(interval)
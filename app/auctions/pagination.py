@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Page:
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def page_size_from(request):
+    """The `page_size` query parameter, clamped to AUCTIONS_MAX_PAGE_SIZE."""
+    try:
+        size = int(request.GET.get("page_size", settings.AUCTIONS_PAGE_SIZE))
+    except ValueError:
+        size = settings.AUCTIONS_PAGE_SIZE
+    return max(1, min(size, settings.AUCTIONS_MAX_PAGE_SIZE))
+
+
+class KeysetPaginator:
+    """Seek pagination over a queryset ordered by `keys`, newest (largest) first.
+
+    Each page is fetched with a `WHERE (keys) < (cursor)` range condition on an
+    index instead of OFFSET, so page 1000 costs as much as page 1. Cursors are
+    opaque url-safe strings carrying the direction, the boundary row's keys and
+    the page size. Keys may be model fields or annotations of the queryset,
+    which may also be a .values() queryset.
+    """
+
+    def __init__(self, queryset, keys=("created_at", "id"), page_size=None):
+        self.queryset = queryset
+        self.keys = keys
+        self.page_size = page_size or settings.AUCTIONS_PAGE_SIZE
+
+    def page(self, cursor=None):
+        query, size, direction = self._query(cursor)
+        return self._build(list(query), size, direction, cursor)
+
+    async def apage(self, cursor=None):
+        query, size, direction = self._query(cursor)
+        return self._build([row async for row in query], size, direction, cursor)
+
+    def _query(self, cursor):
+        """The slice to fetch: one row more than the page, to tell if there
+        are further rows in the direction of travel."""
+        if not cursor:
+            direction, size, rows = "next", self.page_size, self.queryset
+        else:
+            direction, values, size = self.decode(cursor)
+            lookup = "lt" if direction == "next" else "gt"
+            rows = self.queryset.filter(self._seek(values, lookup))
+
+        if direction == "next":
+            ordering = [f"-{key}" for key in self.keys]
+        else:
+            ordering = self.keys
+        return rows.order_by(*ordering)[: size + 1], size, direction
+
+    def _build(self, rows, size, direction, cursor):
+        more = len(rows) > size
+        items = rows[:size]
+        if direction == "next":
+            return self._page(items, size, has_next=more, has_prev=bool(cursor))
+        return self._page(items[::-1], size, has_next=True, has_prev=more)
+
+    def _page(self, items, size, has_next, has_prev):
+        return Page(
+            items,
+            next_cursor=(
+                self.encode("next", items[-1], size) if items and has_next else None
+            ),
+            prev_cursor=(
+                self.encode("prev", items[0], size) if items and has_prev else None
+            ),
+        )
+
+    def _seek(self, values, lookup):
+        # (a, b) < (x, y)  <=>  a <= x AND (a < x OR (a = x AND b < y)),
+        # the leading a <= x gives the planner an index range to seek into.
+        condition = Q()
+        for i, key in enumerate(self.keys):
+            equal = dict(zip(self.keys[:i], values[:i]))
+            condition |= Q(**equal, **{f"{key}__{lookup}": values[i]})
+        return Q(**{f"{self.keys[0]}__{lookup}e": values[0]}) & condition
+
+    def encode(self, direction, item, size):
+        values = [self._string(key, item) for key in self.keys]
+        payload = json.dumps([direction, values, size], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, values, size = json.loads(base64.urlsafe_b64decode(padded))
+            values = [self._field(k).to_python(v) for k, v in zip(self.keys, values)]
+            size = max(1, min(int(size), settings.AUCTIONS_MAX_PAGE_SIZE))
+        except (binascii.Error, ValidationError, ValueError, TypeError) as e:
+            raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+        if direction not in ("next", "prev") or len(values) != len(self.keys):
+            raise InvalidCursor(f"Invalid cursor: {cursor}")
+        return direction, values, size
+
+    def _field(self, key):
+        annotation = self.queryset.query.annotations.get(key)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(key)
+
+    def _string(self, key, item):
+        if isinstance(item, dict):
+            value = item[key]
+            return value.isoformat() if hasattr(value, "isoformat") else str(value)
+        if key in self.queryset.query.annotations:
+            return str(getattr(item, key))
+        return self._field(key).value_to_string(item)
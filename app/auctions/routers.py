@@ -0,0 +1,111 @@
+"""Send the browse pages' reads to read replicas, everything else to the primary.
+
+Views opt in with @replica_reads. A request that writes through the ORM
+pins its client to the primary for AUCTIONS_PRIMARY_PIN_SECONDS, with a
+cookie set by PrimaryPinMiddleware, so a bidder's next pages are read where
+their bid was written whatever the replicas' lag. Replica aliases are listed
+in AUCTIONS_READ_REPLICAS; without any, everything stays on the primary.
+"""
+
+import functools
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = "auctions_primary_until"
+
+_replica = ContextVar("auctions_read_replica", default=None)
+_writes = ContextVar("auctions_request_writes", default=None)
+
+
+class RequestWrites:
+    """Whether the current request wrote, shared with the threads its async
+    views run queries in (they get a copy of the context, not of this)."""
+
+    wrote = False
+
+
+class ReplicaRouter:
+    # Sessions are read right after login writes them
+    PRIMARY_APPS = {"sessions"}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        writes = _writes.get()
+        if writes is not None:
+            writes.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the primary's rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.AUCTIONS_READ_REPLICAS else None
+
+
+def begin(writes):
+    return _writes.set(writes)
+
+
+def end(token):
+    _writes.reset(token)
+
+
+def pin(request, response, writes):
+    """Pin the client to the primary if the request wrote."""
+    if writes.wrote and settings.AUCTIONS_READ_REPLICAS:
+        seconds = settings.AUCTIONS_PRIMARY_PIN_SECONDS
+        response.set_cookie(
+            PIN_COOKIE,
+            str(int(time.time() + seconds)),
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def _choose(request):
+    replicas = settings.AUCTIONS_READ_REPLICAS
+    if not replicas:
+        return None
+    try:
+        if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+            return None
+    except ValueError:
+        pass
+    return random.choice(replicas)  # nosec B311 - spreads load, not a secret
+
+
+def replica_reads(view):
+    """Run the view's reads on a replica unless its client is pinned."""
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            token = _replica.set(_choose(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica.reset(token)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            token = _replica.set(_choose(request))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _replica.reset(token)
+
+    return wrapper
@@ -0,0 +1,110 @@
+import re
+from functools import cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.utils.module_loading import import_string
+
+from .models import Listing
+
+MAX_TERMS = 8
+TERM_RE = re.compile(r"\w+")
+
+# Keyset pagination keys of each result order, see search_listings()
+ORDERINGS = {"relevance": ("score", "id"), "newest": ("match_id",)}
+
+
+def parse_terms(text):
+    """The words of a free-text query, lower-cased, at most MAX_TERMS."""
+    return TERM_RE.findall((text or "").lower())[:MAX_TERMS]
+
+
+class SearchBackend:
+    """Narrow a Listing queryset down to the rows matching every term, each
+    term also matching as a word prefix, and annotate them with the keys of
+    ORDERINGS[order]: a `score`, higher is more relevant, or a `match_id`, the
+    listing id in the order the index yields it. Set AUCTIONS_SEARCH_BACKEND
+    to plug in another backend.
+    """
+
+    def search(self, queryset, terms, order):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Rebuild the index from the listings table, if there is one."""
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """FTS5 index from migration 0007, ranked by bm25 with titles weighted up.
+
+    bm25 needs every match counted and scored before the first row comes out,
+    so relevance-ordered queries cost in proportion to their number of matches.
+    Ordering on the index rowid streams matches newest first and stops at the
+    page size, as long as no rank is selected along.
+    """
+
+    table = "auctions_listing_fts"
+
+    def search(self, queryset, terms, order):
+        # quoted so that FTS5 operators and column filters in user input are
+        # taken as plain words, `*` makes each a prefix query
+        query = " ".join(f'"{term}"*' for term in terms)
+        matches = queryset.filter(search_entry__document__match=query)
+        if order == "newest":
+            return matches.annotate(match_id=F("search_entry__pk"))
+        return matches.annotate(
+            score=ExpressionWrapper(-F("search_entry__rank"), output_field=FloatField())
+        )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for command in ("rebuild", "optimize"):
+                cursor.execute(
+                    f"INSERT INTO {self.table}({self.table}) VALUES (%s)",  # nosec B608
+                    [command],
+                )
+
+
+class ContainsBackend(SearchBackend):
+    """Unindexed fallback for other databases: substring matches, unranked."""
+
+    def search(self, queryset, terms, order):
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(description__icontains=term)
+        return _unranked(queryset.filter(condition), order)
+
+
+def _unranked(queryset, order):
+    if order == "newest":
+        return queryset.annotate(match_id=F("id"))
+    return queryset.annotate(score=Value(0.0, output_field=FloatField()))
+
+
+@cache
+def get_backend():
+    if settings.AUCTIONS_SEARCH_BACKEND:
+        return import_string(settings.AUCTIONS_SEARCH_BACKEND)()
+    if connection.vendor == "sqlite":
+        return SQLiteFTSBackend()
+    return ContainsBackend()
+
+
+def search_listings(
+    text, order="relevance", category=None, min_price=None, max_price=None
+):
+    """Active listings matching `text` and the filters, to be keyset-paginated
+    on ORDERINGS[order]. Without any search terms every listing scores 0."""
+    listings = Listing.objects.filter(is_active=True)
+    if category is not None:
+        listings = listings.filter(category=category)
+    if min_price is not None:
+        listings = listings.filter(current_price__gte=min_price)
+    if max_price is not None:
+        listings = listings.filter(current_price__lte=max_price)
+
+    terms = parse_terms(text)
+    if not terms:
+        return _unranked(listings, order)
+    return get_backend().search(listings, terms, order)
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import catalog, watchlist
+from .models import Bid, Category, Comment, Listing, Watchlist
+
+
+@receiver(post_delete, sender=Bid)
+def forget_bid(sender, instance, **kwargs):
+    listings = Listing.objects.filter(pk=instance.listing_id)
+    listings.repair_aggregates()
+    listings.bump_version()
+
+
+@receiver(post_save, sender=Comment)
+def comment_added(sender, instance, created, **kwargs):
+    if created:
+        Listing.objects.filter(pk=instance.listing_id).update(
+            comment_count=F("comment_count") + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Listing.objects.filter(pk=instance.listing_id, comment_count__gt=0).update(
+        comment_count=F("comment_count") - 1
+    )
+
+
+# Listing versions key the rendered card cache (see templatetags/cards.py), so
+# anything shown on a card must bump the version of the listings it touches.
+
+
+@receiver(post_save, sender=Bid)
+def bid_placed(sender, instance, created, **kwargs):
+    if created:
+        Listing.objects.filter(pk=instance.listing_id).bump_version()
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved(sender, instance, created, **kwargs):
+    if not created:
+        Listing.objects.filter(pk=instance.pk).bump_version()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    Listing.objects.filter(category=instance).bump_version()
+
+
+# The cached category catalog (auctions/catalog.py) holds active-listing counts
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Listing)
+@receiver(post_delete, sender=Listing)
+def catalog_changed(sender, **kwargs):
+    # After commit, or another request could cache the old rows anew
+    transaction.on_commit(catalog.invalidate)
+
+
+# Cached watchlist membership (auctions/watchlist.py); watchlist.toggle keeps
+# it current itself, any other change drops it
+
+
+@receiver(m2m_changed, sender=Watchlist.listings.through)
+def watchlist_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            user_ids = [instance.user_id]
+        else:
+            return
+    elif action in ("post_add", "post_remove"):
+        user_ids = list(
+            Watchlist.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+        )
+    elif action == "pre_clear":
+        user_ids = list(instance.watchlisted_by.values_list("user_id", flat=True))
+    else:
+        return
+    transaction.on_commit(lambda: watchlist.forget(*user_ids))
+
+
+@receiver(post_delete, sender=Watchlist)
+def watchlist_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: watchlist.forget(instance.user_id))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.AUCTIONS_SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,42 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.html import format_html_join
+
+from auctions import metrics
+
+register = template.Library()
+
+
+def card_key(listing):
+    return f"auctions:card:{listing.pk}:{listing.version}"
+
+
+@register.simple_tag
+def listing_cards(listings):
+    """Render the cards of `listings`, reusing cached fragments.
+
+    Cards are cached per listing id and version, the version being bumped by
+    auctions.signals whenever something a card shows changes, so stale cards
+    are never looked up again and simply expire. One get_many per page.
+    """
+    cache = caches[settings.AUCTIONS_CARD_CACHE]
+    listings = list(listings)
+    cached = cache.get_many([card_key(listing) for listing in listings])
+
+    cards, missed = [], {}
+    for listing in listings:
+        key = card_key(listing)
+        if key not in cached:
+            cached[key] = missed[key] = render_to_string(
+                "auctions/card.html", {"entry": listing}
+            )
+        cards.append(cached[key])
+
+    if missed:
+        cache.set_many(missed, settings.AUCTIONS_CARD_CACHE_TIMEOUT)
+    metrics.registry.inc("auctions_card_cache_hits_total", len(cards) - len(missed))
+    metrics.registry.inc("auctions_card_cache_misses_total", len(missed))
+    # Rendered cards are SafeStrings, anything else would get escaped
+    return format_html_join("", "{}", ((card,) for card in cards))
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.index, name="index"),
@@ -8,8 +8,11 @@ urlpatterns = [
     path("logout", views.logout_view, name="logout"),
     path("register", views.register, name="register"),
     path("listing", views.create_listing_view, name="create_listing"),
+    path("listings/import", views.import_listings_view, name="import_listings"),
+    path("listings/export", views.export_listings_view, name="export_listings"),
     path("listings/<int:id>", views.listing_view, name="listing"),
     path("listings/<int:id>/close", views.listing_close_view, name="close_listing"),
+    path("listings/<int:id>/events", views.listing_events_view, name="listing_events"),
     path(
         "listings/<int:id>/watchlist",
         views.listing_watchlist_view,
@@ -17,5 +20,25 @@ urlpatterns = [
     ),
     path("categories", views.categories_view, name="categories"),
     path("categories/<int:id>", views.category_view, name="category"),
+    path("search", views.search_view, name="search"),
     path("watchlist", views.watchlist_view, name="watchlist"),
+    path("dashboard", views.dashboard_view, name="dashboard"),
+    path("wins", views.wins_view, name="wins"),
+    path("notifications", views.notifications_view, name="notifications"),
+    path("metrics", views.metrics_view, name="metrics"),
+    # JSON API, see auctions/api.py
+    path("api/v1/listings", api.listings, name="api_listings"),
+    path("api/v1/listings/<int:id>", api.listing, name="api_listing"),
+    path("api/v1/listings/<int:id>/bids", api.bids, name="api_bids"),
+    path("api/v1/listings/<int:id>/max-bid", api.max_bid, name="api_max_bid"),
+    path("api/v1/listings/<int:id>/comments", api.comments, name="api_comments"),
+    path(
+        "api/v1/bid-submissions/<int:id>",
+        api.bid_submission,
+        name="api_bid_submission",
+    ),
+    path("api/v1/notifications", api.notifications, name="api_notifications"),
+    path("api/v1/categories", api.categories, name="api_categories"),
+    path("api/v1/watchlist", api.watched_listings, name="api_watchlist"),
+    path("api/v1/watchlist/<int:id>", api.watch_listing, name="api_watchlist_listing"),
 ]
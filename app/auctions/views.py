@@ -1,17 +1,54 @@
+import io
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.db import IntegrityError
-from django.http import HttpResponseRedirect
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpResponse,
+    HttpResponseNotFound,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.decorators import login_required
-from .forms import BidForm, CommentForm, ListingForm
-from .models import User, Listing, Category, Bid, Comment, Watchlist
-
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.admin.views.decorators import staff_member_required
+from . import bidqueue, bulk, catalog, events, metrics, watchlist
+from .auth import aget_user
+from .expiry import close_auctions
+from .forms import (
+    BidForm,
+    CommentForm,
+    ListingForm,
+    ListingUploadForm,
+    MaxBidForm,
+    SearchForm,
+)
+from .pagination import InvalidCursor, KeysetPaginator, page_size_from
+from .routers import replica_reads
+from .search import ORDERINGS, search_listings
+from .models import ACTIVITY_STATES, User, Listing, Category, Comment, Notification
+
+
+@replica_reads
+async def index(request):
+    paginator = KeysetPaginator(
+        Listing.objects.filter(is_active=True), page_size=page_size_from(request)
+    )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
 
-def index(request):
-    listings = Listing.objects.filter(is_active=True)
-    return render(request, "auctions/index.html", {"listings": listings})
+    await aget_user(request)
+    return render(request, "auctions/index.html", {"listings": page, "page": page})
 
 
 @login_required
@@ -24,6 +61,7 @@ def create_listing_view(request):
             starting_bid = form.cleaned_data["starting_bid"]
             image_url = form.cleaned_data["image_url"]
             category = form.cleaned_data["category"]
+            ends_at = form.cleaned_data["ends_at"]
 
             try:
                 new_listing = Listing.objects.create(
@@ -32,6 +70,7 @@ def create_listing_view(request):
                     starting_bid=starting_bid,
                     image_url=image_url or None,
                     category=category,
+                    ends_at=ends_at,
                     created_by=request.user,
                 )
                 messages.success(request, "Listing created successfully!")
@@ -49,10 +88,13 @@ def create_listing_view(request):
     return render(request, "auctions/create_listing.html", {"form": form})
 
 
-def listing_view(request, id):
+async def listing_view(request, id):
+    user = await aget_user(request)
     try:
-        listing = get_object_or_404(Listing, id=id)
-    except Exception as e:
+        listing = await Listing.objects.select_related(
+            "created_by", "category", "highest_bid"
+        ).aget(id=id)
+    except Listing.DoesNotExist as e:
         return render(
             request,
             "auctions/error.html",
@@ -61,54 +103,102 @@ def listing_view(request, id):
 
     bid_form = BidForm()
     bid_label = bid_form.fields["bid"].label
-    bid_label += f" {listing.bids.count()} bid(s) sor far now."
-    highest_bid = listing.highest_bid()
+    bid_label += f" {listing.bid_count} bid(s) sor far now."
+    highest_bid = listing.highest_bid
 
-    if highest_bid and highest_bid.bidder == request.user:
+    if highest_bid and highest_bid.bidder_id == user.id:
         bid_label += " Your bid is the current bid."
 
     bid_form.fields["bid"].label = bid_label
 
+    max_bid_form = MaxBidForm()
     comment_form = CommentForm()
 
-    winner = listing.winner(request.user)
-
-    if request.method == "POST" and request.user.is_authenticated:
-        if "bid" in request.POST:
-            bid_form = BidForm(request.POST)
-            if bid_form.is_valid():
-                bid = bid_form.cleaned_data["bid"]
-                if bid > listing.current_price():
-                    Bid.objects.create(listing=listing, bidder=request.user, amount=bid)
-                    messages.success(request, "Your bid was successfully placed!")
-                    return redirect("listing", id=id)
-                else:
-                    bid_form.add_error(
-                        "bid",
-                        f"Bid must be greater than the current price: {listing.current_price()}$.",
-                    )
-        elif "comment" in request.POST:
-            comment_form = CommentForm(request.POST)
-            if comment_form.is_valid():
-                comment_text = comment_form.cleaned_data["comment"]
-                Comment.objects.create(
-                    listing=listing, commenter=request.user, content=comment_text
-                )
-                messages.success(request, "Your comment was added!")
-                return redirect("listing", id=id)
+    winner = listing.winner(user)
+
+    if request.method == "POST" and user.is_authenticated:
+        response, bid_form, max_bid_form, comment_form = await sync_to_async(
+            _listing_post
+        )(request, listing, bid_form, max_bid_form, comment_form)
+        if response is not None:
+            return response
+
+    # Everything the template needs: the newest page of comments with their
+    # commenters in one query, older ones load from the API, and watchlist
+    # membership from the user's cached watched ids
+    comments = await KeysetPaginator(
+        Comment.objects.filter(listing_id=listing.id)
+        .select_related("commenter")
+        .only("content", "created_at", "commenter__username"),
+        page_size=settings.AUCTIONS_COMMENT_PAGE_SIZE,
+    ).apage()
+    in_watchlist = user.is_authenticated and await watchlist.ais_watched(
+        user.id, listing.id
+    )
 
     return render(
         request,
         "auctions/listing.html",
         {
             "listing": listing,
+            "comments": comments,
             "bid_form": bid_form,
+            "max_bid_form": max_bid_form,
             "comment_form": comment_form,
             "winner": winner,
+            "in_watchlist": in_watchlist,
         },
     )
 
 
+def _listing_post(request, listing, bid_form, max_bid_form, comment_form):
+    response = None
+    if "bid" in request.POST:
+        bid_form = BidForm(request.POST)
+        if bid_form.is_valid() and bidqueue.enabled():
+            amount = bid_form.cleaned_data["bid"]
+            bidqueue.submit(listing.id, request.user, amount)
+            messages.info(request, "Your bid is queued, it will show here in a moment.")
+            response = redirect("listing", id=listing.id)
+        elif bid_form.is_valid():
+            result = bid_form.place(listing.id, request.user)
+            if result.accepted:
+                _bid_message(request, result, "Your bid was successfully placed!")
+                response = redirect("listing", id=listing.id)
+    elif "max_bid" in request.POST:
+        max_bid_form = MaxBidForm(request.POST)
+        if max_bid_form.is_valid():
+            result = max_bid_form.place(listing.id, request.user)
+            if result.accepted:
+                _bid_message(
+                    request,
+                    result,
+                    f"Your maximum bid is set, you lead at {result.current_price}$.",
+                )
+                response = redirect("listing", id=listing.id)
+    elif "comment" in request.POST:
+        comment_form = CommentForm(request.POST)
+        if comment_form.is_valid():
+            comment_text = comment_form.cleaned_data["comment"]
+            Comment.objects.create(
+                listing=listing, commenter=request.user, content=comment_text
+            )
+            messages.success(request, "Your comment was added!")
+            response = redirect("listing", id=listing.id)
+
+    return response, bid_form, max_bid_form, comment_form
+
+
+def _bid_message(request, result, leading_message):
+    # Another bidder's maximum may have outbid the user straight away
+    if result.leading:
+        messages.success(request, leading_message)
+    else:
+        messages.warning(
+            request, "Your bid is in, but another bidder's maximum is higher."
+        )
+
+
 @login_required
 def listing_close_view(request, id):
     try:
@@ -127,8 +217,7 @@ def listing_close_view(request, id):
 
     # close the auction if it's still active
     if listing.is_active:
-        listing.is_active = False
-        listing.save()
+        close_auctions([listing.id])
         messages.success(request, "The auction has been successfully closed.")
     else:
         messages.info(request, "The auction is already closed.")
@@ -136,10 +225,48 @@ def listing_close_view(request, id):
     return redirect("listing", id=id)
 
 
+async def listing_events_view(request, id):
+    # A live stream holds its connection open, which only the ASGI server can
+    # afford. Under WSGI answer with the snapshot: EventSource reconnects after
+    # the retry delay, degrading to polling. Subscribed before the snapshot is
+    # read, see events.stream_listing.
+    subscription = None
+    if isinstance(request, ASGIRequest):
+        subscription = events.subscribe_listing(id)
+    listing = (
+        await Listing.objects.filter(id=id)
+        .values("current_price", "bid_count", "is_active")
+        .afirst()
+    )
+    if listing is None:
+        if subscription is not None:
+            subscription.close()
+        return HttpResponseNotFound(f"Listing with id {id} not found !")
+
+    is_active = listing.pop("is_active")
+    snapshot = {"type": "price" if is_active else "closed", "listing": id, **listing}
+
+    if not is_active or subscription is None:
+        if subscription is not None:
+            subscription.close()
+        response = HttpResponse(
+            f"retry: {events.RETRY_MILLISECONDS}\n" + events.format_sse(snapshot),
+            content_type="text/event-stream",
+        )
+    else:
+        response = StreamingHttpResponse(
+            events.stream_listing(subscription, snapshot),
+            content_type="text/event-stream",
+        )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @login_required
 def listing_watchlist_view(request, id):
     try:
-        listing = get_object_or_404(Listing, id=id)
+        listing = get_object_or_404(Listing.objects.only("is_active"), id=id)
     except Exception as e:
         return (
             render(request),
@@ -154,23 +281,19 @@ def listing_watchlist_view(request, id):
         )
         return redirect("listing", id=id)
 
-    # get or create the watchlist
-    watchlist, _ = Watchlist.objects.get_or_create(user=request.user)
-
     # add or remove the listing to the watchlist user
-    if listing in watchlist.listings.all():
-        watchlist.listings.remove(listing)
-        messages.success(request, "The listing has been removed from your watchlist.")
-    else:
-        watchlist.listings.add(listing)
+    if watchlist.toggle(request.user, listing.id):
         messages.success(request, "The listing has been added to your watchlist.")
+    else:
+        messages.success(request, "The listing has been removed from your watchlist.")
 
     return redirect("listing", id=id)
 
 
-def categories_view(request):
+@replica_reads
+async def categories_view(request):
     try:
-        categories = Category.objects.all()
+        categories = await catalog.aget_categories()
     except Exception as e:
         return render(
             request,
@@ -178,43 +301,240 @@ def categories_view(request):
             {"code": 400, "message": f"Error loading the categories : {e}"},
         )
 
+    await aget_user(request)
     return render(request, "auctions/categories.html", {"categories": categories})
 
 
-def category_view(request, id):
+@replica_reads
+async def category_view(request, id):
     try:
-        category = get_object_or_404(Category, id=id)
-        listings_category = category.listings.filter(is_active=True)
-    except Exception as e:
+        category = await Category.objects.aget(id=id)
+    except Category.DoesNotExist as e:
         return render(
             request,
             "auctions/error.html",
             {"code": 404, "message": f"Category {id} not found\n {e}"},
         )
 
+    paginator = KeysetPaginator(
+        Listing.objects.filter(category=category, is_active=True),
+        page_size=page_size_from(request),
+    )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
+
+    await aget_user(request)
     return render(
         request,
         "auctions/category_listing.html",
-        {"listings_category": listings_category, "category": category},
+        {"listings_category": page, "category": category, "page": page},
     )
 
 
-@login_required
-def watchlist_view(request):
+@replica_reads
+async def search_view(request):
+    categories = await catalog.aget_categories()
+    form = SearchForm(request.GET, categories=categories)
+    if not form.is_valid():
+        await aget_user(request)
+        return render(request, "auctions/search.html", {"form": form}, status=400)
+
+    order = form.cleaned_data["order"] or "relevance"
+    paginator = KeysetPaginator(
+        search_listings(
+            form.cleaned_data["q"],
+            order,
+            category=form.cleaned_data["category"],
+            min_price=form.cleaned_data["min_price"],
+            max_price=form.cleaned_data["max_price"],
+        ),
+        keys=ORDERINGS[order],
+        page_size=page_size_from(request),
+    )
     try:
-        watchlist, _ = Watchlist.objects.get_or_create(user=request.user)
-    except Exception as e:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
         return render(
-            request,
-            "auctions/error.html",
-            {"code": 404, "message": f"Watchlist not found\n {e}"},
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
+
+    # the pager links keep the search parameters
+    params = request.GET.copy()
+    params.pop("cursor", None)
+
+    await aget_user(request)
+    return render(
+        request,
+        "auctions/search.html",
+        {"form": form, "listings": page, "page": page, "query": params.urlencode()},
+    )
+
+
+async def watchlist_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    paginator = KeysetPaginator(
+        Listing.objects.filter(watchlisted_by__user=user),
+        page_size=page_size_from(request),
+    )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
         )
 
     return render(
         request,
         "auctions/watchlist_listing.html",
-        {"listings": watchlist.listings.all()},
+        {"listings": page, "page": page},
+    )
+
+
+async def notifications_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    paginator = KeysetPaginator(
+        Notification.objects.filter(user=user).select_related("listing"),
+        keys=("id",),
+        page_size=page_size_from(request),
+    )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
+
+    response = render(
+        request,
+        "auctions/notifications.html",
+        {"notifications": page, "page": page},
+    )
+    # Shown, so read
+    unread = [n.pk for n in page if n.read_at is None]
+    if unread:
+        await Notification.objects.filter(pk__in=unread).aupdate(read_at=timezone.now())
+    return response
+
+
+async def dashboard_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    listings = Listing.objects.activity(user).only(
+        "title", "current_price", "bid_count", "is_active", "created_at"
+    )
+    state = request.GET.get("state")
+    if state in ACTIVITY_STATES:
+        listings = listings.filter(state=state)
+    paginator = KeysetPaginator(listings, page_size=page_size_from(request))
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
+
+    return render(
+        request,
+        "auctions/dashboard.html",
+        {
+            "listings": page,
+            "page": page,
+            "states": ACTIVITY_STATES,
+            "state": state if state in ACTIVITY_STATES else None,
+            "query": f"state={state}" if state in ACTIVITY_STATES else "",
+        },
+    )
+
+
+async def wins_view(request):
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    paginator = KeysetPaginator(
+        Listing.objects.filter(won_by=user),
+        keys=("closed_at", "id"),
+        page_size=page_size_from(request),
     )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        return render(
+            request, "auctions/error.html", {"code": 400, "message": e}, status=400
+        )
+
+    return render(request, "auctions/wins.html", {"listings": page, "page": page})
+
+
+@staff_member_required
+def import_listings_view(request):
+    result = None
+    if request.method == "POST":
+        form = ListingUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = form.cleaned_data["format"] or bulk.format_of(upload.name)
+            # parsed as it is read from the uploaded (spooled) file
+            lines = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+            try:
+                result = bulk.import_listings(
+                    bulk.read_rows(lines, fmt),
+                    request.user,
+                    dry_run=form.cleaned_data["dry_run"],
+                )
+            except bulk.ImportFormatError as e:
+                form.add_error("file", str(e))
+    else:
+        form = ListingUploadForm()
+
+    return render(
+        request,
+        "auctions/import_listings.html",
+        {"form": form, "result": result},
+        status=400 if form.errors else 200,
+    )
+
+
+@staff_member_required
+def export_listings_view(request):
+    fmt = request.GET.get("format", "csv")
+    if fmt not in bulk.FORMATS:
+        return render(
+            request,
+            "auctions/error.html",
+            {"code": 400, "message": f"Unknown export format: {fmt}"},
+            status=400,
+        )
+
+    listings = Listing.objects.all()
+    if request.GET.get("active"):
+        listings = listings.filter(is_active=True)
+
+    # Django buffers a sync iterator whole before sending it through ASGI
+    if isinstance(request, ASGIRequest):
+        lines = bulk.aexport_lines(listings, fmt)
+    else:
+        lines = bulk.export_lines(listings, fmt)
+    response = StreamingHttpResponse(lines, content_type=bulk.FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="listings.{fmt}"'
+    return response
+
+
+@staff_member_required
+def metrics_view(request):
+    return HttpResponse(metrics.exposition(), content_type="text/plain; version=0.0.4")
 
 
 def login_view(request):
@@ -0,0 +1,127 @@
+"""Watchlist membership, cached per user as a sorted array of listing ids.
+
+The listing page asks "is this listing watched?" on every view, so each
+user's watched ids are loaded once into the shared cache and answered by
+binary search. Toggling touches one row of the through table and patches the
+cached array in place; other writers (admin, ``watchlist.listings.add``) drop
+it through the ``m2m_changed`` receiver in signals.py.
+
+Two toggles by the same user racing on the cache may leave it a step behind;
+it expires after ``AUCTIONS_WATCHLIST_CACHE_TIMEOUT`` seconds.
+"""
+
+import array
+import bisect
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Watchlist
+
+Entry = Watchlist.listings.through
+
+
+def _key(user_id):
+    return f"auctions:watchlist:{user_id}"
+
+
+def _cache():
+    return caches[settings.AUCTIONS_WATCHLIST_CACHE]
+
+
+def _query(user_id):
+    return (
+        Entry.objects.filter(watchlist__user_id=user_id)
+        .order_by("listing_id")
+        .values_list("listing_id", flat=True)
+    )
+
+
+def _store(user_id, ids):
+    _cache().set(_key(user_id), ids, settings.AUCTIONS_WATCHLIST_CACHE_TIMEOUT)
+
+
+def _find(ids, listing_id):
+    i = bisect.bisect_left(ids, listing_id)
+    return i, i < len(ids) and ids[i] == listing_id
+
+
+def watched_ids(user_id):
+    """The ids of the listings the user watches, as a sorted ``array``."""
+    ids = _cache().get(_key(user_id))
+    if ids is None:
+        ids = array.array("q", _query(user_id))
+        _store(user_id, ids)
+    return ids
+
+
+async def awatched_ids(user_id):
+    ids = await _cache().aget(_key(user_id))
+    if ids is None:
+        ids = array.array("q", [listing_id async for listing_id in _query(user_id)])
+        await _cache().aset(
+            _key(user_id), ids, settings.AUCTIONS_WATCHLIST_CACHE_TIMEOUT
+        )
+    return ids
+
+
+def is_watched(user_id, listing_id):
+    return _find(watched_ids(user_id), listing_id)[1]
+
+
+async def ais_watched(user_id, listing_id):
+    return _find(await awatched_ids(user_id), listing_id)[1]
+
+
+def toggle(user, listing_id):
+    """Add the listing to the user's watchlist, or remove it if already there.
+
+    Returns whether the listing is watched afterwards. One EXISTS and one
+    write; only adding reads (or first creates) the user's Watchlist row.
+    """
+    with transaction.atomic():
+        watched = not _entries(user, listing_id).exists()
+        _write(user, listing_id, watched)
+    return watched
+
+
+def set_watched(user, listing_id, watched):
+    """Add the listing to the user's watchlist or remove it, idempotently."""
+    with transaction.atomic():
+        _write(user, listing_id, watched)
+
+
+def _entries(user, listing_id):
+    return Entry.objects.filter(watchlist__user_id=user.id, listing_id=listing_id)
+
+
+def _write(user, listing_id, watched):
+    if watched:
+        watchlist, _ = Watchlist.objects.get_or_create(user=user)
+        Entry.objects.bulk_create(
+            [Entry(watchlist_id=watchlist.id, listing_id=listing_id)],
+            ignore_conflicts=True,
+        )
+    else:
+        _entries(user, listing_id).delete()
+    transaction.on_commit(lambda: _update(user.id, listing_id, watched))
+
+
+def _update(user_id, listing_id, watched):
+    ids = _cache().get(_key(user_id))
+    if ids is None:
+        return  # loaded afresh on the next read
+
+    i, present = _find(ids, listing_id)
+    if watched and not present:
+        ids.insert(i, listing_id)
+    elif present and not watched:
+        del ids[i]
+    else:
+        return
+    _store(user_id, ids)
+
+
+def forget(*user_ids):
+    _cache().delete_many([_key(user_id) for user_id in user_ids])
@@ -0,0 +1,13 @@
+"""Load-testing and benchmark suite for the auction hot paths.
+
+Run from app/, e.g. `python -m benchmarks.run --help`.
+"""
+
+import os
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "commerce.settings")
+    import django
+
+    django.setup()
@@ -0,0 +1,108 @@
+"""Compare bid throughput of the direct path with the write-behind queue.
+
+    cd app/
+    python -m benchmarks.bidqueue --concurrency 16 --bids 4000
+
+Runs against a throwaway database of the configured engine. The same storm
+of bids on one hot listing (see benchmarks.databases) goes once through
+auctions.bidding.place_bid, a transaction per bid, and once through
+auctions.bidqueue.submit while a drain worker thread decides the queue in
+batches. For the queue it reports how fast bids are acknowledged and how
+fast they are decided, from the first submission until the queue is empty.
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+from benchmarks.databases import storm
+
+
+def main(argv=None):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+
+    from auctions import bidqueue
+    from auctions.models import BidSubmission, Listing, User
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bids", type=int, default=4000)
+    parser.add_argument("--batch-size", type=int)
+    args = parser.parse_args(argv)
+
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        User(username=f"bidder{i}", password=password) for i in range(args.concurrency)
+    )
+
+    def hot_listing(title):
+        listing = Listing.objects.create(
+            title=title, description="", starting_bid=1, created_by=users[0]
+        )
+        connection.close()
+        return listing
+
+    listing = hot_listing("direct")
+    elapsed, errors = storm(listing.id, users, args.bids, args.concurrency)
+    listing.refresh_from_db()
+    print(
+        f"{'direct, a transaction per bid':34} {args.bids / elapsed:8.1f} bids/s "
+        f"decided  {listing.bid_count:6} accepted  {len(errors)} errors"
+    )
+
+    settings.AUCTIONS_BID_QUEUE = True
+    listing = hot_listing("queued")
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=bidqueue.run,
+        args=(stop, bidqueue.shard_of(listing.id), args.batch_size),
+    )
+    worker.start()
+    try:
+        start = time.perf_counter()
+        acknowledged, errors = storm(
+            listing.id, users, args.bids, args.concurrency, place=bidqueue.submit
+        )
+        pending = BidSubmission.objects.filter(status=BidSubmission.PENDING)
+        while pending.exists():
+            time.sleep(0.01)
+        decided = time.perf_counter() - start
+    finally:
+        stop.set()
+        worker.join()
+        connection.close()
+    listing.refresh_from_db()
+    print(
+        f"{'queued, batches of ' + str(args.batch_size or settings.AUCTIONS_BID_QUEUE_BATCH_SIZE):34} "
+        f"{args.bids / acknowledged:8.1f} bids/s acknowledged, "
+        f"{args.bids / decided:8.1f} decided  {listing.bid_count:6} accepted  "
+        f"{len(errors)} errors"
+    )
+    if errors:
+        print(f"{'':34} first error: {errors[0]!r}")
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # a file, shared by the threads like a deployment's database
+            connection.settings_dict["TEST"]["NAME"] = f"{directory}/bench.sqlite3"
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            main()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
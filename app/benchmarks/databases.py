@@ -0,0 +1,130 @@
+"""Compare concurrent bid throughput across database configurations.
+
+    cd app/
+    python -m benchmarks.databases --concurrency 8 --bids 2000
+    DJANGO_DB_ENGINE=postgresql DJANGO_DB_HOST=... python -m benchmarks.databases
+
+Runs against a throwaway database of the configured engine. Each worker
+thread places bids through auctions.bidding.place_bid on one hot listing,
+opening and closing its connection around every bid the way a request does,
+so CONN_MAX_AGE decides whether connections (and, on SQLite, the pragmas of
+AUCTIONS_SQLITE_PRAGMAS) are set up once or per bid.
+"""
+
+import argparse
+import itertools
+import tempfile
+import threading
+import time
+
+# Django's SQLite defaults: rollback journal, fsync on every commit
+SQLITE_DEFAULTS = {"journal_mode": "delete", "synchronous": "full"}
+
+
+def configurations(vendor, tuned_pragmas):
+    if vendor == "sqlite":
+        pragma_sets = {
+            "default pragmas": SQLITE_DEFAULTS,
+            "tuned pragmas": tuned_pragmas,
+        }
+    else:
+        pragma_sets = {"": None}
+    for (label, pragmas), max_age in itertools.product(pragma_sets.items(), (0, 60)):
+        name = f"{vendor} {label}".strip() + f", CONN_MAX_AGE={max_age}"
+        yield name, pragmas, max_age
+
+
+def storm(listing_id, users, bids, concurrency, place=None):
+    """Place `bids` bids from `concurrency` threads, returns (elapsed, errors).
+
+    `place(listing_id, user, amount)` defaults to auctions.bidding.place_bid.
+    """
+    from django.db import close_old_connections, connection
+
+    from auctions.bidding import place_bid
+
+    place = place or place_bid
+    amounts = itertools.count(1000)
+    lock = threading.Lock()
+    errors = []
+
+    def work(n):
+        for i in range(n, bids, concurrency):
+            close_old_connections()
+            with lock:
+                amount = next(amounts)
+            try:
+                place(listing_id, users[i % len(users)], amount)
+            except Exception as e:  # reported, a failed bid must not end the run
+                errors.append(e)
+            close_old_connections()
+        connection.close()
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, errors
+
+
+def main(argv=None):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, connections
+
+    from auctions.models import Listing, User
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--bids", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        User(username=f"bidder{i}", password=password) for i in range(args.concurrency)
+    )
+    tuned = settings.AUCTIONS_SQLITE_PRAGMAS
+    for name, pragmas, max_age in configurations(connection.vendor, tuned):
+        seller = users[0]
+        listing = Listing.objects.create(
+            title=name, description="", starting_bid=1, created_by=seller
+        )
+        connection.close()
+        if pragmas is not None:
+            settings.AUCTIONS_SQLITE_PRAGMAS = pragmas
+        connections.settings["default"]["CONN_MAX_AGE"] = max_age
+
+        elapsed, errors = storm(listing.id, users, args.bids, args.concurrency)
+        listing.refresh_from_db()
+        print(
+            f"{name:45} {args.bids / elapsed:8.1f} bids/s  "
+            f"{listing.bid_count:6} accepted  {len(errors)} errors"
+        )
+        if errors:
+            print(f"{'':45} first error: {errors[0]!r}")
+    settings.AUCTIONS_SQLITE_PRAGMAS = tuned
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # a file, SQLite's in-memory test database has no journal to tune
+            connection.settings_dict["TEST"]["NAME"] = f"{directory}/bench.sqlite3"
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            main()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,131 @@
+"""Closed-loop load drivers and latency statistics for the benchmark scripts."""
+
+import http.client
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    latencies: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def queries_per_request(self):
+        return statistics.fmean(self.queries) if self.queries else 0.0
+
+    def percentile(self, p):
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    def as_dict(self):
+        return {
+            "requests_per_second": round(self.requests_per_second, 1),
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p95_ms": round(self.percentile(95) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "queries_per_request": round(self.queries_per_request, 2),
+            "errors": self.errors,
+        }
+
+    def summary(self):
+        return (
+            f"{self.requests_per_second:8.1f} req/s  "
+            f"p50 {self.percentile(50) * 1000:7.2f} ms  "
+            f"p95 {self.percentile(95) * 1000:7.2f} ms  "
+            f"p99 {self.percentile(99) * 1000:7.2f} ms  "
+            f"{self.queries_per_request:5.1f} queries/req  "
+            f"errors {self.errors}"
+        )
+
+
+def drive(send, requests, concurrency, make_session=lambda: None, close=None):
+    """Call `send(session, n)` for n in range(requests) from `concurrency`
+    threads, each with its own session and issuing its next request as soon
+    as the previous one returns. `send` returns (ok, queries or None)."""
+    result = LoadResult()
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        session = make_session()
+        try:
+            while True:
+                with lock:
+                    n = next(counter, None)
+                if n is None:
+                    break
+                start = time.perf_counter()
+                ok, queries = send(session, n)
+                latency = time.perf_counter() - start
+                with lock:
+                    if not ok:
+                        result.errors += 1
+                        continue
+                    result.latencies.append(latency)
+                    if queries is not None:
+                        result.queries.append(queries)
+        finally:
+            if close is not None:
+                close(session)
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        # stay on the calling thread and its database connection
+        worker()
+    else:
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def run_load(base_url, paths, requests, concurrency):
+    """GET `paths` in turn over one keep-alive connection per thread."""
+    url = urlsplit(base_url)
+
+    def connect():
+        return http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+
+    def send(connection, n):
+        try:
+            connection.request("GET", paths[n % len(paths)])
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            return False, None
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+        return response.status < 400, None
+
+    return drive(send, requests, concurrency, connect, lambda c: c.close())
+
+
+def wait_until_up(base_url, process=None, timeout=30):
+    url = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection(url.hostname, url.port, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not come up within {timeout}s")
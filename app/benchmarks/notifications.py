@@ -0,0 +1,88 @@
+"""Fan out a bid on a listing watched by many users.
+
+    cd app/
+    python -m benchmarks.notifications --watchers 50000
+
+Runs against a throwaway database of the configured engine, with the locmem
+email backend. Times the bid itself, which only records the event, then the
+send_notifications worker's fan-out, with its peak Python memory for two
+chunk sizes.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+
+def main(argv=None):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.core import mail
+
+    from auctions import notifications
+    from auctions.bidding import place_bid
+    from auctions.models import Listing, Notification, NotificationEvent, User
+    from auctions.models import Watchlist
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watchers", type=int, default=50_000)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args(argv)
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        User(username=f"user{i}", email=f"user{i}@example.com", password=password)
+        for i in range(args.watchers + 2)
+    )
+    seller, bidder, watchers = users[0], users[1], users[2:]
+    listing = Listing.objects.create(
+        title="Hot listing", description="", starting_bid=1, created_by=seller
+    )
+    lists = Watchlist.objects.bulk_create(Watchlist(user=user) for user in watchers)
+    Watchlist.listings.through.objects.bulk_create(
+        Watchlist.listings.through(watchlist=w, listing=listing) for w in lists
+    )
+
+    for n, chunk_size in enumerate(args.chunk_sizes):
+        start = time.perf_counter()
+        place_bid(listing.id, bidder, 10 + n)
+        bid_ms = (time.perf_counter() - start) * 1000
+
+        mail.outbox = []
+        tracemalloc.start()
+        start = time.perf_counter()
+        notifications.deliver(chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        event = NotificationEvent.objects.latest("id")
+        sent = Notification.objects.filter(event=event).count()
+        print(
+            f"chunks of {chunk_size:5}: bid {bid_ms:6.2f} ms, fan-out to {sent} "
+            f"users {elapsed:6.2f} s ({sent / elapsed:8.0f}/s), "
+            f"peak {peak / 2**20:5.1f} MiB, {len(mail.outbox)} emails"
+        )
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = f"{directory}/bench.sqlite3"
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            main()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
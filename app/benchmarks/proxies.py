@@ -0,0 +1,124 @@
+"""Settle maximum (proxy) bids with many competing on one listing.
+
+    cd app/
+    python -m benchmarks.proxies --proxies 10000
+
+Runs against a throwaway database of the configured engine. Every bidder
+sets a random maximum through auctions.bidding.set_max_bid, each settled
+against all the maxima before it, then manual bids land on top of them. It
+prints the settling latency as the maxima pile up, the queries and bid rows
+per settlement, and the bids a one-increment-at-a-time engine would have
+written to reach the same price.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+
+def timed(calls):
+    """Run the calls, returns their latencies in milliseconds."""
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def describe(label, latencies):
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+    print(
+        f"{label:38} p50 {statistics.median(latencies):6.2f} ms  "
+        f"p95 {p95:6.2f} ms  max {max(latencies):7.2f} ms"
+    )
+
+
+def main(argv=None):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from auctions.bidding import place_bid, set_max_bid
+    from auctions.models import Bid, Listing, User
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--proxies", type=int, default=10_000)
+    parser.add_argument("--bids", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)  # nosec B311 - reproducible maxima
+    password = make_password(None)
+    users = User.objects.bulk_create(
+        User(username=f"bidder{i}", password=password) for i in range(args.proxies)
+    )
+    seller = User.objects.create(username="seller", password=password)
+    start = Decimal(10)
+    listing = Listing.objects.create(
+        title="Hot listing", description="", starting_bid=start, created_by=seller
+    )
+
+    maxima = [Decimal(rng.randrange(1_100, 10_000_000)) / 100 for _ in users]
+    bidders = list(zip(users, maxima))
+    quarter = max(1, args.proxies // 4)
+    for n in range(0, args.proxies, quarter):
+        batch = bidders[n:][:quarter]
+        latencies = timed(
+            lambda u=user, m=amount: set_max_bid(listing.id, u, m)
+            for user, amount in batch
+        )
+        describe(f"set maximum, {n + 1}-{n + len(batch)} competing", latencies)
+
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        set_max_bid(listing.id, seller, Decimal("999999.99"))
+    ranking = next(q["sql"] for q in queries if 'max_amount" DESC' in q["sql"])
+    print(f"queries per settlement: {len(queries)}")
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + ranking)
+            print("ranking plan:", " ".join(str(row[-1]) for row in cursor))
+
+    listing.refresh_from_db()
+    price = listing.current_price
+    latencies = timed(
+        lambda u=users[i % len(users)], a=price + i + 1: place_bid(listing.id, u, a)
+        for i in range(args.bids)
+    )
+    describe(f"manual bid, {args.proxies + 1} maxima", latencies)
+
+    listing.refresh_from_db()
+    increment = Decimal(settings.AUCTIONS_BID_INCREMENT)
+    settled_by_proxy = Bid.objects.filter(listing=listing).count() - args.bids
+    print(
+        f"bid rows written by settling {args.proxies + 1} maxima: "
+        f"{settled_by_proxy}, one increment at a time: "
+        f"~{int((price - start) / increment)}"
+    )
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            connection.settings_dict["TEST"]["NAME"] = f"{directory}/bench.sqlite3"
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            main()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
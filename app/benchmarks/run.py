@@ -0,0 +1,166 @@
+"""Run the benchmark scenarios and compare them with a stored baseline.
+
+By default the scenarios go through the Django test client against a
+throwaway test database seeded by benchmarks.seed. With --live they are
+sent over HTTP to a running server, which must use the same (already
+seeded) database as this process.
+
+    cd app/
+    python -m benchmarks.run
+    python -m benchmarks.run --live http://127.0.0.1:8000 --concurrency 16
+    python -m benchmarks.run --update-baseline
+
+Exits with status 1 when a scenario fails requests, issues more queries per
+request than its baseline, or is slower than the baseline by more than
+--tolerance (p95 latency or requests/second).
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from pathlib import Path
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def run_scenario(scenario, ctx, make_transport, requests, concurrency):
+    from benchmarks.load import drive
+
+    users = itertools.cycle(ctx.usernames)
+
+    def connect():
+        return make_transport(next(users) if scenario.login else None)
+
+    def send(transport, n):
+        return transport.send(*scenario.build(ctx, n))
+
+    warmup = min(20, requests)
+    drive(send, warmup, concurrency, connect, lambda t: t.close())
+    return drive(send, requests, concurrency, connect, lambda t: t.close())
+
+
+def regressions(results, baseline, tolerance):
+    """Yield one message per metric that regressed past the baseline."""
+    for name, result in results.items():
+        if result["errors"]:
+            yield f"{name}: {result['errors']} failed requests"
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries_per_request"] > expected["queries_per_request"]:
+            yield (
+                f"{name}: {result['queries_per_request']} queries/request, "
+                f"baseline {expected['queries_per_request']}"
+            )
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            yield f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms"
+        if result["requests_per_second"] < expected["requests_per_second"] * (
+            1 - tolerance
+        ):
+            yield (
+                f"{name}: {result['requests_per_second']} req/s, "
+                f"baseline {expected['requests_per_second']} req/s"
+            )
+
+
+def main(argv=None):
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", metavar="URL", help="benchmark a running server")
+    parser.add_argument(
+        "--scenario", action="append", choices=sorted(SCENARIOS), dest="scenarios"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="threads (live mode only)"
+    )
+    parser.add_argument("--users", type=int, default=20, help="seeded (client mode)")
+    parser.add_argument(
+        "--listings", type=int, default=300, help="seeded (client mode)"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    mode = "live" if args.live else "client"
+    names = args.scenarios or list(SCENARIOS)
+    if mode == "live":
+        results = _run_live(args, names)
+    else:
+        results = _run_client(args, names)
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        stored[mode] = {**stored.get(mode, {}), **results}
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    failures = list(regressions(results, stored.get(mode, {}), args.tolerance))
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _report(name, result):
+    print(f"{name:18} {result.summary()}")
+    return result.as_dict()
+
+
+def _run_live(args, names):
+    from benchmarks.load import wait_until_up
+    from benchmarks.scenarios import SCENARIOS, Context, LiveTransport
+    from benchmarks.seed import PASSWORD
+
+    wait_until_up(args.live)
+    ctx = Context.from_database(PASSWORD)
+
+    def transport(username):
+        return LiveTransport(args.live, username, ctx.password)
+
+    return {
+        name: _report(
+            name,
+            run_scenario(
+                SCENARIOS[name], ctx, transport, args.requests, args.concurrency
+            ),
+        )
+        for name in names
+    }
+
+
+def _run_client(args, names):
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from benchmarks.scenarios import SCENARIOS, ClientTransport, Context
+    from benchmarks.seed import PASSWORD, seed
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        seed(users=args.users, listings=args.listings)
+        ctx = Context.from_database(PASSWORD)
+        # the test client is not thread-safe; concurrency is a live-mode knob
+        return {
+            name: _report(
+                name,
+                run_scenario(SCENARIOS[name], ctx, ClientTransport, args.requests, 1),
+            )
+            for name in names
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+    sys.exit(main())
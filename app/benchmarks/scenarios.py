@@ -0,0 +1,163 @@
+"""The benchmarked scenarios and the transports that replay them.
+
+A scenario turns the request number into (method, path, data). Transports
+send it either through the Django test client, in process, or over HTTP to
+a live server, and read the query count back from the Server-Timing header
+set by RequestMetricsMiddleware.
+"""
+
+import http.client
+import itertools
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.urls import reverse
+
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Context:
+    listing_ids: list
+    hot_listing_id: int
+    usernames: list
+    password: str
+    bids: itertools.count
+
+    @classmethod
+    def from_database(cls, password):
+        from auctions.models import Listing, User
+
+        from benchmarks.seed import USERNAME_PREFIX
+
+        active = Listing.objects.filter(is_active=True).order_by("id")
+        listing_ids = list(active.values_list("id", flat=True))
+        if not listing_ids:
+            raise RuntimeError("no active listings, seed the database first")
+        hot = active.order_by("-bid_count", "id").first()
+        usernames = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by("id")
+            .values_list("username", flat=True)
+        )
+        if not usernames:
+            raise RuntimeError("no benchmark users, seed the database first")
+        return cls(
+            listing_ids=listing_ids,
+            hot_listing_id=hot.id,
+            usernames=usernames,
+            password=password,
+            bids=itertools.count(int(hot.current_price) + 1),
+        )
+
+    def listing(self, n):
+        return self.listing_ids[n % len(self.listing_ids)]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: object
+    login: bool = False
+
+
+def browse_index(ctx, n):
+    return "GET", reverse("index"), None
+
+
+def open_listing(ctx, n):
+    return "GET", reverse("listing", args=[ctx.listing(n)]), None
+
+
+def bid_storm(ctx, n):
+    # every bid outbids the previous one, so each request takes the write path
+    amount = Decimal(next(ctx.bids))
+    return "POST", reverse("listing", args=[ctx.hot_listing_id]), {"bid": amount}
+
+
+def toggle_watchlist(ctx, n):
+    return "POST", reverse("watchlist_listing", args=[ctx.listing(n // 2)]), {}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("browse_index", browse_index),
+        Scenario("open_listing", open_listing),
+        Scenario("bid_storm", bid_storm, login=True),
+        Scenario("toggle_watchlist", toggle_watchlist, login=True),
+    ]
+}
+
+
+def query_count(server_timing):
+    match = QUERIES_RE.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+class ClientTransport:
+    def __init__(self, username=None):
+        from django.test import Client
+
+        self.client = Client()
+        if username is not None:
+            from auctions.models import User
+
+            self.client.force_login(User.objects.get(username=username))
+
+    def send(self, method, path, data):
+        if method == "POST":
+            response = self.client.post(path, data)
+        else:
+            response = self.client.get(path)
+        return response.status_code < 400, query_count(response.get("Server-Timing"))
+
+    def close(self):
+        pass
+
+
+class LiveTransport:
+    """One keep-alive connection with its own session and CSRF cookies."""
+
+    def __init__(self, base_url, username=None, password=None):
+        url = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        self.cookies = SimpleCookie()
+        if username is not None:
+            self.send("GET", reverse("login"), None)
+            ok, _ = self.send(
+                "POST", reverse("login"), {"username": username, "password": password}
+            )
+            if not ok or "sessionid" not in self.cookies:
+                raise RuntimeError(f"could not log in as {username}")
+
+    def send(self, method, path, data):
+        headers = {}
+        body = None
+        if self.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{key}={morsel.value}" for key, morsel in self.cookies.items()
+            )
+        if method == "POST":
+            csrf = self.cookies.get("csrftoken")
+            data = {**data, "csrfmiddlewaretoken": csrf.value if csrf else ""}
+            body = urlencode(data)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return False, None
+        for header in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        if response.getheader("Connection", "").lower() == "close":
+            self.connection.close()
+        return response.status < 400, query_count(response.getheader("Server-Timing"))
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,72 @@
+"""Time listing searches against the configured (seeded) database.
+
+    cd app/
+    python -m benchmarks.seed --listings 1000000 --bids 0 --comments 0
+    python -m benchmarks.search --repeat 50
+
+Each query class picks words from benchmarks.seed's vocabulary by frequency
+rank, the most common first, and times the first and second result pages
+in both result orders as the search view fetches them.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+QUERIES = {
+    "rare word": lambda w, rng: w[rng.randrange(800, 1200)],
+    "mid word": lambda w, rng: w[rng.randrange(100, 300)],
+    "two words": lambda w, rng: f"{w[rng.randrange(20, 200)]} {w[rng.randrange(20, 200)]}",
+    "prefix": lambda w, rng: w[rng.randrange(300, 600)][:4],
+    "common word": lambda w, rng: w[rng.randrange(0, 10)],
+}
+
+
+def main(argv=None):
+    from auctions.models import Listing
+    from auctions.pagination import KeysetPaginator
+    from auctions.search import ORDERINGS, get_backend, search_listings
+    from benchmarks.seed import vocabulary
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=24)
+    parser.add_argument("--max-price", type=float, help="also filter on price")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)  # nosec B311 - reproducible query mix
+    words = vocabulary()
+    print(f"{Listing.objects.count()} listings, backend {type(get_backend()).__name__}")
+    for name, make in QUERIES.items():
+        for order, keys in ORDERINGS.items():
+            first, second = [], []
+            for _ in range(args.repeat):
+                text = make(words, rng)
+                listings = search_listings(text, order, max_price=args.max_price)
+                paginator = KeysetPaginator(listings, keys, args.page_size)
+                start = time.perf_counter()
+                page = paginator.page()
+                first.append(time.perf_counter() - start)
+                if page.next_cursor:
+                    start = time.perf_counter()
+                    paginator.page(page.next_cursor)
+                    second.append(time.perf_counter() - start)
+            print(
+                f"{name:12} {order:10} page 1 {_summary(first)}  "
+                f"page 2 {_summary(second)}"
+            )
+
+
+def _summary(timings):
+    if len(timings) < 2:
+        return "n/a"
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return f"p50 {cuts[49] * 1000:7.2f} ms  p95 {cuts[94] * 1000:7.2f} ms"
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+    main()
@@ -0,0 +1,178 @@
+"""Seed the configured database with a synthetic auction house.
+
+    cd app/
+    python -m benchmarks.seed --users 200 --listings 5000 --bids 8
+
+Users are named bench0, bench1, ... and share the password in PASSWORD.
+Rows are written with bulk_create, so the listing aggregates are rebuilt
+in one pass at the end instead of through the per-bid signals.
+"""
+
+import argparse
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+PASSWORD = "bench-password"  # nosec B105 - synthetic benchmark accounts
+USERNAME_PREFIX = "bench"
+
+SYLLABLES = [
+    "ba",
+    "ko",
+    "ri",
+    "mel",
+    "tan",
+    "su",
+    "dor",
+    "vi",
+    "lek",
+    "no",
+    "pra",
+    "zu",
+]
+
+
+def vocabulary():
+    """Pseudo-words of two and three syllables, most frequent first."""
+    words = [a + b for a in SYLLABLES for b in SYLLABLES]
+    words += [a + b + c for a in SYLLABLES[:8] for b in SYLLABLES for c in SYLLABLES]
+    return words
+
+
+def zipf_weights(n):
+    """Cumulative weights of word ranks following Zipf's law, as in real text."""
+    total, weights = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank
+        weights.append(total)
+    return weights
+
+
+def seed(
+    users=50,
+    listings=500,
+    bids=5,
+    comments=2,
+    watchlist=10,
+    categories=8,
+    random_seed=0,
+    batch_size=1000,
+):
+    """Create the rows and return the ids of the new listings."""
+    from auctions import catalog
+    from auctions.models import Bid, Category, Comment, Listing, User, Watchlist
+
+    rng = random.Random(random_seed)  # nosec B311 - reproducible fake data
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        start = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        new_users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"{USERNAME_PREFIX}{n}",
+                    email=f"{USERNAME_PREFIX}{n}@example.com",
+                    password=password,
+                )
+                for n in range(start, start + users)
+            ],
+            batch_size=batch_size,
+        )
+        people = list(User.objects.filter(username__startswith=USERNAME_PREFIX))
+        people.sort(key=lambda user: user.pk)
+
+        for n in range(categories):
+            Category.objects.get_or_create(name=f"Category {n}")
+        category_ids = list(Category.objects.values_list("id", flat=True))
+
+        words = vocabulary()
+        weights = zipf_weights(len(words))
+
+        def text(k):
+            return " ".join(rng.choices(words, cum_weights=weights, k=k))
+
+        listing_ids = []
+        for first in range(0, listings, batch_size):
+            rows = []
+            for n in range(first, min(first + batch_size, listings)):
+                price = Decimal(rng.randrange(100, 100000)) / 100
+                rows.append(
+                    Listing(
+                        title=text(rng.randint(2, 5)).capitalize(),
+                        description=text(rng.randint(10, 30)) + ".",
+                        starting_bid=price,
+                        current_price=price,
+                        category_id=rng.choice(category_ids) if category_ids else None,
+                        created_by=rng.choice(people),
+                    )
+                )
+            Listing.objects.bulk_create(rows)
+            listing_ids += [listing.pk for listing in rows]
+
+            bid_rows, comment_rows = [], []
+            for listing in rows:
+                amount = listing.starting_bid
+                for _ in range(bids):
+                    amount += Decimal(rng.randrange(1, 1000)) / 100
+                    bid_rows.append(
+                        Bid(listing=listing, bidder=rng.choice(people), amount=amount)
+                    )
+                for _ in range(comments):
+                    comment_rows.append(
+                        Comment(
+                            listing=listing,
+                            commenter=rng.choice(people),
+                            content=text(rng.randint(5, 20)) + ".",
+                        )
+                    )
+            Bid.objects.bulk_create(bid_rows, batch_size=batch_size)
+            Comment.objects.bulk_create(comment_rows, batch_size=batch_size)
+
+        if (bids or comments) and listing_ids:
+            Listing.objects.filter(
+                pk__range=(min(listing_ids), max(listing_ids))
+            ).repair_aggregates()
+
+        Through = Watchlist.listings.through
+        rows = []
+        for user in new_users:
+            watched = Watchlist.objects.create(user=user)
+            picks = rng.sample(listing_ids, min(watchlist, len(listing_ids)))
+            rows += [Through(watchlist=watched, listing_id=pk) for pk in picks]
+        Through.objects.bulk_create(rows, batch_size=batch_size)
+
+        transaction.on_commit(catalog.invalidate)
+
+    return listing_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--listings", type=int, default=500)
+    parser.add_argument("--bids", type=int, default=5, help="bids per listing")
+    parser.add_argument("--comments", type=int, default=2, help="per listing")
+    parser.add_argument("--watchlist", type=int, default=10, help="per user")
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args(argv)
+
+    listing_ids = seed(
+        users=args.users,
+        listings=args.listings,
+        bids=args.bids,
+        comments=args.comments,
+        watchlist=args.watchlist,
+        categories=args.categories,
+        random_seed=args.seed,
+    )
+    print(f"seeded {args.users} users and {len(listing_ids)} listings")
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+    main()
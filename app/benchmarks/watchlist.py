@@ -0,0 +1,94 @@
+"""Time watchlist membership checks and toggles for a user watching many listings.
+
+    cd app/
+    python -m benchmarks.watchlist --watched 10000
+
+Runs against a throwaway test database. "scan" is the membership check the
+toggle view used to make (``listing in watchlist.listings.all()``); "cached"
+is auctions.watchlist with its ids already cached, "cold" loads them first.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def main(argv=None):
+    from django.contrib.auth.hashers import make_password
+    from django.core.cache import caches
+    from django.conf import settings
+
+    from auctions import watchlist
+    from auctions.models import Listing, User, Watchlist
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watched", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    user = User.objects.create(username="watcher", password=make_password(None))
+    Listing.objects.bulk_create(
+        Listing(title=f"Item {i}", starting_bid=1, current_price=1, created_by=user)
+        for i in range(args.watched + 1)
+    )
+    ids = list(Listing.objects.values_list("id", flat=True))
+    Watchlist.objects.create(user=user).listings.add(*ids[:-1])
+    cache = caches[settings.AUCTIONS_WATCHLIST_CACHE]
+    rng = random.Random(0)  # nosec B311 - reproducible listing picks
+
+    def scan(listing_id):
+        return Listing(pk=listing_id) in user.watchlist.listings.all()
+
+    def cold(listing_id):
+        cache.clear()
+        return watchlist.is_watched(user.id, listing_id)
+
+    def cached(listing_id):
+        return watchlist.is_watched(user.id, listing_id)
+
+    def toggle(listing_id):
+        watchlist.toggle(user, listing_id)
+        watchlist.toggle(user, listing_id)
+
+    print(f"{args.watched} watched listings")
+    for name, check in (("scan", scan), ("cold", cold), ("cached", cached)):
+        _time(name, check, ids, rng, args.repeat)
+    _time("toggle x2", toggle, ids, rng, args.repeat)
+
+
+def _time(name, call, ids, rng, repeat):
+    timings, queries = [], 0
+    for _ in range(repeat):
+        listing_id = rng.choice(ids)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            call(listing_id)
+            timings.append(time.perf_counter() - start)
+        queries += len(captured)
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    print(
+        f"{name:10} p50 {cuts[49] * 1000:8.3f} ms  p95 {cuts[94] * 1000:8.3f} ms  "
+        f"{queries / repeat:.1f} queries"
+    )
+
+
+if __name__ == "__main__":
+    from benchmarks import setup_django
+
+    setup_django()
+
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        main()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,117 @@
+"""Measure throughput as the production gunicorn profile scales its workers.
+
+Starts gunicorn with gunicorn.conf.py (DEBUG off) once per worker count,
+drives the same read paths through each and prints requests/second, the
+speedup over one worker and the memory (PSS) of master and workers
+together. Seed the configured database first, e.g.
+
+    cd app/
+    export DJANGO_DB_NAME=/tmp/bench.sqlite3
+    python manage.py migrate && python -m benchmarks.seed --listings 5000
+    python -m benchmarks.workers --workers 1 2 4 8 --concurrency 32
+    python -m benchmarks.workers --workers 4 --no-preload   # memory without preload
+
+Throughput only scales while there are free cores: with N cores expect
+roughly linear gains up to N workers and a plateau after.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess  # nosec B404 - starts the local server under test
+import sys
+from pathlib import Path
+
+from benchmarks.load import run_load, wait_until_up
+
+
+def pss_kib(pid):
+    """Proportional set size of a process and its children, Linux only."""
+    total = 0
+    for process in [pid, *children(pid)]:
+        try:
+            rollup = Path(f"/proc/{process}/smaps_rollup").read_text()
+        except OSError:
+            return None
+        for line in rollup.splitlines():
+            if line.startswith("Pss:"):
+                total += int(line.split()[1])
+    return total
+
+
+def children(pid):
+    try:
+        tasks = Path(f"/proc/{pid}/task").iterdir()
+        return [
+            int(c) for task in tasks for c in (task / "children").read_text().split()
+        ]
+    except OSError:
+        return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--worker-class", default="sync", help="e.g. uvicorn.workers.UvicornWorker"
+    )
+    parser.add_argument("--threads", type=int, default=1, help="per sync worker")
+    parser.add_argument("--no-preload", action="store_true")
+    parser.add_argument(
+        "--paths",
+        nargs="+",
+        default=["/", "/categories", "/categories/1", "/listings/1"],
+    )
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args(argv)
+
+    if shutil.which("gunicorn") is None:
+        sys.exit("gunicorn is not installed")
+    production = {
+        "DJANGO_DEBUG": "false",
+        "DJANGO_SECRET_KEY": os.getenv("DJANGO_SECRET_KEY", "benchmark"),
+        "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+    }
+    # the hashed static files and their manifest the templates link to
+    subprocess.run(  # nosec B603
+        [sys.executable, "manage.py", "collectstatic", "--noinput", "-v0"],
+        env={**os.environ, **production},
+        check=True,
+    )
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    baseline = None
+    for count in args.workers:
+        env = {
+            **os.environ,
+            "WEB_CONCURRENCY": str(count),
+            "GUNICORN_THREADS": str(args.threads),
+            "GUNICORN_WORKER_CLASS": args.worker_class,
+            "GUNICORN_BIND": f"127.0.0.1:{args.port}",
+            "GUNICORN_PRELOAD": "false" if args.no_preload else "true",
+            **production,
+        }
+        cmd = ["gunicorn", "--access-logfile=/dev/null", "--log-level=warning"]
+        server = subprocess.Popen(cmd, env=env)  # nosec B603
+        try:
+            wait_until_up(base_url, server)
+            run_load(base_url, args.paths, min(args.requests, 300), args.concurrency)
+            result = run_load(base_url, args.paths, args.requests, args.concurrency)
+            memory = pss_kib(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+        rps = result.requests_per_second
+        baseline = baseline or rps
+        print(
+            f"{count:3} workers  {rps:8.1f} req/s  x{rps / baseline:4.2f}  "
+            f"p95 {result.percentile(95) * 1000:7.1f} ms  errors {result.errors}  "
+            + (f"PSS {memory / 1024:6.1f} MiB" if memory else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
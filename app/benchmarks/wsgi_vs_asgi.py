@@ -0,0 +1,75 @@
+"""Compare requests/second of the WSGI and ASGI deployments under one load.
+
+Starts gunicorn (commerce.wsgi) and then uvicorn (commerce.asgi) against the
+configured database, drives the same read-heavy paths through each and
+prints throughput and latency percentiles. Seed the database first, e.g.
+with `python -m benchmarks.seed`.
+
+    cd app/
+    python -m benchmarks.wsgi_vs_asgi --requests 5000 --concurrency 32
+"""
+
+import argparse
+import os
+import shutil
+import subprocess  # nosec B404 - starts the local servers under test
+import sys
+
+from benchmarks.load import run_load, wait_until_up
+
+SERVERS = {
+    "wsgi": lambda port, workers, threads: [
+        "gunicorn",
+        "commerce.wsgi:application",
+        f"--bind=127.0.0.1:{port}",
+        f"--workers={workers}",
+        f"--threads={threads}",
+        "--log-level=warning",
+    ],
+    "asgi": lambda port, workers, threads: [
+        "uvicorn",
+        "commerce.asgi:application",
+        f"--port={port}",
+        f"--workers={workers}",
+        "--log-level=warning",
+    ],
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--paths",
+        nargs="+",
+        default=["/", "/categories", "/categories/1", "/listings/1"],
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--threads", type=int, default=16, help="gunicorn threads per worker"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "commerce.settings"}
+    for name, command in SERVERS.items():
+        cmd = command(args.port, args.workers, args.threads)
+        if shutil.which(cmd[0]) is None:
+            print(f"{name}: {cmd[0]} not installed, skipped", file=sys.stderr)
+            continue
+
+        server = subprocess.Popen(cmd, env=env)  # nosec B603
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            wait_until_up(base_url)
+            run_load(base_url, args.paths, min(args.requests, 200), args.concurrency)
+            result = run_load(base_url, args.paths, args.requests, args.concurrency)
+            print(f"{name}: {result.summary()}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
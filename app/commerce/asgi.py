@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "commerce.settings")
 
 application = get_asgi_application()
+
+# Load the category catalog before the first request needs it
+from auctions import catalog  # noqa: E402
+
+catalog.prewarm()
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -20,13 +22,28 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.0/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", get_random_secret_key())
-
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DJANGO_DEBUG", "true").lower() == "true"
 
-ALLOWED_HOSTS = []
+# SECURITY WARNING: keep the secret key used in production secret!
+# Every worker process must share it, or sessions break between them.
+SECRET_KEY = os.getenv("DJANGO_SECRET_KEY") or (
+    get_random_secret_key() if DEBUG else None
+)
+if SECRET_KEY is None:
+    raise ImproperlyConfigured("Set DJANGO_SECRET_KEY when DJANGO_DEBUG is false")
+
+# Comma-separated, e.g. "bids.example.com,.example.org"
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv("DJANGO_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+CSRF_TRUSTED_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("DJANGO_CSRF_TRUSTED_ORIGINS", "").split(",")
+    if origin.strip()
+]
 
 
 # Application definition
@@ -42,7 +59,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "auctions.middleware.RequestMetricsMiddleware",
+    "auctions.middleware.PrimaryPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # static files, from STATIC_ROOT; runserver serves them in debug
+    *([] if DEBUG else ["whitenoise.middleware.WhiteNoiseMiddleware"]),
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -55,7 +76,8 @@ ROOT_URLCONF = "commerce.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing renders for the request metrics
+        "BACKEND": "auctions.metrics.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -73,17 +95,93 @@ WSGI_APPLICATION = "commerce.wsgi.application"
 
 
 # Database
-# https://docs.djangoproject.com/en/3.0/ref/settings/#databases
+# https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+# SQLite unless DJANGO_DB_ENGINE names another backend, e.g. postgresql
+
+db_engine = os.getenv("DJANGO_DB_ENGINE", "sqlite3")
+if db_engine == "sqlite3":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DJANGO_DB_NAME", os.path.join(BASE_DIR, "db.sqlite3")),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": f"django.db.backends.{db_engine}",
+            "NAME": os.getenv("DJANGO_DB_NAME", "bid_marketplace"),
+            "USER": os.getenv("DJANGO_DB_USER", ""),
+            "PASSWORD": os.getenv("DJANGO_DB_PASSWORD", ""),
+            "HOST": os.getenv("DJANGO_DB_HOST", ""),
+            "PORT": os.getenv("DJANGO_DB_PORT", ""),
+        }
+    }
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+# Persistent connections, checked before reuse. The ASGI profile in
+# gunicorn.conf.py sets DJANGO_DB_CONN_MAX_AGE=0; pool with PgBouncer there.
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DJANGO_DB_CONN_MAX_AGE", 60))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = (
+    os.getenv("DJANGO_DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+)
+
+# Connection pooling is PgBouncer's, in transaction mode (see
+# docker/docker-compose.yml), when DJANGO_DB_HOST points at it: a server
+# connection is only held for a transaction, so no cursor may outlive one.
+if os.getenv("DJANGO_DB_PGBOUNCER", "false").lower() == "true":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Read replicas for the browse pages, see auctions/routers.py: hosts sharing
+# the primary's database name and credentials, comma-separated. Clients are
+# read from the primary for AUCTIONS_PRIMARY_PIN_SECONDS after they write.
+for number, host in enumerate(
+    filter(None, os.getenv("DJANGO_DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
     }
+AUCTIONS_READ_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+AUCTIONS_PRIMARY_PIN_SECONDS = 5
+DATABASE_ROUTERS = ["auctions.routers.ReplicaRouter"]
+
+# Set on every new SQLite connection, see auctions/signals.py: write-ahead
+# logging lets readers run alongside the writer, which then only syncs at
+# checkpoints; writers wait up to busy_timeout ms for the lock.
+AUCTIONS_SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
 }
 
 AUTH_USER_MODEL = "auctions.User"
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "bid-marketplace"),
+    }
+}
+
+# Rendered listing cards, keyed on listing id and version
+AUCTIONS_CARD_CACHE = "default"
+AUCTIONS_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Category catalog with active-listing counts, see auctions/catalog.py
+AUCTIONS_CATALOG_CACHE = "default"
+AUCTIONS_CATALOG_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Per-user watchlist membership, see auctions/watchlist.py
+AUCTIONS_WATCHLIST_CACHE = "default"
+AUCTIONS_WATCHLIST_CACHE_TIMEOUT = 24 * 60 * 60
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -121,5 +219,106 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
 STATIC_URL = "/static/"
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+
+# Outside debug, `collectstatic` writes compressed copies under content-hashed
+# names, which WhiteNoise serves with far-future immutable cache headers.
+# STORAGES needs Django 4.2, the floor in requirements.txt.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        )
+    },
+}
 
 LOGIN_URL = "login"
+
+# Django only logs to the console in debug; send warnings and errors (500s
+# included) to stderr in production too, where gunicorn collects them
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "root": {
+        "handlers": ["console"],
+        "level": os.getenv("DJANGO_LOG_LEVEL", "WARNING"),
+    },
+}
+
+# Keyset-paginated listing feeds, see auctions/pagination.py
+AUCTIONS_PAGE_SIZE = int(os.getenv("AUCTIONS_PAGE_SIZE", 24))
+AUCTIONS_MAX_PAGE_SIZE = int(os.getenv("AUCTIONS_MAX_PAGE_SIZE", 100))
+
+# Comments shown on a listing page, older ones load from the comments API
+AUCTIONS_COMMENT_PAGE_SIZE = 20
+
+# Most bids returned by one bid-history request, see auctions/api.py
+AUCTIONS_BID_HISTORY_LIMIT = 5000
+
+# Step by which maximum (proxy) bids outbid each other, see auctions/bidding.py
+AUCTIONS_BID_INCREMENT = "1.00"
+
+# Write-behind bid queue, see auctions/bidqueue.py: off, bids are decided in
+# the request. Batch size and idle poll interval (seconds) of the
+# drain_bid_queue workers, one per shard, and how long decided submissions
+# are kept for polling (seconds)
+AUCTIONS_BID_QUEUE = os.getenv("AUCTIONS_BID_QUEUE", "false").lower() == "true"
+AUCTIONS_BID_QUEUE_SHARDS = int(os.getenv("AUCTIONS_BID_QUEUE_SHARDS", 1))
+AUCTIONS_BID_QUEUE_BATCH_SIZE = 500
+AUCTIONS_BID_QUEUE_INTERVAL = 0.05
+AUCTIONS_BID_QUEUE_RETENTION = 24 * 60 * 60
+
+# Notification fan-out, see auctions/notifications.py: events per pass and
+# users per chunk of the send_notifications worker, its idle poll interval
+# (seconds), the kinds also sent by email and the site's address in them
+AUCTIONS_NOTIFICATION_BATCH_SIZE = 100
+AUCTIONS_NOTIFICATION_CHUNK_SIZE = 1000
+AUCTIONS_NOTIFICATION_INTERVAL = 1
+AUCTIONS_NOTIFICATION_EMAIL_KINDS = ["outbid", "won", "sold", "watched_closed"]
+AUCTIONS_SITE_URL = os.getenv("AUCTIONS_SITE_URL", "http://localhost:8000")
+
+EMAIL_BACKEND = os.getenv(
+    "DJANGO_EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+DEFAULT_FROM_EMAIL = os.getenv("DJANGO_DEFAULT_FROM_EMAIL", "auctions@localhost")
+
+# Listing full-text search, see auctions/search.py (unset: FTS5 on SQLite,
+# unindexed substring matching elsewhere)
+AUCTIONS_SEARCH_BACKEND = os.getenv("AUCTIONS_SEARCH_BACKEND")
+
+# Bulk listing import (rows per INSERT and transaction) and export (rows read
+# per database round trip), see auctions/bulk.py
+AUCTIONS_IMPORT_BATCH_SIZE = 500
+AUCTIONS_EXPORT_CHUNK_SIZE = 2000
+
+# Auction expiry worker, see auctions/expiry.py: listings closed per
+# transaction, and the longest sleep between passes in seconds
+AUCTIONS_EXPIRY_BATCH_SIZE = 1000
+AUCTIONS_EXPIRY_MAX_SLEEP = 30
+
+# Live listing events fan-out, see auctions/events.py. LocalBroker only reaches
+# streams served by the process that published: events of the expiry worker,
+# drain_bid_queue or another server worker need a cross-process Broker.
+AUCTIONS_EVENT_BROKER = os.getenv(
+    "AUCTIONS_EVENT_BROKER", "auctions.events.LocalBroker"
+)
+# Seconds a listing stream stays open before the client is made to reconnect,
+# the bound on streams left behind by clients that went away
+AUCTIONS_EVENT_STREAM_MAX_AGE = 300
+
+# Directory where each server process saves its request metrics, at most every
+# AUCTIONS_METRICS_INTERVAL seconds, for /metrics and request_metrics to sum.
+# Unset, /metrics only shows the process that answers it.
+AUCTIONS_METRICS_DIR = os.getenv("AUCTIONS_METRICS_DIR")
+AUCTIONS_METRICS_INTERVAL = 5
+
+# Log the SQL of any request running more queries than this (unset: never)
+AUCTIONS_METRICS_SQL_LOG_THRESHOLD = (
+    int(os.environ["AUCTIONS_METRICS_SQL_LOG_THRESHOLD"])
+    if os.getenv("AUCTIONS_METRICS_SQL_LOG_THRESHOLD")
+    else None
+)
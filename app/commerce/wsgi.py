@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "commerce.settings")
 
 application = get_wsgi_application()
+
+# Load the category catalog before the first request needs it
+from auctions import catalog  # noqa: E402
+
+catalog.prewarm()
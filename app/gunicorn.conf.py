@@ -0,0 +1,73 @@
+"""gunicorn settings for production, run from app/ with `gunicorn`.
+
+Environment:
+    WEB_CONCURRENCY        worker processes, default 2 x CPUs + 1
+    GUNICORN_THREADS       threads per sync worker, default 1
+    GUNICORN_WORKER_CLASS  "sync" (commerce.wsgi) or
+                           "uvicorn.workers.UvicornWorker" (commerce.asgi,
+                           needed to stream live listing events)
+    GUNICORN_BIND          default 0.0.0.0:8000
+    GUNICORN_PRELOAD       "false" to import the application in each worker
+    AUCTIONS_METRICS_DIR   where the workers save their request metrics,
+                           emptied at start
+
+Under the uvicorn worker DJANGO_DB_CONN_MAX_AGE defaults to 0: ASGI requests
+run in short-lived threads, so kept connections would never be reused.
+
+The application is imported once in the master before the workers fork
+(preload), so they share its code and warmed caches copy-on-write.
+"""
+
+import gc
+import multiprocessing
+import os
+from pathlib import Path
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+wsgi_app = (
+    "commerce.asgi:application"
+    if "uvicorn" in worker_class.lower()
+    else "commerce.wsgi:application"
+)
+if wsgi_app.startswith("commerce.asgi"):
+    # Set before the settings are imported, by the master or by each worker
+    os.environ.setdefault("DJANGO_DB_CONN_MAX_AGE", "0")
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Recycle workers now and then, staggered, to bound any slow leak
+max_requests = 1000
+max_requests_jitter = 100
+timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def on_starting(server):
+    # The request metrics of a previous run would be summed into this one's
+    directory = os.getenv("AUCTIONS_METRICS_DIR")
+    if directory:
+        for path in Path(directory).glob("*.json"):
+            path.unlink()
+
+
+def worker_exit(server, worker):
+    from auctions import metrics
+
+    # What the worker recorded since its last snapshot
+    metrics.write_snapshot(force=True)
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    # commerce.wsgi warmed the catalog through a connection that the workers
+    # must not share
+    connections.close_all()
+    # Keep the preloaded objects out of the garbage collector's sweeps, which
+    # would write to (and so copy) their pages in every worker
+    gc.freeze()
@@ -1,7 +1,33 @@
+import runpy
+from pathlib import Path
+
 import pytest
+from django.conf import settings
+from django.core.cache import caches
 from auctions.models import User, Listing
 
 
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(tmp_path_factory):
+    # A file-backed test database: SQLite's shared-cache in-memory database fails
+    # lock conflicts immediately instead of waiting, which breaks threaded tests.
+    test_db = tmp_path_factory.mktemp("db") / "test.sqlite3"
+    settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = str(test_db)
+    # An alias for a read replica, unused unless AUCTIONS_READ_REPLICAS names
+    # it; the replica fixture of test_replicas.py points it at a copy
+    settings.DATABASES["replica"] = {
+        **settings.DATABASES["default"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Primary keys are reused across tests, cached fragments must not be
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def create_user(db):
     # Default user
@@ -40,3 +66,16 @@ def create_listing(db, create_user):
         return listing
 
     return make_listing
+
+
+@pytest.fixture
+def load_settings(monkeypatch):
+    # commerce/settings.py evaluated afresh under the given environment
+    path = Path(__file__).resolve().parent.parent / "commerce" / "settings.py"
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(str(path))
+
+    return load
@@ -0,0 +1,222 @@
+import asyncio
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions import api
+from auctions.bidding import place_bid
+from auctions.models import Category, Comment, Listing
+
+
+@pytest.mark.django_db
+def test_listing_feed_pages_with_cursors(client, create_user, create_listing):
+    user = create_user()
+    listings = [create_listing(title=f"Item {i}", user=user) for i in range(5)]
+    Listing.objects.filter(pk=listings[0].pk).close()
+
+    first = client.get(reverse("api_listings"), {"page_size": 3}).json()
+    second = client.get(reverse("api_listings"), {"cursor": first["next"]}).json()
+
+    assert [row["title"] for row in first["results"]] == ["Item 4", "Item 3", "Item 2"]
+    assert [row["title"] for row in second["results"]] == ["Item 1"]
+    assert second["next"] is None
+    assert first["results"][0]["current_price"] == "500.00"
+    assert "description" not in first["results"][0]
+    assert client.get(reverse("api_listings"), {"cursor": "junk"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_listing_feed_queries_do_not_grow(client, create_user, create_listing):
+    user = create_user()
+    create_listing(user=user)
+    with CaptureQueriesContext(connection) as few:
+        client.get(reverse("api_listings"))
+    for i in range(20):
+        create_listing(title=f"Item {i}", user=user)
+    with CaptureQueriesContext(connection) as many:
+        client.get(reverse("api_listings"))
+    assert len(few) == len(many) == 1
+
+
+@pytest.mark.django_db
+def test_listing_revalidates_by_version(client, create_user, create_listing):
+    seller = create_user()
+    category = Category.objects.create(name="Toys")
+    listing = create_listing(user=seller, category=category)
+    url = reverse("api_listing", args=[listing.id])
+
+    response = client.get(url)
+    assert response.json()["category_name"] == "Toys"
+    assert response.json()["seller"] == seller.username
+    etag = response["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert (
+        client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code
+        == 304
+    )
+
+    place_bid(listing.id, create_user(username="bidder"), 600)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()["current_price"] == "600.00"
+    assert client.get(reverse("api_listing", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_bid_shares_the_form_validation(
+    authenticated_client, create_user, create_listing
+):
+    client, user = authenticated_client
+    listing = create_listing(user=create_user(username="seller"))
+    url = reverse("api_bids", args=[listing.id])
+
+    response = client.post(url, {"bid": "600"}, content_type="application/json")
+    assert response.status_code == 201
+    assert response.json()["current_price"] == "600.00"
+
+    response = client.post(url, {"bid": "550"}, content_type="application/json")
+    assert response.status_code == 409
+    assert (
+        "greater than the current price"
+        in response.json()["errors"]["bid"][0]["message"]
+    )
+
+    response = client.post(url, {"bid": "-1"}, content_type="application/json")
+    assert response.status_code == 400
+    assert client.post(url, "[1]", content_type="application/json").status_code == 400
+
+    Listing.objects.filter(pk=listing.pk).close()
+    response = client.post(url, {"bid": "900"}, content_type="application/json")
+    assert response.json()["errors"]["bid"][0]["message"] == "The auction is closed."
+
+
+@pytest.mark.django_db
+def test_writes_need_a_user(client, create_listing):
+    listing = create_listing()
+    bids = reverse("api_bids", args=[listing.id])
+    assert client.post(bids, {"bid": 600}).status_code == 401
+    watch = reverse("api_watchlist_listing", args=[listing.id])
+    assert client.put(watch).status_code == 401
+    assert client.get(reverse("api_watchlist")).status_code == 401
+    assert client.delete(bids).status_code == 405
+
+
+@pytest.mark.django_db
+def test_comments(authenticated_client, create_listing):
+    client, user = authenticated_client
+    listing = create_listing(user=user)
+    Comment.objects.create(listing=listing, commenter=user, content="first")
+    url = reverse("api_comments", args=[listing.id])
+
+    response = client.post(url, {"comment": "second"}, content_type="application/json")
+    assert response.status_code == 201
+    assert response.json()["author"] == user.username
+    assert (
+        client.post(url, {"comment": ""}, content_type="application/json").status_code
+        == 400
+    )
+
+    rows = client.get(url).json()["results"]
+    assert [row["content"] for row in rows] == ["second", "first"]
+    assert client.get(reverse("api_comments", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_categories_revalidate_by_content(client, create_listing):
+    create_listing(category=Category.objects.create(name="Toys"))
+    url = reverse("api_categories")
+    response = client.get(url)
+    assert response.json()["results"][0]["active_listings"] == 1
+    assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_watchlist(authenticated_client, create_user, create_listing):
+    client, user = authenticated_client
+    seller = create_user(username="seller")
+    listing = create_listing(user=seller)
+    closed = create_listing(title="Closed", user=seller)
+    Listing.objects.filter(pk=closed.pk).close()
+    url = reverse("api_watchlist_listing", args=[listing.id])
+
+    assert client.put(url).status_code == 204
+    assert client.put(url).status_code == 204
+    response = client.get(reverse("api_watchlist"))
+    assert [row["id"] for row in response.json()["results"]] == [listing.id]
+    assert "private" in response["Cache-Control"]
+    closed_url = reverse("api_watchlist_listing", args=[closed.id])
+    assert client.put(closed_url).status_code == 409
+
+    assert client.delete(url).status_code == 204
+    assert client.get(reverse("api_watchlist")).json()["results"] == []
+    assert client.delete(reverse("api_watchlist_listing", args=[0])).status_code == 404
+
+
+@pytest.mark.parametrize(
+    "view",
+    [
+        api.listings,
+        api.listing,
+        api.bids,
+        api.comments,
+        api.categories,
+        api.watched_listings,
+        api.bid_submission,
+        api.notifications,
+    ],
+)
+def test_read_views_are_async(view):
+    assert iscoroutinefunction(view)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_under_asgi(create_listing):
+    listing = create_listing(title="Camera")
+    client = AsyncClient()
+
+    async def fetch(*urls):
+        return [await client.get(url) for url in urls]
+
+    listings, detail = asyncio.run(
+        fetch(reverse("api_listings"), reverse("api_listing", args=[listing.id]))
+    )
+    assert listings.json()["results"][0]["title"] == "Camera"
+    assert detail.json()["title"] == "Camera"
+
+
+@pytest.mark.django_db
+def test_bid_history_polls_since_an_id(client, create_user, create_listing):
+    listing = create_listing(user=create_user(username="seller"))
+    bidder = create_user()
+    for amount in (600, 700, 800):
+        place_bid(listing.id, bidder, amount)
+    url = reverse("api_bids", args=[listing.id])
+
+    first = client.get(url, {"limit": 2}).json()
+    assert first["amounts"] == ["600.00", "700.00"]
+    assert len(first["placed_at"]) == 2
+    assert first["more"] is True
+
+    rest = client.get(url, {"since_id": first["last_id"]}).json()
+    assert rest["amounts"] == ["800.00"]
+    assert rest["more"] is False
+
+    idle = client.get(url, {"since_id": rest["last_id"]}).json()
+    assert (idle["amounts"], idle["last_id"]) == ([], rest["last_id"])
+    assert client.get(url, {"since_id": "x"}).status_code == 400
+    assert client.get(reverse("api_bids", args=[0])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_bid_history_seeks_the_index(client, create_listing):
+    listing = create_listing()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("api_bids", args=[listing.id]), {"since_id": 5})
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + queries[0]["sql"])
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    assert "USING" in plan and "INDEX" in plan and "TEMP B-TREE" not in plan
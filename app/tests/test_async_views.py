@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncClient
+from django.urls import reverse
+from auctions import views
+from auctions.models import Category, Watchlist
+
+
+@pytest.mark.parametrize(
+    "view",
+    [
+        views.index,
+        views.categories_view,
+        views.category_view,
+        views.listing_view,
+        views.watchlist_view,
+    ],
+)
+def test_read_views_are_async(view):
+    assert iscoroutinefunction(view)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_read_pages_under_asgi(create_user, create_listing):
+    user = create_user()
+    category = Category.objects.create(name="Books")
+    seller = create_user(username="seller")
+    listing = create_listing(title="Camera", category=category, user=seller)
+    Watchlist.objects.create(user=user).listings.add(listing)
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def fetch(*urls):
+        return [await client.get(url) for url in urls]
+
+    responses = asyncio.run(
+        fetch(
+            reverse("index"),
+            reverse("categories"),
+            reverse("category", args=[category.id]),
+            reverse("listing", args=[listing.id]),
+            reverse("watchlist"),
+        )
+    )
+
+    for response in responses:
+        assert response.status_code == 200
+        assert b"Signed in as <strong>testuser</strong>" in response.content
+    assert b"Camera" in responses[0].content
+    assert b"Books" in responses[1].content
+    assert b"Remove from Watchlist" in responses[3].content
+
+
+@pytest.mark.django_db
+def test_watchlist_requires_login(client):
+    response = client.get(reverse("watchlist"))
+    assert response.status_code == 302
+    assert response.url.startswith(reverse("login"))
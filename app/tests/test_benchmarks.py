@@ -0,0 +1,52 @@
+import pytest
+from django.db.models import Count, Max
+from auctions.models import Listing
+from benchmarks.run import regressions, run_scenario
+from benchmarks.scenarios import SCENARIOS, ClientTransport, Context
+from benchmarks.seed import PASSWORD, seed
+
+
+@pytest.mark.django_db
+def test_seed_keeps_listing_aggregates_consistent():
+    listing_ids = seed(users=3, listings=5, bids=4, comments=1, watchlist=2)
+
+    listings = Listing.objects.filter(id__in=listing_ids).annotate(
+        n=Count("bids"), top=Max("bids__amount")
+    )
+    assert len(listings) == 5
+    for listing in listings:
+        assert listing.bid_count == listing.n == 4
+        assert listing.current_price == listing.top
+
+
+@pytest.mark.django_db
+def test_scenarios_run_against_test_client():
+    seed(users=2, listings=3, bids=1, comments=0, watchlist=1)
+    ctx = Context.from_database(PASSWORD)
+
+    for scenario in SCENARIOS.values():
+        result = run_scenario(scenario, ctx, ClientTransport, requests=4, concurrency=1)
+        assert result.errors == 0
+        assert len(result.queries) == 4
+
+
+def test_regressions_compare_with_baseline():
+    baseline = {
+        "index": {"queries_per_request": 2, "p95_ms": 10, "requests_per_second": 100}
+    }
+    ok = {
+        "queries_per_request": 2,
+        "p95_ms": 14,
+        "requests_per_second": 60,
+        "errors": 0,
+    }
+    worse = {
+        "queries_per_request": 3,
+        "p95_ms": 16,
+        "requests_per_second": 40,
+        "errors": 1,
+    }
+
+    assert list(regressions({"index": ok}, baseline, tolerance=0.5)) == []
+    assert len(list(regressions({"index": worse}, baseline, tolerance=0.5))) == 4
+    assert list(regressions({"new": ok}, baseline, tolerance=0.5)) == []
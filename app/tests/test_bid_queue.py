@@ -0,0 +1,161 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions import bidqueue
+from auctions.bidding import place_bid, set_max_bid
+from auctions.models import Bid, BidSubmission
+
+
+@pytest.fixture
+def queue(settings):
+    settings.AUCTIONS_BID_QUEUE = True
+    settings.AUCTIONS_BID_QUEUE_SHARDS = 2
+
+
+@pytest.mark.django_db
+def test_drain_decides_in_arrival_order(queue, create_user, create_listing):
+    listing = create_listing(bid=100)
+    ann, bob = create_user(username="ann"), create_user(username="bob")
+    submissions = [
+        bidqueue.submit(listing.id, ann, 150),
+        bidqueue.submit(listing.id, bob, 120),
+        bidqueue.submit(listing.id, bob, 200),
+        bidqueue.submit(0, bob, 300),
+    ]
+
+    assert bidqueue.drain(shard=listing.id % 2) == 3
+    assert bidqueue.drain(shard=0 if listing.id % 2 else 1) == 1
+
+    decided = [BidSubmission.objects.get(pk=s.pk) for s in submissions]
+    assert [s.status for s in decided] == [
+        "accepted",
+        "outbid",
+        "accepted",
+        "not_found",
+    ]
+    assert decided[1].current_price == 150
+    listing.refresh_from_db()
+    assert listing.current_price == 200
+    assert listing.bid_count == 2
+    assert listing.highest_bid == decided[2].bid
+
+
+@pytest.mark.django_db
+def test_batch_cost_does_not_grow_with_its_size(queue, create_user, create_listing):
+    listing = create_listing(bid=1)
+    bidder = create_user(username="bidder")
+    for amount in (2, 3):
+        bidqueue.submit(listing.id, bidder, amount)
+    with CaptureQueriesContext(connection) as few:
+        bidqueue.drain(shard=listing.id % 2)
+    for amount in range(10, 60):
+        bidqueue.submit(listing.id, bidder, amount)
+    with CaptureQueriesContext(connection) as many:
+        bidqueue.drain(shard=listing.id % 2)
+
+    assert len(few) == len(many)
+    assert Bid.objects.count() == 52
+
+
+@pytest.mark.django_db
+def test_maxima_answer_each_bid_as_place_bid_does(queue, create_user, create_listing):
+    seller = create_user(username="seller")
+    queued, direct = [create_listing(bid=10, user=seller) for _ in range(2)]
+    ann, bob = create_user(username="ann"), create_user(username="bob")
+    bids = [(bob, 20), (bob, 21), (bob, 30), (ann, 60)]
+    for listing in (queued, direct):
+        set_max_bid(listing.id, ann, 50)
+    submissions = [bidqueue.submit(queued.id, user, amount) for user, amount in bids]
+    results = [place_bid(direct.id, user, amount) for user, amount in bids]
+
+    bidqueue.drain(shard=queued.id % 2)
+
+    def history(listing):
+        return list(
+            Bid.objects.filter(listing=listing)
+            .order_by("id")
+            .values_list("bidder", "amount")
+        )
+
+    assert history(queued) == history(direct)
+    decided = [BidSubmission.objects.get(pk=s.pk) for s in submissions]
+    assert [(s.status, s.current_price) for s in decided] == [
+        (r.status.value, r.current_price) for r in results
+    ]
+    # 21 does not beat ann's answer to 20
+    assert decided[1].status == "outbid"
+    queued.refresh_from_db()
+    assert (queued.current_price, queued.bid_count) == (60, 6)
+
+
+@pytest.mark.django_db
+def test_api_acknowledges_then_reports_the_outcome(
+    queue, authenticated_client, create_user, create_listing
+):
+    client, user = authenticated_client
+    listing = create_listing(user=create_user(username="seller"))
+
+    response = client.post(
+        reverse("api_bids", args=[listing.id]),
+        {"bid": "600"},
+        content_type="application/json",
+    )
+    assert response.status_code == 202
+    url = response["Location"]
+    assert client.get(url).json()["status"] == "pending"
+    assert not Bid.objects.exists()
+
+    bidqueue.drain(shard=listing.id % 2)
+    outcome = client.get(url).json()
+    assert outcome["status"] == "accepted"
+    assert outcome["current_price"] == "600.00"
+    assert outcome["leading"] is True
+    assert "private" in client.get(url)["Cache-Control"]
+
+    other = create_user(username="other")
+    client.force_login(other)
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_listing_view_queues_the_bid(
+    queue, authenticated_client, create_user, create_listing
+):
+    client, user = authenticated_client
+    listing = create_listing(user=create_user(username="seller"))
+
+    response = client.post(
+        reverse("listing", args=[listing.id]), {"bid": "600"}, follow=True
+    )
+
+    assert "Your bid is queued" in response.content.decode()
+    assert BidSubmission.objects.get().amount == Decimal("600")
+
+
+@pytest.mark.django_db
+def test_prune_keeps_pending_and_recent(queue, create_user, create_listing):
+    listing = create_listing(bid=1)
+    bidder = create_user(username="bidder")
+    bidqueue.submit(listing.id, bidder, 2)
+    bidqueue.drain(shard=listing.id % 2)
+    pending = bidqueue.submit(listing.id, bidder, 3)
+
+    assert bidqueue.prune() == 0
+    later = BidSubmission.objects.get(status="accepted").processed_at
+    assert bidqueue.prune(now=later + timedelta(days=2)) == 1
+    assert list(BidSubmission.objects.all()) == [pending]
+
+
+@pytest.mark.django_db
+def test_drain_command(queue, create_user, create_listing, capsys):
+    listing = create_listing(bid=1)
+    bidqueue.submit(listing.id, create_user(username="bidder"), 2)
+
+    call_command("drain_bid_queue", shard=listing.id % 2, once=True)
+
+    assert "Decided 1 bid(s)." in capsys.readouterr().out
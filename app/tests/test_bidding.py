@@ -0,0 +1,125 @@
+import random
+import threading
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.bidding import BidStatus, place_bid
+from auctions.models import Bid, Listing
+
+
+@pytest.mark.django_db
+def test_place_bid_accepted(create_user, create_listing):
+    listing = create_listing(bid=100)
+    bidder = create_user(username="bidder")
+
+    result = place_bid(listing.id, bidder, Decimal("100.01"))
+
+    assert result.accepted
+    assert result.current_price == Decimal("100.01")
+    assert result.bid.bidder == bidder
+    listing.refresh_from_db()
+    assert listing.highest_bid == result.bid
+
+
+@pytest.mark.django_db
+def test_place_bid_writes(create_user, create_listing):
+    listing = create_listing(bid=100)
+    bidder = create_user(username="bidder")
+    with CaptureQueriesContext(connection) as queries:
+        place_bid(listing.id, bidder, 150)
+
+    writes = [q["sql"].split(" ")[:3] for q in queries if "SELECT" not in q["sql"]]
+    writes = [" ".join(w) for w in writes if w[0] in ("INSERT", "UPDATE")]
+    # the claim, the bid, the leader and version, the notification event
+    assert writes == [
+        'UPDATE "auctions_listing" SET',
+        'INSERT INTO "auctions_bid"',
+        'UPDATE "auctions_listing" SET',
+        'INSERT INTO "auctions_notificationevent"',
+    ]
+    assert Listing.objects.get(pk=listing.pk).version == listing.version + 1
+
+
+@pytest.mark.django_db
+def test_place_bid_must_beat_current_price(create_user, create_listing):
+    listing = create_listing(bid=100)
+    bidder = create_user(username="bidder")
+
+    assert place_bid(listing.id, bidder, 100).status is BidStatus.OUTBID
+    place_bid(listing.id, bidder, 200)
+    result = place_bid(listing.id, bidder, 150)
+
+    assert result.status is BidStatus.OUTBID
+    assert result.current_price == 200
+    assert Bid.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_place_bid_on_closed_listing(create_user, create_listing):
+    listing = create_listing(bid=100)
+    Listing.objects.filter(pk=listing.pk).update(is_active=False)
+
+    result = place_bid(listing.id, create_user(username="bidder"), 500)
+
+    assert result.status is BidStatus.CLOSED
+    assert not Bid.objects.exists()
+
+
+@pytest.mark.django_db
+def test_place_bid_unknown_listing(create_user):
+    result = place_bid(999, create_user(), 500)
+    assert result.status is BidStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_listing_view_closed_auction_rejects_bid(
+    authenticated_client, create_user, create_listing
+):
+    client, _ = authenticated_client
+    listing = create_listing(user=create_user(username="seller"))
+    Listing.objects.filter(pk=listing.pk).update(is_active=False)
+
+    response = client.post(reverse("listing", args=[listing.id]), {"bid": 1000})
+
+    assert response.status_code == 200
+    assert not Bid.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_bids_keep_the_maximum(create_user, create_listing):
+    listing = create_listing(bid=1)
+    bidders = [create_user(username=f"bidder{i}") for i in range(8)]
+    amounts = [Decimal(n) for n in random.sample(range(2, 100_000), 2000)]
+    chunks = [amounts[i::8] for i in range(8)]
+    start = threading.Barrier(len(bidders))
+    errors = []
+
+    def bid_storm(bidder, chunk):
+        try:
+            start.wait()
+            for amount in chunk:
+                place_bid(listing.id, bidder, amount)
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=bid_storm, args=args) for args in zip(bidders, chunks)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    listing.refresh_from_db()
+    accepted = list(listing.bids.order_by("id").values_list("amount", flat=True))
+    assert listing.current_price == max(amounts)
+    assert listing.highest_bid.amount == max(amounts)
+    assert listing.bid_count == len(accepted)
+    # Every accepted bid strictly beat the one accepted before it
+    assert accepted == sorted(set(accepted))
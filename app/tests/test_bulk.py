@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.bulk import import_listings, read_rows
+from auctions.models import Category, Listing
+from auctions.search import search_listings
+
+CSV = """title,description,starting_bid,image_url,category
+Oak table,Solid oak,120.50,,furniture
+Desk lamp,Brass lamp,15,https://example.com/lamp.jpg,
+,No title,10,,
+Chair,Bad price,-3,,
+Vase,Unknown category,8,,Pottery
+Rug,Wool rug,60,,Furniture
+Mirror,Round mirror,25,,
+"""
+
+
+@pytest.mark.django_db
+def test_import_validates_rows_and_inserts_in_batches(create_user):
+    seller = create_user()
+    furniture = Category.objects.create(name="Furniture")
+
+    with CaptureQueriesContext(connection) as queries:
+        result = import_listings(
+            read_rows(CSV.splitlines(keepends=True), "csv"), seller, batch_size=2
+        )
+
+    assert result.created == 4
+    assert result.rejected == 3
+    assert [number for number, _ in result.errors] == [4, 5, 6]
+    assert set(result.errors[0][1]) == {"title"}
+    assert set(result.errors[2][1]) == {"category"}
+    inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 2
+
+    table = Listing.objects.get(title="Oak table")
+    assert table.current_price == table.starting_bid
+    assert table.category == furniture
+    assert table.created_by == seller
+    assert Listing.objects.filter(category=furniture).count() == 2
+    assert [listing.title for listing in search_listings("brass")] == ["Desk lamp"]
+
+
+@pytest.mark.django_db
+def test_import_command_jsonl_and_dry_run(create_user, tmp_path, capsys):
+    create_user(username="seller")
+    path = tmp_path / "listings.jsonl"
+    path.write_text(
+        json.dumps({"title": "Kite", "description": "Red kite", "starting_bid": 9})
+        + "\n\n"
+        + json.dumps({"title": "Bad", "description": "", "starting_bid": 1})
+        + "\n"
+    )
+
+    call_command("import_listings", str(path), seller="seller", dry_run=True)
+    assert Listing.objects.count() == 0
+
+    call_command("import_listings", str(path), seller="seller")
+    output = capsys.readouterr()
+    assert "Imported 1 listing(s), rejected 1." in output.out
+    assert "Line 3: description" in output.err
+    assert Listing.objects.get().title == "Kite"
+
+
+@pytest.mark.django_db
+def test_export_round_trips_through_import(create_user, create_listing, tmp_path):
+    user = create_user()
+    books = Category.objects.create(name="Books")
+    create_listing(title="Atlas", description="World, 1990", category=books, user=user)
+    create_listing(title="Globe", description='Says "hi"', bid=12.5, user=user)
+
+    path = tmp_path / "listings.csv"
+    call_command("export_listings", str(path), chunk_size=1)
+    seller = create_user(username="other")
+    call_command("import_listings", str(path), seller=seller.username)
+
+    copies = Listing.objects.filter(created_by=seller).order_by("id")
+    assert [(c.title, c.description, c.category) for c in copies] == [
+        ("Atlas", "World, 1990", books),
+        ("Globe", 'Says "hi"', None),
+    ]
+
+
+@pytest.mark.django_db
+def test_export_view_streams_for_staff(client, create_user, create_listing):
+    staff = create_user()
+    staff.is_staff = True
+    staff.save()
+    create_listing(title="Atlas", user=staff)
+    url = reverse("export_listings")
+
+    assert client.get(url).status_code == 302
+    client.force_login(staff)
+    response = client.get(url, {"format": "jsonl", "active": 1})
+
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = [
+        json.loads(line) for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert [(row["title"], row["seller"]) for row in rows] == [("Atlas", "testuser")]
+    assert client.get(url, {"format": "xml"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_import_view_reports_rejected_rows(client, create_user):
+    staff = create_user()
+    staff.is_staff = True
+    staff.save()
+    client.force_login(staff)
+    upload = SimpleUploadedFile("listings.csv", CSV.encode(), content_type="text/csv")
+
+    response = client.post(reverse("import_listings"), {"file": upload})
+
+    assert response.status_code == 200
+    assert response.context["result"].created == 2
+    assert "Unknown category: Pottery." in response.content.decode()
+
+    bad = SimpleUploadedFile("listings.jsonl", b"not json\n")
+    response = client.post(reverse("import_listings"), {"file": bad})
+    assert response.status_code == 400
+    assert Listing.objects.count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_view_streams_async_under_asgi(create_user, create_listing):
+    staff = create_user()
+    staff.is_staff = True
+    staff.save()
+    for title in ("Atlas", "Globe", "Map"):
+        create_listing(title=title, user=staff)
+    client = AsyncClient()
+    client.force_login(staff)
+
+    async def export():
+        response = await client.get(reverse("export_listings"))
+        assert response.is_async
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    with override_settings(AUCTIONS_EXPORT_CHUNK_SIZE=2):
+        lines = asyncio.run(export()).decode().splitlines()
+
+    assert lines[0].startswith("id,title,description")
+    assert [line.split(",")[1] for line in lines[1:]] == ["Atlas", "Globe", "Map"]
@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+from auctions import metrics
+from auctions.bidding import place_bid
+from auctions.models import Category, Listing
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    metrics.registry.clear()
+
+
+def hits():
+    return metrics.registry.counter("auctions_card_cache_hits_total")
+
+
+def misses():
+    return metrics.registry.counter("auctions_card_cache_misses_total")
+
+
+@pytest.mark.django_db
+def test_cards_served_from_cache(client, create_user, create_listing):
+    user = create_user()
+    for i in range(3):
+        create_listing(title=f"Item {i}", user=user)
+
+    first = client.get(reverse("index"))
+    assert (hits(), misses()) == (0, 3)
+
+    second = client.get(reverse("index"))
+    assert (hits(), misses()) == (3, 3)
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_bid_invalidates_card(client, create_user, create_listing):
+    listing = create_listing(bid=100)
+    client.get(reverse("index"))
+
+    place_bid(listing.id, create_user(username="bidder"), 250)
+    response = client.get(reverse("index"))
+
+    assert b"250.00$" in response.content
+    assert misses() == 2
+
+
+@pytest.mark.django_db
+def test_listing_edit_invalidates_card(client, create_listing):
+    listing = create_listing(title="Old title")
+    client.get(reverse("index"))
+
+    listing.title = "New title"
+    listing.save()
+    response = client.get(reverse("index"))
+
+    assert b"New title" in response.content
+    assert b"Old title" not in response.content
+
+
+@pytest.mark.django_db
+def test_category_change_bumps_its_listings(create_listing):
+    category = Category.objects.create(name="Books")
+    listing = create_listing(category=category)
+    version = Listing.objects.get(pk=listing.pk).version
+
+    category.name = "Novels"
+    category.save()
+
+    assert Listing.objects.get(pk=listing.pk).version == version + 1
+
+
+@pytest.mark.django_db
+def test_save_does_not_clobber_bid_aggregates(create_user, create_listing):
+    listing = create_listing(bid=100)
+    stale = Listing.objects.get(pk=listing.pk)
+    place_bid(listing.id, create_user(username="bidder"), 300)
+
+    stale.is_active = False
+    stale.save()
+
+    listing.refresh_from_db()
+    assert not listing.is_active
+    assert listing.current_price == 300
+    assert listing.bid_count == 1
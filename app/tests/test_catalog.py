@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions import catalog
+from auctions.forms import ListingForm
+from auctions.models import Category
+
+
+@pytest.mark.django_db
+def test_catalog_counts_active_listings(create_user, create_listing):
+    user = create_user()
+    books = Category.objects.create(name="Books")
+    Category.objects.create(name="Art")
+    create_listing(category=books, user=user)
+    closed = create_listing(category=books, user=user)
+    closed.is_active = False
+    closed.save()
+    catalog.invalidate()
+
+    entries = catalog.get_categories()
+
+    assert [(e.name, e.active_listings) for e in entries] == [("Art", 0), ("Books", 1)]
+
+
+@pytest.mark.django_db
+def test_catalog_is_read_through(create_user):
+    Category.objects.create(name="Books")
+    catalog.invalidate()
+    catalog.get_categories()
+
+    with CaptureQueriesContext(connection) as queries:
+        catalog.get_categories()
+        ListingForm().as_p()
+
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_catalog_invalidated_on_change(
+    django_capture_on_commit_callbacks, create_listing
+):
+    catalog.invalidate()
+    assert catalog.get_categories() == ()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        books = Category.objects.create(name="Books")
+    assert [e.name for e in catalog.get_categories()] == ["Books"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        create_listing(category=books)
+    assert catalog.get_categories()[0].active_listings == 1
+
+
+@pytest.mark.django_db
+def test_categories_view_uses_catalog(client):
+    Category.objects.create(name="Books")
+    catalog.invalidate()
+    client.get(reverse("categories"))
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("categories"))
+
+    assert b"Books" in response.content
+    assert b"0 active listing(s)" in response.content
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_listing_form_choices_from_catalog():
+    books = Category.objects.create(name="Books")
+    catalog.invalidate()
+
+    choices = list(ListingForm().fields["category"].choices)
+
+    assert choices == [("", "---------"), (books.id, "Books")]
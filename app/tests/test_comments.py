@@ -0,0 +1,73 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.models import Comment, Listing
+
+
+@pytest.fixture
+def thread(settings, create_user, create_listing):
+    settings.AUCTIONS_COMMENT_PAGE_SIZE = 3
+    listing = create_listing(user=create_user(username="seller"))
+    commenter = create_user(username="commenter")
+    for i in range(7):
+        Comment.objects.create(listing=listing, commenter=commenter, content=f"c{i}")
+    return listing
+
+
+def shown(content):
+    return re.findall(r"commenter:</strong> (c\d)", content)
+
+
+@pytest.mark.django_db
+def test_listing_page_shows_the_newest_comments_then_loads_older(client, thread):
+    response = client.get(reverse("listing", args=[thread.id]))
+    content = response.content.decode()
+    assert shown(content) == ["c6", "c5", "c4"]
+    assert "Comments (7)" in content
+
+    cursor = response.context["comments"].next_cursor
+    older = []
+    while cursor:
+        page = client.get(reverse("api_comments", args=[thread.id]), {"cursor": cursor})
+        older += [row["content"] for row in page.json()["results"]]
+        cursor = page.json()["next"]
+    assert older == ["c3", "c2", "c1", "c0"]
+
+
+@pytest.mark.django_db
+def test_comment_page_is_one_narrow_query(client, thread):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("listing", args=[thread.id]))
+
+    sql = next(q["sql"] for q in queries if 'FROM "auctions_comment"' in q["sql"])
+    assert '"auctions_user"."username"' in sql
+    assert "password" not in sql
+    comments = Comment.objects.filter(listing_id=thread.id).order_by(
+        "-created_at", "-id"
+    )
+    sql, params = comments.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    assert "comment_thread_idx" in plan
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_the_comments(authenticated_client, thread):
+    client, user = authenticated_client
+    client.post(reverse("listing", args=[thread.id]), {"comment": "from the page"})
+    client.post(
+        reverse("api_comments", args=[thread.id]),
+        {"comment": "from the api"},
+        content_type="application/json",
+    )
+    thread.refresh_from_db()
+    assert thread.comment_count == 9
+
+    Comment.objects.filter(commenter=user).first().delete()
+    Listing.objects.filter(pk=thread.pk).update(comment_count=0)
+    Listing.objects.filter(pk=thread.pk).repair_aggregates()
+    assert Listing.objects.get(pk=thread.pk).comment_count == 8
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.bidding import place_bid
+from auctions.models import Bid, Listing
+
+
+@pytest.fixture
+def activity(create_user, create_listing):
+    """testuser sells one listing and bid on four, in every state."""
+    user, rival = create_user(), create_user(username="rival")
+    seller = create_user(username="seller")
+    create_listing(title="Selling", user=user)
+    listings = {
+        title: create_listing(title=title, bid=100, user=seller)
+        for title in ("Winning", "Outbid", "Won", "Lost")
+    }
+    for listing in listings.values():
+        place_bid(listing.id, rival, 110)
+        place_bid(listing.id, user, 120)
+        place_bid(listing.id, user, 130)
+    for title in ("Outbid", "Lost"):
+        place_bid(listings[title].id, rival, 200)
+    Listing.objects.filter(title__in=["Won", "Lost"]).close()
+    return user
+
+
+@pytest.mark.django_db
+def test_activity_states(activity):
+    rows = {
+        listing.title: (listing.state, listing.my_bid)
+        for listing in Listing.objects.activity(activity)
+    }
+    assert rows == {
+        "Selling": ("selling", None),
+        "Winning": ("winning", 130),
+        "Outbid": ("outbid", 130),
+        "Won": ("won", 130),
+        "Lost": ("lost", 130),
+    }
+
+
+@pytest.mark.django_db
+def test_activity_reads_the_bidder_index(activity):
+    sql, params = Listing.objects.activity(activity).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    assert "bid_bidder_listing_idx" in plan
+
+
+@pytest.mark.django_db
+def test_dashboard_queries_do_not_grow(client, activity, create_listing):
+    client.force_login(activity)
+    with CaptureQueriesContext(connection) as few:
+        client.get(reverse("dashboard"))
+    seller = Listing.objects.get(title="Winning").created_by
+    for i in range(10):
+        listing = create_listing(title=f"Item {i}", user=seller)
+        place_bid(listing.id, activity, 600)
+
+    with CaptureQueriesContext(connection) as many:
+        response = client.get(reverse("dashboard"))
+
+    assert len(few) == len(many)
+    assert response.content.decode().count("state-winning") == 11
+
+
+@pytest.mark.django_db
+def test_dashboard_filters_and_pages(client, activity):
+    client.force_login(activity)
+    url = reverse("dashboard")
+
+    response = client.get(url, {"state": "won"})
+    assert [row.title for row in response.context["listings"]] == ["Won"]
+
+    first = client.get(url, {"page_size": 3})
+    cursor = first.context["page"].next_cursor
+    second = client.get(url, {"page_size": 3, "cursor": cursor})
+    titles = [row.title for row in first.context["listings"]]
+    titles += [row.title for row in second.context["listings"]]
+    assert sorted(titles) == ["Lost", "Outbid", "Selling", "Winning", "Won"]
+    assert Bid.objects.filter(bidder=activity).count() == 8
+
+
+@pytest.mark.django_db
+def test_dashboard_needs_login(client):
+    assert client.get(reverse("dashboard")).status_code == 302
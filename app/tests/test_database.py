@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.django_db
+def test_sqlite_connections_are_tuned():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1  # NORMAL
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+
+
+def test_sqlite_is_the_default(monkeypatch, load_settings):
+    monkeypatch.delenv("DJANGO_DB_ENGINE", raising=False)
+    database = load_settings()["DATABASES"]["default"]
+    assert database["ENGINE"] == "django.db.backends.sqlite3"
+    assert database["CONN_MAX_AGE"] == 60
+    assert database["CONN_HEALTH_CHECKS"] is True
+
+
+def test_postgresql_from_the_environment(load_settings):
+    database = load_settings(
+        DJANGO_DB_ENGINE="postgresql",
+        DJANGO_DB_NAME="auctions",
+        DJANGO_DB_HOST="db",
+        DJANGO_DB_CONN_MAX_AGE="300",
+    )["DATABASES"]["default"]
+    assert database["ENGINE"] == "django.db.backends.postgresql"
+    assert (database["NAME"], database["HOST"]) == ("auctions", "db")
+    assert database["CONN_MAX_AGE"] == 300
+
+
+def test_pgbouncer_disables_server_side_cursors(load_settings):
+    database = load_settings(
+        DJANGO_DB_ENGINE="postgresql",
+        DJANGO_DB_HOST="pgbouncer",
+        DJANGO_DB_PGBOUNCER="true",
+    )["DATABASES"]["default"]
+    assert database["HOST"] == "pgbouncer"
+    assert database["DISABLE_SERVER_SIDE_CURSORS"] is True
+
+
+def test_replicas_from_the_environment(load_settings):
+    settings = load_settings(
+        DJANGO_DB_ENGINE="postgresql", DJANGO_DB_REPLICA_HOSTS="db-r1, db-r2"
+    )
+    assert settings["AUCTIONS_READ_REPLICAS"] == ["replica1", "replica2"]
+    replica = settings["DATABASES"]["replica2"]
+    assert replica["HOST"] == "db-r2"
+    assert replica["TEST"] == {"MIRROR": "default"}
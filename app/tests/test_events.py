@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+from django.urls import reverse
+from auctions import events
+from auctions.bidding import place_bid
+
+
+def test_hub_fans_out_across_threads():
+    hub = events.Hub(events.LocalBroker())
+
+    async def listen():
+        subscriptions = [hub.subscribe("listing:1") for _ in range(3)]
+        other = hub.subscribe("listing:2")
+        publisher = threading.Thread(
+            target=hub.publish, args=("listing:1", {"type": "price"})
+        )
+        publisher.start()
+        received = [await asyncio.wait_for(s.get(), 1) for s in subscriptions]
+        publisher.join()
+        return received, other.queue.empty()
+
+    received, other_empty = asyncio.run(listen())
+
+    assert received == [{"type": "price"}] * 3
+    assert other_empty
+
+
+def test_slow_subscriber_drops_oldest_events():
+    hub = events.Hub(events.LocalBroker())
+
+    async def listen():
+        subscription = hub.subscribe("listing:1")
+        subscription.queue = asyncio.Queue(2)
+        for n in range(3):
+            hub.publish("listing:1", {"n": n})
+        await asyncio.sleep(0)
+        return [subscription.queue.get_nowait() for _ in range(2)]
+
+    assert asyncio.run(listen()) == [{"n": 1}, {"n": 2}]
+
+
+def test_unsubscribe_forgets_channel():
+    hub = events.Hub(events.LocalBroker())
+
+    async def listen():
+        hub.subscribe("listing:1").close()
+
+    asyncio.run(listen())
+    assert not hub._subscriptions
+
+
+@pytest.mark.django_db
+def test_accepted_bid_publishes_price_after_commit(
+    django_capture_on_commit_callbacks, create_user, create_listing
+):
+    listing = create_listing(bid=100)
+    with django_capture_on_commit_callbacks() as callbacks:
+        place_bid(listing.id, create_user(username="bidder"), 150)
+
+    async def listen():
+        subscription = events.get_hub().subscribe(events.listing_channel(listing.id))
+        for callback in callbacks:
+            callback()
+        return await asyncio.wait_for(subscription.get(), 1)
+
+    event = asyncio.run(listen())
+    assert event["type"] == "price"
+    assert event["current_price"] == 150
+    assert event["bid_count"] == 1
+
+
+def test_stream_ends_when_auction_closes():
+    snapshot = {"type": "price", "listing": 7, "current_price": "10.00"}
+
+    async def consume():
+        stream = events.stream_listing(events.subscribe_listing(7), snapshot)
+        chunks = [await stream.__anext__()]
+        events.get_hub().publish("listing:7", {"type": "closed", "listing": 7})
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    first, closed = asyncio.run(consume())
+    assert first.startswith("retry: ")
+    assert "event: price\n" in first
+    assert '"current_price":"10.00"' in first
+    assert closed == 'event: closed\ndata: {"type":"closed","listing":7}\n\n'
+
+
+def test_stream_skips_events_the_snapshot_shows():
+    async def consume():
+        # published between subscribing and reading the snapshot
+        subscription = events.subscribe_listing(8)
+        for n in (1, 2):
+            events.get_hub().publish("listing:8", {"type": "price", "bid_count": n})
+        events.get_hub().publish("listing:8", {"type": "closed"})
+        snapshot = {"type": "price", "listing": 8, "bid_count": 1}
+        return [chunk async for chunk in events.stream_listing(subscription, snapshot)]
+
+    chunks = asyncio.run(consume())
+    assert [chunk.split("\n")[-3] for chunk in chunks] == [
+        'data: {"type":"price","listing":8,"bid_count":1}',
+        'data: {"type":"price","bid_count":2}',
+        'data: {"type":"closed"}',
+    ]
+
+
+def test_dropped_or_old_streams_release_their_subscription():
+    snapshot = {"type": "price", "listing": 9, "bid_count": 0}
+    hub = events.get_hub()
+
+    async def drop():
+        stream = events.stream_listing(events.subscribe_listing(9), snapshot)
+        await stream.__anext__()
+        # what the server does with the response of a client that went away
+        await stream.aclose()
+
+    async def outlive():
+        stream = events.stream_listing(events.subscribe_listing(9), snapshot, 0.05)
+        return [chunk async for chunk in stream]
+
+    asyncio.run(drop())
+    assert "listing:9" not in hub._subscriptions
+    chunks = asyncio.run(outlive())
+    assert chunks[-1] == ": keep-alive\n\n"
+    assert "listing:9" not in hub._subscriptions
+
+
+@pytest.mark.django_db
+def test_events_view_answers_snapshot_under_wsgi(client, create_listing):
+    listing = create_listing(bid=100)
+
+    response = client.get(reverse("listing_events", args=[listing.id]))
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert b"event: price" in response.content
+    assert b'"current_price":"100.00"' in response.content
+
+
+@pytest.mark.django_db
+def test_events_view_unknown_listing(client):
+    response = client.get(reverse("listing_events", args=[999]))
+    assert response.status_code == 404
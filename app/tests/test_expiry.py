@@ -0,0 +1,161 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from auctions import expiry
+from auctions.bidding import BidStatus, place_bid
+from auctions.forms import ListingForm
+from auctions.models import Listing, NotificationEvent
+
+
+def ending(listing, delta):
+    listing.ends_at = timezone.now() + delta
+    listing.save()
+    return listing
+
+
+@pytest.mark.django_db
+def test_close_due_closes_expired_listings_and_records_winners(
+    create_user, create_listing
+):
+    seller = create_user()
+    bidder = create_user(username="bidder")
+    due = [ending(create_listing(user=seller), timedelta(seconds=-i)) for i in range(5)]
+    later = ending(create_listing(user=seller), timedelta(hours=1))
+    open_ended = create_listing(user=seller)
+    with_bid = due[0]
+    with_bid.ends_at = timezone.now() + timedelta(seconds=1)
+    with_bid.save()
+    place_bid(with_bid.id, bidder, 600)
+    Listing.objects.filter(pk=with_bid.pk).update(ends_at=timezone.now())
+    versions = dict(Listing.objects.values_list("pk", "version"))
+
+    with CaptureQueriesContext(connection) as queries:
+        closed = expiry.close_due(batch_size=2)
+
+    assert closed == 5
+    updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+    assert len(updates) == 3
+    assert not Listing.objects.filter(pk__in=[d.pk for d in due], is_active=True)
+    assert (
+        Listing.objects.filter(pk__in=[later.pk, open_ended.pk], is_active=True).count()
+        == 2
+    )
+    assert Listing.objects.get(pk=with_bid.pk).won_by == bidder
+    assert Listing.objects.get(pk=due[1].pk).won_by is None
+    assert all(
+        listing.version == versions[listing.pk] + 1
+        for listing in Listing.objects.filter(is_active=False)
+    )
+    assert expiry.close_due() == 0
+
+
+@pytest.mark.django_db
+def test_close_announces_only_what_it_closed(monkeypatch, create_user, create_listing):
+    published = []
+    monkeypatch.setattr(
+        expiry.events, "publish_listing", lambda id, kind: published.append(id)
+    )
+    seller = create_user()
+    first, second = create_listing(user=seller), create_listing(user=seller)
+    Listing.objects.filter(pk=first.pk).close()
+
+    assert expiry.close_auctions([first.pk, second.pk]) == 1
+
+    assert published == [second.pk]
+    events = NotificationEvent.objects.values_list("listing_id", flat=True)
+    assert list(events) == [second.pk]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite query plan")
+def test_due_and_deadline_queries_use_the_expiry_index():
+    now = timezone.now()
+    due = Listing.objects.filter(is_active=True, ends_at__lte=now).order_by("ends_at")
+    upcoming = Listing.objects.filter(is_active=True, ends_at__isnull=False).order_by(
+        "ends_at"
+    )
+
+    for plan in (due.explain(), upcoming.explain()):
+        assert "listing_expiry_idx" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db
+def test_bids_rejected_once_the_end_time_passed(create_user, create_listing):
+    listing = ending(create_listing(), timedelta(seconds=1))
+    Listing.objects.filter(pk=listing.pk).update(ends_at=timezone.now())
+    bidder = create_user(username="bidder")
+
+    result = place_bid(listing.id, bidder, 1000)
+
+    assert result.status is BidStatus.CLOSED
+    assert Listing.objects.get(pk=listing.pk).bid_count == 0
+
+
+@pytest.mark.django_db
+def test_sleeps_until_the_next_deadline(create_listing):
+    now = timezone.now()
+    assert expiry.seconds_until_next(30, now) == 30
+
+    ending(create_listing(), timedelta(seconds=10))
+    assert 9 < expiry.seconds_until_next(30, now) < 11
+    assert expiry.seconds_until_next(5, now) == 5
+
+
+class OnePass(threading.Event):
+    def wait(self, timeout=None):
+        self.timeout = timeout
+        self.set()
+
+
+@pytest.mark.django_db
+def test_run_closes_then_waits_for_the_next_deadline(create_user, create_listing):
+    user = create_user()
+    due = ending(create_listing(user=user), timedelta(seconds=-1))
+    ending(create_listing(user=user), timedelta(seconds=20))
+    stop = OnePass()
+
+    expiry.run(stop, max_sleep=60)
+
+    assert not Listing.objects.get(pk=due.pk).is_active
+    assert 19 < stop.timeout <= 20
+
+
+@pytest.mark.django_db
+def test_close_command_once(create_listing, capsys):
+    ending(create_listing(), timedelta(seconds=-1))
+
+    call_command("close_expired_auctions", once=True)
+
+    assert "Closed 1 auction(s)." in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_close_view_records_the_winner(client, create_user, create_listing):
+    seller = create_user(username="seller")
+    bidder = create_user(username="bidder")
+    listing = create_listing(user=seller)
+    place_bid(listing.id, bidder, 600)
+    client.force_login(seller)
+
+    client.get(reverse("close_listing", args=[listing.id]))
+
+    listing.refresh_from_db()
+    assert not listing.is_active
+    assert listing.won_by == bidder
+
+
+@pytest.mark.django_db
+def test_listing_form_end_time_must_be_in_the_future():
+    data = {"title": "t", "description": "d", "starting_bid": 5}
+    past = ListingForm({**data, "ends_at": "2000-01-01T10:00"})
+    future = ListingForm({**data, "ends_at": "2999-01-01T10:00"})
+
+    assert past.errors["ends_at"] == ["The end time must be in the future."]
+    assert future.is_valid()
@@ -1,6 +1,11 @@
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from auctions.models import Listing, Category
+from auctions.bidding import place_bid
+from auctions.models import Bid, Category, Comment, Listing, Watchlist
 
 
 @pytest.mark.django_db
@@ -111,7 +116,8 @@ def test_listing_view_make_correct_bid_and_comment(
 
     listing.refresh_from_db()
 
-    assert listing.current_price() == float(300)
+    assert listing.current_price == 300
+    assert listing.bid_count == 1
 
     response = client.get(reverse("listing", args=[listing.id]))
 
@@ -161,3 +167,98 @@ def test_close_listing_not_owner(authenticated_client, create_user, create_listi
     listing.refresh_from_db()
     assert response.status_code == 302
     assert listing.is_active
+
+
+@pytest.mark.django_db
+def test_bids_keep_listing_aggregates_up_to_date(create_user, create_listing):
+    listing = create_listing(bid=100)
+    bidder = create_user(username="bidder")
+    assert listing.current_price == 100
+    assert listing.bid_count == 0
+
+    place_bid(listing.id, bidder, 120)
+    first = place_bid(listing.id, bidder, 150).bid
+    listing.refresh_from_db()
+    assert listing.current_price == 150
+    assert listing.bid_count == 2
+    assert listing.highest_bid == first
+
+    first.delete()
+    listing.refresh_from_db()
+    assert listing.current_price == 120
+    assert listing.bid_count == 1
+
+
+@pytest.mark.django_db
+def test_repair_listing_aggregates_command(create_user, create_listing):
+    listing = create_listing(bid=100)
+    bid = Bid.objects.create(listing=listing, bidder=create_user("bidder"), amount=300)
+    Listing.objects.update(
+        current_price=F("starting_bid"), bid_count=0, highest_bid=None
+    )
+
+    call_command("repair_listing_aggregates")
+
+    listing.refresh_from_db()
+    assert listing.current_price == 300
+    assert listing.bid_count == 1
+    assert listing.highest_bid == bid
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["index", "category", "watchlist"])
+def test_listing_pages_render_in_constant_queries(
+    authenticated_client, create_user, create_listing, url_name
+):
+    client, user = authenticated_client
+    seller = create_user(username="seller")
+    category = Category.objects.create(name="Books")
+    watchlist = Watchlist.objects.create(user=user)
+    args = [category.id] if url_name == "category" else []
+
+    def add_listings(count):
+        for i in range(count):
+            listing = create_listing(title=f"Book {i}", category=category, user=seller)
+            place_bid(listing.id, user, 1000 + i)
+            watchlist.listings.add(listing)
+
+    add_listings(2)
+    with CaptureQueriesContext(connection) as few:
+        assert client.get(reverse(url_name, args=args)).status_code == 200
+
+    add_listings(20)
+    with CaptureQueriesContext(connection) as many:
+        assert client.get(reverse(url_name, args=args)).status_code == 200
+
+    assert len(many) == len(few)
+
+
+@pytest.mark.django_db
+def test_listing_view_query_budget(authenticated_client, create_user, create_listing):
+    client, user = authenticated_client
+    listing = create_listing(user=create_user(username="seller"))
+    Watchlist.objects.create(user=user).listings.add(listing)
+
+    def add_activity(count):
+        for i in range(count):
+            commenter = create_user(username=f"commenter{listing.bid_count + i}")
+            place_bid(listing.id, commenter, 1000 + listing.bid_count + i)
+            Comment.objects.create(listing=listing, commenter=commenter, content="hi")
+        listing.refresh_from_db()
+
+    add_activity(1)
+    with CaptureQueriesContext(connection) as few:
+        response = client.get(reverse("listing", args=[listing.id]))
+    assert b"Remove from Watchlist" in response.content
+
+    add_activity(30)
+    with CaptureQueriesContext(connection) as many:
+        response = client.get(reverse("listing", args=[listing.id]))
+    # the newest page of comments, and the count of them all
+    assert response.content.count(b'<li class="list-group-item">') == 20
+    assert b"Comments (31)" in response.content
+
+    # session, user, listing, comments with commenters, and the watched ids
+    # until they are cached by the first view
+    assert len(few) == 5
+    assert len(many) == 4
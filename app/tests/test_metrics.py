@@ -0,0 +1,104 @@
+import json
+import logging
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from auctions import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    metrics.registry.clear()
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.AUCTIONS_METRICS_DIR = str(tmp_path)
+    settings.AUCTIONS_METRICS_INTERVAL = 0
+    # what another server worker saved
+    worker = metrics.Registry()
+    for _ in range(3):
+        worker.observe("index", metrics.RequestStats(), 0.01)
+    worker.inc("auctions_card_cache_hits_total", 4)
+    (tmp_path / "4242-other.json").write_text(json.dumps(worker.snapshot()))
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_server_timing_header(client, create_listing):
+    listing = create_listing()
+    response = client.get(reverse("listing", args=[listing.id]))
+
+    timing = response["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="2 queries"' in timing
+    assert "tpl;dur=" in timing
+    assert "total;dur=" in timing
+
+
+@pytest.mark.django_db
+def test_histograms_labelled_by_url_name(client):
+    client.get(reverse("index"))
+    client.get(reverse("index"))
+
+    text = metrics.registry.prometheus()
+    assert "# TYPE auctions_request_queries histogram" in text
+    assert 'auctions_request_duration_seconds_count{view="index"} 2' in text
+    assert 'auctions_request_queries_bucket{view="index",le="+Inf"} 2' in text
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_is_staff_only(client, authenticated_client):
+    response = client.get(reverse("metrics"))
+    assert response.status_code == 302
+
+    staff_client, user = authenticated_client
+    user.is_staff = True
+    user.save()
+    response = staff_client.get(reverse("metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert b"auctions_request_db_seconds" in response.content
+
+
+@pytest.mark.django_db
+def test_sql_logged_over_threshold(client, settings, caplog):
+    settings.AUCTIONS_METRICS_SQL_LOG_THRESHOLD = 0
+
+    with caplog.at_level(logging.WARNING, logger="auctions.middleware"):
+        client.get(reverse("index"))
+
+    assert "GET / (index) ran 1 queries" in caplog.text
+    assert 'FROM "auctions_listing"' in caplog.text
+
+
+@pytest.mark.django_db
+def test_request_metrics_command_sums_the_workers(client, metrics_dir, capsys):
+    client.get(reverse("index"))
+    client.get(reverse("index"))
+
+    call_command("request_metrics")
+    out = capsys.readouterr().out
+    assert 'auctions_request_queries_count{view="index"} 5' in out
+    assert "auctions_card_cache_hits_total 4" in out
+    assert len(list(metrics_dir.glob("*.json"))) == 2
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_sums_the_workers(authenticated_client, metrics_dir):
+    client, user = authenticated_client
+    user.is_staff = True
+    user.save()
+    client.get(reverse("index"))
+
+    response = client.get(reverse("metrics"))
+    assert (
+        b'auctions_request_duration_seconds_count{view="index"} 4' in response.content
+    )
+
+
+def test_request_metrics_command_needs_the_directory(settings):
+    settings.AUCTIONS_METRICS_DIR = None
+    with pytest.raises(CommandError):
+        call_command("request_metrics")
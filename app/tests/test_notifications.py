@@ -0,0 +1,153 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions import bidqueue, notifications
+from auctions.bidding import place_bid
+from auctions.expiry import close_auctions
+from auctions.models import Notification, NotificationEvent, Watchlist
+
+
+def received(listing):
+    return {
+        (n.user.username, n.kind)
+        for n in Notification.objects.filter(listing=listing).select_related("user")
+    }
+
+
+def watch(user, listing):
+    Watchlist.objects.get_or_create(user=user)[0].listings.add(listing)
+
+
+@pytest.fixture
+def auction(create_user, create_listing):
+    seller = create_user(username="seller", email="seller@example.com")
+    listing = create_listing(bid=100, user=seller)
+    watch(create_user(username="watcher", email=""), listing)
+    return listing
+
+
+@pytest.mark.django_db
+def test_bid_notifies_the_outbid_the_seller_and_watchers(create_user, auction):
+    ann = create_user(username="ann", email="ann@example.com")
+    bob = create_user(username="bob", email="bob@example.com")
+    watch(bob, auction)
+    place_bid(auction.id, ann, 150)
+    notifications.deliver()
+    Notification.objects.all().delete()
+    mail.outbox.clear()
+
+    place_bid(auction.id, bob, 200)
+    assert notifications.deliver() == 1
+
+    assert received(auction) == {
+        ("ann", "outbid"),
+        ("seller", "new_bid"),
+        ("watcher", "watched_bid"),
+    }
+    assert [message.to for message in mail.outbox] == [["ann@example.com"]]
+    assert "You were outbid" in mail.outbox[0].subject
+
+
+@pytest.mark.django_db
+def test_close_notifies_the_winner_the_seller_and_watchers(create_user, auction):
+    ann = create_user(username="ann", email="ann@example.com")
+    place_bid(auction.id, ann, 150)
+    notifications.deliver()
+    Notification.objects.all().delete()
+
+    close_auctions([auction.id])
+    notifications.auctions_closed([auction.id])
+    notifications.deliver()
+
+    assert NotificationEvent.objects.filter(kind="closed").count() == 1
+    assert received(auction) == {
+        ("ann", "won"),
+        ("seller", "sold"),
+        ("watcher", "watched_closed"),
+    }
+    assert sorted(m.to[0] for m in mail.outbox if "closed" in m.subject) == [
+        "seller@example.com"
+    ]
+
+
+@pytest.mark.django_db
+def test_everyone_outbid_by_a_batch_is_told(settings, create_user, auction):
+    settings.AUCTIONS_BID_QUEUE = True
+    users = [create_user(username=name) for name in ("ann", "bob", "cat", "dan")]
+    place_bid(auction.id, users[0], 150)
+    notifications.deliver()
+    Notification.objects.all().delete()
+    for amount, user in zip((160, 170, 180), users[1:]):
+        bidqueue.submit(auction.id, user, amount)
+
+    bidqueue.drain(bidqueue.shard_of(auction.id))
+    notifications.deliver()
+
+    outbid = {name for name, kind in received(auction) if kind == "outbid"}
+    assert outbid == {"ann", "bob", "cat"}
+
+
+@pytest.mark.django_db
+def test_bidding_does_not_fan_out(create_user, auction):
+    bidder = create_user(username="bidder")
+    with CaptureQueriesContext(connection) as few:
+        place_bid(auction.id, bidder, 150)
+    for i in range(20):
+        watch(create_user(username=f"user{i}"), auction)
+    with CaptureQueriesContext(connection) as many:
+        place_bid(auction.id, bidder, 160)
+
+    assert len(few) == len(many)
+    assert not Notification.objects.exists()
+
+
+@pytest.mark.django_db
+def test_fan_out_in_chunks_can_be_rerun(monkeypatch, settings, create_user, auction):
+    settings.AUCTIONS_NOTIFICATION_EMAIL_KINDS = ["watched_bid"]
+    for i in range(7):
+        watch(create_user(username=f"user{i}", email=f"user{i}@example.com"), auction)
+    place_bid(auction.id, create_user(username="bidder"), 150)
+    email, sent = notifications._email, []
+
+    def email_then_die(*args):
+        email(*args)
+        sent.append(args)
+        if len(sent) == 2:
+            raise RuntimeError("worker died")
+
+    monkeypatch.setattr(notifications, "_email", email_then_die)
+    with pytest.raises(RuntimeError):
+        notifications.deliver(chunk_size=3)
+    monkeypatch.setattr(notifications, "_email", email)
+    notifications.deliver(chunk_size=3)
+
+    # the seller and eight watchers, once each
+    assert Notification.objects.count() == 9
+    emailed = [message.to[0] for message in mail.outbox]
+    assert sorted(emailed) == [f"user{i}@example.com" for i in range(7)]
+
+
+@pytest.mark.django_db
+def test_notifications_page_marks_them_read(authenticated_client, create_listing):
+    client, user = authenticated_client
+    listing = create_listing(bid=100, user=user)
+    Notification.objects.create(user=user, listing=listing, kind="sold")
+
+    response = client.get(reverse("notifications"))
+
+    assert "Your auction closed" in response.content.decode()
+    assert Notification.objects.get().read_at is not None
+    rows = client.get(reverse("api_notifications")).json()["results"]
+    assert [row["kind"] for row in rows] == ["sold"]
+
+
+@pytest.mark.django_db
+def test_send_notifications_command(create_user, auction, capsys):
+    place_bid(auction.id, create_user(username="bidder"), 150)
+
+    call_command("send_notifications", once=True)
+
+    assert "Delivered 1 event(s)." in capsys.readouterr().out
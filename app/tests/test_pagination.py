@@ -0,0 +1,112 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.models import Category, Listing
+from auctions.pagination import InvalidCursor, KeysetPaginator
+
+
+@pytest.fixture
+def listings(create_user, create_listing):
+    user = create_user()
+    return [create_listing(title=f"Item {i}", user=user) for i in range(5)]
+
+
+@pytest.mark.django_db
+def test_keyset_pages_newest_first(listings):
+    paginator = KeysetPaginator(Listing.objects.all(), page_size=2)
+    newest_first = listings[::-1]
+
+    first = paginator.page()
+    second = paginator.page(first.next_cursor)
+    third = paginator.page(second.next_cursor)
+
+    assert first.items == newest_first[:2]
+    assert second.items == newest_first[2:4]
+    assert third.items == newest_first[4:]
+    assert first.prev_cursor is None
+    assert third.next_cursor is None
+    assert paginator.page(third.prev_cursor).items == second.items
+    assert paginator.page(second.prev_cursor).items == first.items
+    assert paginator.page(second.prev_cursor).prev_cursor is None
+
+
+@pytest.mark.django_db
+def test_keyset_page_size_travels_with_cursor(listings):
+    first = KeysetPaginator(Listing.objects.all(), page_size=3).page()
+    second = KeysetPaginator(Listing.objects.all()).page(first.next_cursor)
+    assert len(second) == 2
+
+
+@pytest.mark.django_db
+def test_keyset_rejects_tampered_cursor():
+    with pytest.raises(InvalidCursor):
+        KeysetPaginator(Listing.objects.all()).page("not-a-cursor")
+
+
+@pytest.mark.django_db
+def test_seek_query_uses_no_offset(listings):
+    paginator = KeysetPaginator(Listing.objects.filter(is_active=True), page_size=2)
+    cursor = paginator.page().next_cursor
+
+    with CaptureQueriesContext(connection) as queries:
+        paginator.page(cursor)
+
+    assert len(queries) == 1
+    assert "OFFSET" not in queries[0]["sql"].upper()
+
+
+@pytest.mark.django_db
+def test_index_next_and_prev_links(client, listings):
+    response = client.get(reverse("index"), {"page_size": 2})
+    assert response.status_code == 200
+    assert b"Item 4" in response.content
+    assert b"Item 2" not in response.content
+
+    next_cursor = response.context["page"].next_cursor
+    response = client.get(reverse("index"), {"cursor": next_cursor})
+    assert b"Item 2" in response.content
+    assert b"Previous" in response.content
+    assert b"Next" in response.content
+
+
+@pytest.mark.django_db
+def test_category_view_paginates(client, create_user, create_listing):
+    user = create_user()
+    category = Category.objects.create(name="Books")
+    for i in range(3):
+        create_listing(title=f"Book {i}", category=category, user=user)
+    create_listing(title="Other", user=user)
+
+    response = client.get(reverse("category", args=[category.id]), {"page_size": 2})
+    assert list(response.context["page"]) == list(
+        Listing.objects.filter(category=category).order_by("-id")[:2]
+    )
+    response = client.get(
+        reverse("category", args=[category.id]),
+        {"cursor": response.context["page"].next_cursor},
+    )
+    assert [listing.title for listing in response.context["page"]] == ["Book 0"]
+
+
+@pytest.mark.django_db
+def test_index_invalid_cursor(client):
+    response = client.get(reverse("index"), {"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite query plan")
+def test_seek_query_walks_the_feed_index(listings):
+    paginator = KeysetPaginator(Listing.objects.filter(is_active=True), page_size=2)
+    _, values, _ = paginator.decode(paginator.page().next_cursor)
+
+    plan = (
+        Listing.objects.filter(is_active=True)
+        .filter(paginator._seek(values, "lt"))
+        .order_by("-created_at", "-id")[:3]
+        .explain()
+    )
+
+    assert "listing_feed_idx" in plan
+    assert "TEMP B-TREE" not in plan
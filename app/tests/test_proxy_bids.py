@@ -0,0 +1,229 @@
+from decimal import Decimal
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from hypothesis import HealthCheck, given
+from hypothesis import settings as hypothesis_settings
+from hypothesis import strategies as st
+from auctions.bidding import BidStatus, place_bid, set_max_bid
+from auctions.models import Bid, Listing, ProxyBid
+
+INCREMENT = Decimal(settings.AUCTIONS_BID_INCREMENT)
+
+
+def history(listing):
+    return list(
+        Bid.objects.filter(listing=listing)
+        .order_by("id")
+        .values_list("bidder__username", "amount")
+    )
+
+
+@pytest.fixture
+def bidders(create_user):
+    return [create_user(username=name) for name in ("ann", "bob", "cat", "dan")]
+
+
+@pytest.mark.django_db
+def test_highest_maximum_wins_one_increment_over_the_next(bidders, create_listing):
+    ann, bob, *_ = bidders
+    listing = create_listing(bid=10)
+
+    first = set_max_bid(listing.id, ann, 50)
+    assert first.leading and first.current_price == 11
+    second = set_max_bid(listing.id, bob, 30)
+
+    assert not second.leading
+    assert second.current_price == 31
+    assert history(listing) == [("ann", 11), ("bob", 30), ("ann", 31)]
+    listing.refresh_from_db()
+    assert listing.highest_bid.bidder == ann
+    assert listing.bid_count == 3
+
+
+@pytest.mark.django_db
+def test_maximum_answers_a_bid_at_once(bidders, create_listing):
+    ann, bob, *_ = bidders
+    listing = create_listing(bid=10)
+    set_max_bid(listing.id, ann, 50)
+
+    result = place_bid(listing.id, bob, 20)
+
+    assert result.accepted and not result.leading
+    assert result.current_price == 21
+    assert place_bid(listing.id, bob, "50.50").leading
+    assert history(listing)[-2:] == [("ann", 21), ("bob", Decimal("50.50"))]
+
+
+@pytest.mark.django_db
+def test_bid_above_every_maximum_is_not_settled(bidders, create_listing):
+    ann, bob, *_ = bidders
+    listing = create_listing(bid=10)
+    set_max_bid(listing.id, ann, 50)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert place_bid(listing.id, bob, 60).leading
+
+    reads = [q for q in queries if q["sql"].startswith('SELECT "auctions_proxybid"')]
+    assert not reads
+
+
+@pytest.mark.django_db
+def test_earlier_maximum_wins_a_tie(bidders, create_listing):
+    ann, bob, *_ = bidders
+    listing = create_listing(bid=10)
+    set_max_bid(listing.id, ann, 40)
+
+    result = set_max_bid(listing.id, bob, 40)
+
+    assert not result.leading and result.bid is None
+    assert result.current_price == 40
+    assert history(listing) == [("ann", 11), ("ann", 40)]
+
+
+@pytest.mark.django_db
+def test_raising_your_own_maximum_places_no_bid(bidders, create_listing):
+    ann, *_ = bidders
+    listing = create_listing(bid=10)
+    set_max_bid(listing.id, ann, 20)
+
+    result = set_max_bid(listing.id, ann, 90)
+
+    assert result.leading and result.bid is None
+    assert ProxyBid.objects.get().max_amount == 90
+    assert history(listing) == [("ann", 11)]
+
+
+@pytest.mark.django_db
+def test_maximum_is_checked_like_a_bid(bidders, create_listing):
+    ann, *_ = bidders
+    listing = create_listing(bid=10)
+
+    assert set_max_bid(listing.id, ann, 10).status is BidStatus.OUTBID
+    assert set_max_bid(0, ann, 10).status is BidStatus.NOT_FOUND
+    Listing.objects.filter(pk=listing.pk).close()
+    assert set_max_bid(listing.id, ann, 90).status is BidStatus.CLOSED
+    assert not ProxyBid.objects.exists()
+
+
+@pytest.mark.django_db
+def test_resolution_queries_do_not_grow_with_maxima(
+    bidders, create_user, create_listing
+):
+    listing = create_listing(bid=10)
+    for i, bidder in enumerate(bidders):
+        set_max_bid(listing.id, bidder, 100 + i)
+    with CaptureQueriesContext(connection) as few:
+        set_max_bid(listing.id, create_user(username="few"), 200)
+
+    others = [create_user(username=f"user{i}") for i in range(30)]
+    for i, bidder in enumerate(others):
+        set_max_bid(listing.id, bidder, 300 + i)
+    with CaptureQueriesContext(connection) as many:
+        set_max_bid(listing.id, create_user(username="many"), 400)
+
+    assert len(few) == len(many)
+
+
+operations = st.lists(
+    st.tuples(
+        st.sampled_from(["max", "bid"]),
+        st.integers(min_value=0, max_value=3),
+        st.integers(min_value=1, max_value=10_000).map(lambda c: Decimal(c) / 100),
+    ),
+    min_size=1,
+    max_size=12,
+)
+
+
+@pytest.mark.django_db
+@hypothesis_settings(
+    max_examples=60,
+    deadline=None,
+    suppress_health_check=[HealthCheck.function_scoped_fixture],
+)
+@given(operations=operations)
+def test_any_sequence_settles_consistently(bidders, create_listing, operations):
+    listing = create_listing(bid=5, user=bidders[0])
+    maxima = {}
+    manual = set()
+
+    for kind, who, amount in operations:
+        bidder = bidders[who]
+        before = Bid.objects.filter(listing=listing).count()
+        if kind == "max":
+            result = set_max_bid(listing.id, bidder, amount)
+            if result.accepted:
+                maxima[bidder.id] = amount
+            written = 2
+        else:
+            result = place_bid(listing.id, bidder, amount)
+            if result.accepted:
+                manual.add(result.bid.id)
+            written = 3
+        # Only the visible bids are written, however many maxima compete
+        assert Bid.objects.filter(listing=listing).count() - before <= written
+
+        listing.refresh_from_db()
+        bids = list(Bid.objects.filter(listing=listing).order_by("id"))
+        assert listing.bid_count == len(bids)
+        if not bids:
+            assert listing.current_price == 5
+            continue
+        top = bids[-1]
+        assert listing.highest_bid_id == top.id
+        assert listing.current_price == top.amount
+        assert result.current_price == top.amount or not result.accepted
+        assert all(a.amount < b.amount for a, b in zip(bids, bids[1:]))
+
+        leader = top.bidder_id
+        # Settled: nobody else's maximum could still outbid the leader
+        assert all(m <= top.amount for b, m in maxima.items() if b != leader)
+        if top.id not in manual:
+            # A bid made for the leader: within their maximum, and no more than
+            # an increment over what the others had bid or were willing to
+            assert top.amount <= maxima[leader]
+            competition = [m for b, m in maxima.items() if b != leader]
+            competition += [bid.amount for bid in bids if bid.bidder_id != leader]
+            assert top.amount - INCREMENT <= max(competition, default=Decimal(5))
+
+
+@pytest.mark.django_db
+def test_listing_view_sets_a_maximum(authenticated_client, create_user, create_listing):
+    client, user = authenticated_client
+    listing = create_listing(bid=10, user=create_user(username="seller"))
+    url = reverse("listing", args=[listing.id])
+
+    response = client.post(url, {"max_bid": "25"}, follow=True)
+
+    assert "you lead at 11.00$" in response.content.decode()
+    assert client.post(url, {"max_bid": "5"}).status_code == 200
+    assert ProxyBid.objects.get().max_amount == 25
+
+
+@pytest.mark.django_db
+def test_api_sets_a_maximum(authenticated_client, create_user, create_listing):
+    client, user = authenticated_client
+    listing = create_listing(bid=10, user=create_user(username="seller"))
+    set_max_bid(listing.id, create_user(username="rival"), 30)
+    url = reverse("api_max_bid", args=[listing.id])
+
+    response = client.put(url, {"max_bid": "20"}, content_type="application/json")
+    assert response.status_code == 200
+    assert response.json() == {
+        "max_bid": "20.00",
+        "current_price": "21.00",
+        "leading": False,
+    }
+    response = client.put(url, {"max_bid": "9"}, content_type="application/json")
+    assert response.status_code == 409
+    assert client.post(url).status_code == 405
+    # not read as an empty update
+    response = client.put(
+        url, "max_bid=50", content_type="application/x-www-form-urlencoded"
+    )
+    assert response.status_code == 415
+    assert ProxyBid.objects.get(bidder=user).max_amount == 20
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+from django.db import connections
+from django.urls import reverse
+from auctions import routers
+from auctions.models import Listing
+from auctions.routers import PIN_COOKIE, ReplicaRouter
+
+replicated = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Serve reads of the `replica` alias from a second SQLite file, a copy of
+    the test database refreshed by calling the fixture's value."""
+    path = tmp_path / "replica.sqlite3"
+    mirror = connections["replica"].settings_dict
+
+    def replicate():
+        connections["replica"].close()
+        primary = sqlite3.connect(connections["default"].settings_dict["NAME"])
+        copy = sqlite3.connect(path)
+        primary.backup(copy)
+        primary.close()
+        copy.close()
+
+    replicate()
+    connections["replica"].settings_dict = {**mirror, "NAME": str(path)}
+    settings.AUCTIONS_READ_REPLICAS = ["replica"]
+    yield replicate
+    connections["replica"].close()
+    connections["replica"].settings_dict = mirror
+
+
+@replicated
+def test_browse_pages_read_the_replica(client, replica, create_user, create_listing):
+    user = create_user(username="seller")
+    create_listing(title="Replicated", user=user)
+    replica()
+    create_listing(title="Not yet replicated", user=user)
+
+    response = client.get(reverse("index"))
+    assert b"Replicated" in response.content
+    assert b"Not yet replicated" not in response.content
+    # pages that were not opted in read the primary
+    assert Listing.objects.count() == 2
+    assert client.get(reverse("listing", args=[2])).status_code == 200
+
+    replica()
+    assert b"Not yet replicated" in client.get(reverse("index")).content
+
+
+@replicated
+def test_writers_are_pinned_to_the_primary(
+    authenticated_client, client, replica, create_user, create_listing
+):
+    bidder, _ = authenticated_client
+    listing = create_listing(bid=100, user=create_user(username="seller"))
+    replica()
+    other = type(client)()
+
+    response = bidder.post(reverse("listing", args=[listing.id]), {"bid": 150})
+    assert response.status_code == 302
+    assert PIN_COOKIE in response.cookies
+
+    assert b"150" in bidder.get(reverse("index")).content
+    assert b"150" not in other.get(reverse("index")).content
+
+
+@replicated
+def test_reads_without_writes_do_not_pin(client, replica, create_listing):
+    create_listing()
+    replica()
+    assert PIN_COOKIE not in client.get(reverse("index")).cookies
+
+
+def test_router_keeps_writes_and_sessions_on_the_primary(settings):
+    from django.contrib.sessions.models import Session
+
+    settings.AUCTIONS_READ_REPLICAS = ["replica"]
+    router = ReplicaRouter()
+    writes = routers.RequestWrites()
+    token = routers.begin(writes)
+    try:
+        assert router.db_for_write(Listing) == "default"
+    finally:
+        routers.end(token)
+    assert writes.wrote
+    assert router.db_for_read(Session) == "default"
+    assert router.db_for_read(Listing) is None
+    assert router.allow_migrate("replica", "auctions") is False
+    assert router.allow_migrate("default", "auctions") is None
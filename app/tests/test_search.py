@@ -0,0 +1,117 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from auctions.models import Category, Listing
+from auctions.search import parse_terms, search_listings
+
+
+def titles(listings):
+    return [listing.title for listing in listings]
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(create_user, create_listing):
+    user = create_user()
+    create_listing(title="Blue car", description="Red paint, runs well", user=user)
+    create_listing(title="Red bicycle", description="Barely used", user=user)
+    create_listing(title="Green lamp", description="Brass", user=user)
+
+    results = search_listings("red").order_by("-score", "-id")
+
+    assert titles(results) == ["Red bicycle", "Blue car"]
+
+
+@pytest.mark.django_db
+def test_search_matches_prefixes_of_every_term(create_user, create_listing):
+    user = create_user()
+    create_listing(title="Vintage bicycle", user=user)
+    create_listing(title="Vintage camera", user=user)
+
+    assert titles(search_listings("vint bic")) == ["Vintage bicycle"]
+    assert titles(search_listings('"vintage" AND cam*')) == []
+    assert titles(search_listings('"vintage" cam*')) == ["Vintage camera"]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_writes(create_user, create_listing):
+    user = create_user()
+    listing = create_listing(title="Oak table", user=user)
+    Listing.objects.bulk_create(
+        [
+            Listing(
+                title="Oak chair",
+                description="d",
+                starting_bid=1,
+                current_price=1,
+                created_by=user,
+            )
+        ]
+    )
+
+    listing.title = "Pine table"
+    listing.save()
+    assert titles(search_listings("oak")) == ["Oak chair"]
+    assert titles(search_listings("pine")) == ["Pine table"]
+
+    Listing.objects.filter(title="Oak chair").update(is_active=False)
+    listing.delete()
+    assert titles(search_listings("oak")) == []
+    assert titles(search_listings("table")) == []
+
+
+@pytest.mark.django_db
+def test_search_filters_category_and_price(create_user, create_listing):
+    user = create_user()
+    books = Category.objects.create(name="Books")
+    create_listing(title="Rare book", bid=50, category=books, user=user)
+    create_listing(title="Cheap book", bid=5, category=books, user=user)
+    create_listing(title="Book shelf", bid=40, user=user)
+
+    results = search_listings("book", category=books.id, min_price=10, max_price=60)
+
+    assert titles(results) == ["Rare book"]
+
+
+@pytest.mark.django_db
+def test_search_view_pages_keep_the_query(client, create_user, create_listing):
+    user = create_user()
+    for i in range(3):
+        create_listing(title=f"Lamp {i}", user=user)
+    create_listing(title="Chair", user=user)
+
+    url = reverse("search")
+    first = client.get(url, {"q": "lamp", "order": "newest", "page_size": 2})
+    page = first.context["page"]
+    assert titles(page) == ["Lamp 2", "Lamp 1"]
+    assert f"q=lamp&amp;order=newest&amp;page_size=2&amp;cursor={page.next_cursor}" in (
+        first.content.decode()
+    )
+
+    second = client.get(
+        url, {"q": "lamp", "order": "newest", "cursor": page.next_cursor}
+    )
+    assert titles(second.context["page"]) == ["Lamp 0"]
+
+    assert client.get(url, {"min_price": "-1"}).status_code == 400
+    assert client.get(url, {"q": "lamp", "cursor": "garbage"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(create_listing, capsys):
+    create_listing(title="Walnut desk")
+
+    call_command("rebuild_search_index")
+
+    assert titles(search_listings("walnut")) == ["Walnut desk"]
+    assert "Rebuilt" in capsys.readouterr().out
+
+
+def test_parse_terms():
+    assert parse_terms(' "Red"  bike* OR title:x ') == [
+        "red",
+        "bike",
+        "or",
+        "title",
+        "x",
+    ]
+    assert parse_terms(None) == []
@@ -0,0 +1,59 @@
+import runpy
+from pathlib import Path
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.storage import storages
+from django.test import override_settings
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+GUNICORN_CONF = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+@pytest.fixture
+def load_gunicorn_conf(monkeypatch):
+    # recorded unset, so that what the profile puts in the environment is undone
+    monkeypatch.setenv("DJANGO_DB_CONN_MAX_AGE", "")
+    monkeypatch.delenv("DJANGO_DB_CONN_MAX_AGE")
+    return lambda: runpy.run_path(str(GUNICORN_CONF))
+
+
+def test_production_profile_from_the_environment(load_settings):
+    settings = load_settings(
+        DJANGO_DEBUG="false",
+        DJANGO_SECRET_KEY="s3cret",
+        DJANGO_ALLOWED_HOSTS="bids.example.com, .example.org",
+    )
+    assert settings["DEBUG"] is False
+    assert settings["ALLOWED_HOSTS"] == ["bids.example.com", ".example.org"]
+    # taken up by Django itself, which ignores STORAGES before 4.2
+    with override_settings(STORAGES=settings["STORAGES"]):
+        assert isinstance(storages["staticfiles"], CompressedManifestStaticFilesStorage)
+
+
+def test_production_needs_a_shared_secret_key(monkeypatch, load_settings):
+    monkeypatch.delenv("DJANGO_SECRET_KEY", raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(DJANGO_DEBUG="false")
+
+
+def test_gunicorn_profile(monkeypatch, load_gunicorn_conf):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    config = load_gunicorn_conf()
+    assert config["workers"] >= 3
+    assert config["preload_app"] is True
+    assert config["wsgi_app"] == "commerce.wsgi:application"
+
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+    assert load_gunicorn_conf()["wsgi_app"] == "commerce.asgi:application"
+
+
+def test_asgi_profile_does_not_keep_connections(
+    monkeypatch, load_settings, load_gunicorn_conf
+):
+    load_gunicorn_conf()
+    assert load_settings()["DATABASES"]["default"]["CONN_MAX_AGE"] == 60
+
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+    load_gunicorn_conf()
+    assert load_settings()["DATABASES"]["default"]["CONN_MAX_AGE"] == 0
@@ -1,5 +1,6 @@
 import pytest
 from django.urls import reverse
+from auctions import watchlist
 from auctions.models import Watchlist
 
 
@@ -41,3 +42,51 @@ def test_view_watchlist(authenticated_client, create_user, create_listing):
     response = client.get(reverse("watchlist"))
     assert response.status_code == 200
     assert listing.title.encode() in response.content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_toggle_keeps_cached_ids_current(create_user, create_listing):
+    user = create_user()
+    first = create_listing(title="Tablet", user=user)
+    second = create_listing(title="Phone", user=user)
+    assert list(watchlist.watched_ids(user.id)) == []
+
+    assert watchlist.toggle(user, second.id) is True
+    assert watchlist.toggle(user, first.id) is True
+    assert list(watchlist.watched_ids(user.id)) == [first.id, second.id]
+
+    assert watchlist.toggle(user, second.id) is False
+    assert watchlist.is_watched(user.id, first.id)
+    assert not watchlist.is_watched(user.id, second.id)
+    assert list(user.watchlist.listings.values_list("id", flat=True)) == [first.id]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_other_watchlist_changes_drop_cached_ids(create_user, create_listing):
+    user = create_user()
+    listing = create_listing(title="Tablet", user=user)
+    assert not watchlist.is_watched(user.id, listing.id)
+
+    Watchlist.objects.create(user=user).listings.add(listing)
+    assert watchlist.is_watched(user.id, listing.id)
+
+    listing.watchlisted_by.clear()
+    assert not watchlist.is_watched(user.id, listing.id)
+
+
+@pytest.mark.django_db
+def test_toggle_queries_do_not_grow_with_watchlist(
+    authenticated_client, create_listing, django_assert_num_queries
+):
+    client, user = authenticated_client
+    listings = [create_listing(title=f"Item {i}", user=user) for i in range(30)]
+    Watchlist.objects.create(user=user).listings.add(*listings[1:])
+
+    # session, user, listing, savepoint, EXISTS, DELETE, release
+    with django_assert_num_queries(7) as removing:
+        client.post(reverse("watchlist_listing", args=[listings[-1].id]))
+    assert not any('FROM "auctions_watchlist" ' in q["sql"] for q in removing)
+    # adding also reads the Watchlist row to insert under it
+    with django_assert_num_queries(8):
+        client.post(reverse("watchlist_listing", args=[listings[0].id]))
+    assert user.watchlist.listings.count() == 29
@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from auctions.bidding import place_bid
+from auctions.models import Listing
+
+
+@pytest.mark.django_db
+def test_close_records_the_result_once(create_user, create_listing):
+    seller = create_user()
+    bidder = create_user(username="bidder")
+    sold = create_listing(user=seller)
+    unsold = create_listing(user=seller)
+    place_bid(sold.id, bidder, 600)
+    place_bid(sold.id, create_user(username="other"), 650)
+    place_bid(sold.id, bidder, 700)
+
+    Listing.objects.filter(pk__in=[sold.pk, unsold.pk]).close()
+
+    sold.refresh_from_db()
+    unsold.refresh_from_db()
+    assert (sold.won_by, sold.final_price) == (bidder, 700)
+    assert sold.closed_at is not None
+    assert (unsold.won_by, unsold.final_price) == (None, None)
+    assert unsold.closed_at is not None
+
+
+@pytest.mark.django_db
+def test_winner_is_a_comparison(create_user, create_listing):
+    seller = create_user()
+    bidder = create_user(username="bidder")
+    listing = create_listing(user=seller)
+    place_bid(listing.id, bidder, 600)
+    Listing.objects.filter(pk=listing.pk).close()
+    listing = Listing.objects.get(pk=listing.pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert listing.winner(bidder)
+        assert not listing.winner(seller)
+
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_backfill_results_of_legacy_closed_listings(
+    create_user, create_listing, capsys
+):
+    seller = create_user()
+    bidder = create_user(username="bidder")
+    legacy = [create_listing(user=seller) for _ in range(3)]
+    place_bid(legacy[0].id, bidder, 800)
+    Listing.objects.update(is_active=False)
+    active = create_listing(user=seller)
+
+    call_command("backfill_auction_results", batch_size=2)
+
+    assert "Backfilled 3 listing(s)." in capsys.readouterr().out
+    first = Listing.objects.get(pk=legacy[0].pk)
+    assert (first.won_by, first.final_price) == (bidder, 800)
+    assert first.closed_at == first.highest_bid.placed_at
+    assert Listing.objects.filter(closed_at__isnull=True).get() == active
+
+
+@pytest.mark.django_db
+def test_wins_page_lists_won_auctions_newest_first(client, create_user, create_listing):
+    seller = create_user()
+    bidder = create_user(username="bidder")
+    won = []
+    for title in ("First", "Second", "Third"):
+        listing = create_listing(title=title, user=seller)
+        place_bid(listing.id, bidder, 600)
+        Listing.objects.filter(pk=listing.pk).close()
+        won.append(listing)
+    lost = create_listing(title="Lost", user=seller)
+    Listing.objects.filter(pk=lost.pk).close()
+
+    assert client.get(reverse("wins")).status_code == 302
+    client.force_login(bidder)
+    response = client.get(reverse("wins"), {"page_size": 2})
+    page = response.context["page"]
+    rest = client.get(reverse("wins"), {"cursor": page.next_cursor}).context["page"]
+
+    assert [listing.title for listing in page] == ["Third", "Second"]
+    assert [listing.title for listing in rest] == ["First"]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite query plan")
+def test_wins_query_walks_the_wins_index(create_user):
+    user = create_user()
+    plan = (
+        Listing.objects.filter(won_by=user).order_by("-closed_at", "-id")[:25].explain()
+    )
+
+    assert "listing_wins_idx" in plan
+    assert "TEMP B-TREE" not in plan